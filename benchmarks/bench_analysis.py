@@ -0,0 +1,68 @@
+"""
+Benchmark the conversation analysis run on every ask
+
+Measures analyses per second of the full per-conversation pipeline (prompt
+topic detection, quality scoring and insight extraction) on long responses.
+
+Usage:
+    python benchmarks/bench_analysis.py [--words 2000] [--iterations 500]
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+# Add src directory to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from nexus.core.analysis import PROMPT_TOPIC_KEYWORDS, analyze_conversation, profile_text
+from nexus.core.learning import SelfImprovementEngine
+
+WORDS = (
+    "the a of to and in that is for it as with on this be by are from at an example data "
+    "function system consider imagine python algorithm process method database server here's "
+    "let me explain how research design story code debug network understand"
+).split()
+
+
+def make_text(rng: random.Random, words: int) -> str:
+    """Random prose with keywords, sentence breaks and occasional questions"""
+    parts = []
+    for i in range(words):
+        parts.append(rng.choice(WORDS))
+        if i % 17 == 16:
+            parts[-1] += rng.choice([".", ".", "?", "!"])
+    return " ".join(parts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--words", type=int, default=2000, help="Words per response")
+    parser.add_argument("--iterations", type=int, default=500, help="Conversations to analyze")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    # Distinct texts so the profile cache cannot serve repeats
+    conversations = [
+        (f"{i} " + make_text(rng, 30), f"{i} " + make_text(rng, args.words))
+        for i in range(args.iterations)
+    ]
+    # The heuristics do not touch the database
+    engine = SelfImprovementEngine.__new__(SelfImprovementEngine)
+
+    start = time.perf_counter()
+    for user_input, response in conversations:
+        profile_text(user_input).topics(PROMPT_TOPIC_KEYWORDS)
+        conversation = analyze_conversation(user_input, response)
+        engine.analyze_conversation_quality(user_input, response, conversation)
+        engine.extract_conversation_insights(user_input, response, conversation)
+    elapsed = time.perf_counter() - start
+
+    print(f"{args.iterations} conversations, {args.words}-word responses: "
+          f"{args.iterations / elapsed:.0f} analyses/s ({elapsed / args.iterations * 1000:.2f} ms each)")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,9 +7,28 @@ __version__ = "2.0.0"
 __author__ = "İlker Atagün"
 __email__ = "ilker@nexus-ai.com"
 
-from .core.assistant import AIAssistant
-from .core.config import Config
-from .core.learning import SelfImprovementEngine, LearningDatabase
-from .utils.logger import setup_logger
+import importlib
 
-__all__ = ["AIAssistant", "Config", "SelfImprovementEngine", "LearningDatabase", "setup_logger"]
+# Exports are imported on first use so that light entry points (the CLI
+# talking to a running daemon) do not load the model clients
+_EXPORTS = {
+    "AIAssistant": ".core.assistant",
+    "Config": ".core.config",
+    "SelfImprovementEngine": ".core.learning",
+    "LearningDatabase": ".core.learning",
+    "setup_logger": ".utils.logger",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,195 @@
+"""
+Offline batch runs of many prompts through one assistant
+
+Reads prompts from a JSON lines file, answers them with a bounded number of
+concurrent requests and appends each result to an output JSON lines file as
+soon as it is ready. The output doubles as the checkpoint: running the same
+files again skips every prompt that already has a successful result, so an
+interrupted run resumes where it stopped.
+"""
+
+import asyncio
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Set, Tuple
+
+from .core.assistant import AIAssistant, TurnResult
+
+
+def count_prompts(input_path: str) -> int:
+    """Number of non-empty lines of the input"""
+    with open(input_path, encoding="utf-8") as f:
+        return sum(1 for line in f if line.strip())
+
+
+def read_finished(output_path: str) -> Set[int]:
+    """
+    Input lines that already have a successful result
+
+    Failed results, and a last line cut short by a crash, are removed from
+    the output so their prompts run again without leaving duplicates.
+
+    Returns:
+        Positions of the prompts to skip (non-empty input lines, counting from 1)
+    """
+    path = Path(output_path)
+    if not path.exists():
+        return set()
+    finished: Dict[int, str] = {}
+    dropped = 0
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+                if record.get('error') is None:
+                    finished[record['line']] = line if line.endswith("\n") else line + "\n"
+                    continue
+            except (ValueError, KeyError, AttributeError, TypeError):
+                pass
+            dropped += 1
+    if dropped:
+        temporary = path.with_suffix(path.suffix + ".tmp")
+        with open(temporary, "w", encoding="utf-8") as f:
+            f.writelines(finished.values())
+        os.replace(temporary, path)
+    return set(finished)
+
+
+def parse_prompt(line: str) -> Tuple[str, Any, Dict[str, Any]]:
+    """
+    Prompt, ID and generation options of one input line
+
+    A line is a JSON object with a "prompt" and optionally "id",
+    "temperature" and "max_tokens", or just a JSON string.
+
+    Raises:
+        ValueError: The line holds no prompt
+    """
+    item = json.loads(line)
+    if isinstance(item, str):
+        item = {'prompt': item}
+    if not isinstance(item, dict) or not isinstance(item.get('prompt'), str) or not item['prompt'].strip():
+        raise ValueError("expected a JSON object with a non-empty \"prompt\" or a JSON string")
+    options = {key: item[key] for key in ('temperature', 'max_tokens') if item.get(key) is not None}
+    return item['prompt'], item.get('id'), options
+
+
+async def run_batch(assistant: AIAssistant, input_path: str, output_path: str, concurrency: int = 8,
+                    learn: bool = True, progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+                    progress_interval: float = 1.0) -> Dict[str, Any]:
+    """
+    Answer every prompt of the input that has no successful result yet
+
+    Each prompt is a fresh conversation. Results are appended to the output
+    as they finish (so not in input order); each holds the prompt's "line"
+    (its position among the non-empty input lines) and "id", the "response",
+    "conversation_id", "response_time" and "error".
+
+    Args:
+        assistant: Assistant answering the prompts, created once for the run
+        input_path: JSON lines file of prompts
+        output_path: JSON lines file results are appended to
+        concurrency: Prompts in flight at once
+        learn: Store and learn from the conversations, as `nexus ask` does;
+            otherwise the model is called without prompt enhancement
+        progress: Called about every progress_interval seconds and at the end
+            with done, failed, skipped, total, rate (prompts per second) and
+            eta (seconds, None until known)
+        progress_interval: Seconds between progress calls
+
+    Returns:
+        The final progress report, with the elapsed seconds
+    """
+    total = count_prompts(input_path)
+    finished = read_finished(output_path)
+    report: Dict[str, Any] = {'done': 0, 'failed': 0, 'skipped': 0, 'total': total,
+                              'rate': 0.0, 'eta': None, 'elapsed': 0.0}
+    start = time.monotonic()
+    queue: asyncio.Queue = asyncio.Queue(maxsize=concurrency * 2)
+
+    async def answer(number: int, line: str) -> Dict[str, Any]:
+        record: Dict[str, Any] = {'line': number, 'id': number, 'response': None,
+                                  'conversation_id': None, 'response_time': 0.0, 'error': None}
+        try:
+            prompt, item_id, options = parse_prompt(line)
+        except ValueError as e:
+            record['error'] = f"Invalid input line: {e}"
+            return record
+        if item_id is not None:
+            record['id'] = item_id
+        result = TurnResult()
+        if learn:
+            await assistant.ask_async(prompt, memory=assistant.new_memory(), result=result, **options)
+        else:
+            began = time.time()
+            try:
+                result.response = await assistant.generate_async(
+                    [{'role': 'system', 'content': assistant.system_prompt},
+                     {'role': 'user', 'content': prompt}], **options)
+            except Exception as e:
+                result.error = str(e)
+            result.response_time = time.time() - began
+        record.update(response=None if result.error is not None else result.response,
+                      conversation_id=result.conversation_id, response_time=result.response_time,
+                      error=result.error)
+        return record
+
+    def update():
+        elapsed = time.monotonic() - start
+        completed = report['done'] + report['failed']
+        remaining = total - report['skipped'] - completed
+        report['elapsed'] = elapsed
+        report['rate'] = completed / elapsed if elapsed > 0 else 0.0
+        report['eta'] = remaining / report['rate'] if report['rate'] > 0 else None
+
+    with open(output_path, "a", encoding="utf-8") as output:
+
+        async def read_input():
+            with open(input_path, encoding="utf-8") as f:
+                number = 0
+                for line in f:
+                    if not line.strip():
+                        continue
+                    number += 1
+                    if number in finished:
+                        report['skipped'] += 1
+                        continue
+                    await queue.put((number, line))
+            for _ in range(concurrency):
+                await queue.put(None)
+
+        async def work():
+            while True:
+                job = await queue.get()
+                if job is None:
+                    return
+                record = await answer(*job)
+                output.write(json.dumps(record, ensure_ascii=False) + "\n")
+                output.flush()
+                report['failed' if record['error'] is not None else 'done'] += 1
+
+        async def report_progress():
+            while True:
+                await asyncio.sleep(progress_interval)
+                # Results reach the disk at least once per interval
+                os.fsync(output.fileno())
+                update()
+                if progress:
+                    progress(dict(report))
+
+        ticker = asyncio.create_task(report_progress())
+        try:
+            await asyncio.gather(read_input(), *(work() for _ in range(concurrency)))
+        finally:
+            ticker.cancel()
+            await asyncio.gather(ticker, return_exceptions=True)
+            output.flush()
+            os.fsync(output.fileno())
+
+    update()
+    report['eta'] = 0.0
+    if progress:
+        progress(dict(report))
+    return report
@@ -12,7 +12,7 @@ src_path = Path(__file__).parent.parent
 sys.path.insert(0, str(src_path))
 
 from dotenv import load_dotenv
-from nexus import AIAssistant, setup_logger, __version__
+from nexus import __version__
 
 # Load environment variables
 load_dotenv()
@@ -127,6 +127,26 @@ For more information, visit: https://github.com/yourusername/nexus
         "stats",
         help="Show learning and improvement statistics"
     )
+    stats_parser.add_argument(
+        "--recompute",
+        action="store_true",
+        help="Rebuild statistics from the raw conversation history"
+    )
+    stats_parser.add_argument(
+        "--since",
+        help="Show per-bucket statistics from this point on (e.g. 7d, 24h, 2024-01-31)"
+    )
+    stats_parser.add_argument(
+        "--by",
+        action="append",
+        choices=["hour", "day", "model"],
+        help="Group per-bucket statistics by hour, day and/or model (repeatable)"
+    )
+    stats_parser.add_argument(
+        "--storage",
+        action="store_true",
+        help="Show how much space conversation text storage saves"
+    )
     
     # Feedback command
     feedback_parser = subparsers.add_parser(
@@ -139,6 +159,11 @@ For more information, visit: https://github.com/yourusername/nexus
         choices=[1, 0, -1],
         help="Feedback rating (1: positive, 0: neutral, -1: negative)"
     )
+    feedback_parser.add_argument(
+        "--id",
+        dest="conversation_id",
+        help="Rate a stored conversation by its ID or ID prefix (see 'nexus search')"
+    )
     
     # Improvement command
     improve_parser = subparsers.add_parser(
@@ -146,9 +171,344 @@ For more information, visit: https://github.com/yourusername/nexus
         help="Show improvement suggestions and learning status"
     )
     
+    # Maintenance command
+    maintenance_parser = subparsers.add_parser(
+        "maintenance",
+        help="Archive expired learning data and compact the database"
+    )
+    maintenance_parser.add_argument(
+        "--retention-days",
+        type=int,
+        help="Keep raw conversations for this many days (0 keeps everything)"
+    )
+    maintenance_parser.add_argument(
+        "--pattern-retention-days",
+        type=int,
+        help="Keep knowledge patterns for this many days (0 keeps everything)"
+    )
+    maintenance_parser.add_argument(
+        "--archive-dir",
+        help="Directory for the compressed JSONL archives"
+    )
+    maintenance_parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Only report what would be archived"
+    )
+    maintenance_parser.add_argument(
+        "--no-vacuum",
+        action="store_true",
+        help="Skip reclaiming free space after archiving"
+    )
+    maintenance_parser.add_argument(
+        "--interval",
+        type=int,
+        help="Keep running, repeating maintenance every N seconds"
+    )
+    
+    # Export command
+    export_parser = subparsers.add_parser(
+        "export",
+        help="Export learning data as JSONL"
+    )
+    export_parser.add_argument(
+        "output",
+        help="Output file (a .gz suffix enables compression)"
+    )
+    export_parser.add_argument(
+        "--gzip",
+        action="store_true",
+        help="Compress the output regardless of its suffix"
+    )
+    export_parser.add_argument(
+        "--tables",
+        nargs="+",
+        choices=["conversations", "knowledge_patterns", "learning_insights"],
+        help="Tables to export (default: all)"
+    )
+    
+    # Import command
+    import_parser = subparsers.add_parser(
+        "import",
+        help="Import learning data exported by 'nexus export'"
+    )
+    import_parser.add_argument(
+        "input",
+        help="JSONL file to import (.gz files are decompressed)"
+    )
+    import_parser.add_argument(
+        "--feedback",
+        action="store_true",
+        help="Treat the input as ratings (content_hash, feedback) and apply them in bulk"
+    )
+    
+    # Writer command
+    writer_parser = subparsers.add_parser(
+        "writer",
+        help="Run the single learning-data writer for multi-worker deployments"
+    )
+    writer_parser.add_argument(
+        "--address",
+        help="Unix socket path or pipe name to listen on (default: LEARNING_WRITER_ADDRESS)"
+    )
+    writer_parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=500,
+        help="Maximum number of writes committed in one transaction"
+    )
+    
+    # Search command
+    search_parser = subparsers.add_parser(
+        "search",
+        help="Full-text search over past conversations"
+    )
+    search_parser.add_argument(
+        "query",
+        help="Words to search for (all must match)"
+    )
+    search_parser.add_argument(
+        "--limit",
+        type=int,
+        default=10,
+        help="Results per page"
+    )
+    search_parser.add_argument(
+        "--page",
+        type=int,
+        default=1,
+        help="Page of results to show"
+    )
+    search_parser.add_argument(
+        "--raw",
+        action="store_true",
+        help="Use FTS5 query syntax (phrases, OR, NEAR, prefix*)"
+    )
+    
+    # Rescore command
+    rescore_parser = subparsers.add_parser(
+        "rescore",
+        help="Recompute quality scores of all stored conversations (needs NumPy)"
+    )
+    rescore_parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=10000,
+        help="Conversations scored and written per transaction"
+    )
+    rescore_parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Only report how many scores would change"
+    )
+    
+    # Reanalyze command
+    reanalyze_parser = subparsers.add_parser(
+        "reanalyze",
+        help="Rebuild learned patterns by reanalyzing all stored conversations"
+    )
+    reanalyze_parser.add_argument(
+        "--workers",
+        type=int,
+        help="Worker processes (default: one per CPU)"
+    )
+    reanalyze_parser.add_argument(
+        "--shard-size",
+        type=int,
+        default=5000,
+        help="Conversation IDs per unit of work"
+    )
+    reanalyze_parser.add_argument(
+        "--restart",
+        action="store_true",
+        help="Discard an interrupted run instead of resuming it"
+    )
+    
+    # Train classifier command
+    train_parser = subparsers.add_parser(
+        "train-classifier",
+        help="Train the topic/intent classifier on conversations stored since the last run (needs NumPy)"
+    )
+    train_parser.add_argument(
+        "--rebuild",
+        action="store_true",
+        help="Train a new model on all conversations"
+    )
+    
+    # Score worker command
+    score_parser = subparsers.add_parser(
+        "score-worker",
+        help="Run the expensive scorers over queued conversations"
+    )
+    score_parser.add_argument(
+        "--scorers",
+        help="Comma-separated scorer names (default: DEFERRED_SCORERS)"
+    )
+    score_parser.add_argument(
+        "--workers",
+        type=int,
+        help="Scoring processes (default: one per CPU, 0 scores in-process)"
+    )
+    score_parser.add_argument(
+        "--once",
+        action="store_true",
+        help="Score the current queue and exit"
+    )
+    score_parser.add_argument(
+        "--interval",
+        type=float,
+        default=5.0,
+        help="Seconds between queue polls"
+    )
+    
+    # Batch command
+    batch_parser = subparsers.add_parser(
+        "batch",
+        help="Answer a JSON lines file of prompts, resuming where an earlier run stopped"
+    )
+    batch_parser.add_argument(
+        "input",
+        help="JSON lines file of prompts ({\"prompt\": ..., \"id\": ...} per line)"
+    )
+    batch_parser.add_argument(
+        "output",
+        help="JSON lines file results are appended to (also the checkpoint)"
+    )
+    batch_parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=8,
+        help="Prompts in flight at once"
+    )
+    batch_parser.add_argument(
+        "--no-learn",
+        action="store_true",
+        help="Do not store or learn from the conversations"
+    )
+    
+    # Daemon command
+    daemon_parser = subparsers.add_parser(
+        "daemon",
+        help="Keep a warm assistant running so ask, chat and stats answer instantly"
+    )
+    daemon_parser.add_argument(
+        "--address",
+        help="Unix socket path or pipe name to listen on (default: DAEMON_ADDRESS)"
+    )
+    daemon_parser.add_argument(
+        "--status",
+        action="store_true",
+        help="Show whether a daemon is running"
+    )
+    daemon_parser.add_argument(
+        "--stop",
+        action="store_true",
+        help="Stop the running daemon"
+    )
+    
+    # Serve command
+    serve_parser = subparsers.add_parser(
+        "serve",
+        help="Run the HTTP API (chat, streaming chat, feedback, stats)"
+    )
+    serve_parser.add_argument(
+        "--host",
+        help="Interface to bind (default: WEB_HOST)"
+    )
+    serve_parser.add_argument(
+        "--port",
+        type=int,
+        help="Port to bind (default: WEB_PORT)"
+    )
+    serve_parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Server processes (sessions need sticky routing when more than one)"
+    )
+    
+    # Load test command
+    loadtest_parser = subparsers.add_parser(
+        "loadtest",
+        help="Measure how many concurrent streaming chats a server sustains"
+    )
+    loadtest_parser.add_argument(
+        "--url",
+        default="http://localhost:8000",
+        help="Base URL of the server"
+    )
+    loadtest_parser.add_argument(
+        "--levels",
+        default="1,2,4,8,16,32,64,128",
+        help="Comma-separated concurrent stream counts to step through"
+    )
+    loadtest_parser.add_argument(
+        "--streams",
+        type=int,
+        help="Streams per level (default: twice the level)"
+    )
+    loadtest_parser.add_argument(
+        "--message",
+        default="Explain Python generators in two sentences.",
+        help="Question sent on every stream"
+    )
+    loadtest_parser.add_argument(
+        "--max-first-event",
+        type=float,
+        default=2.0,
+        help="Largest acceptable p95 seconds to the first streamed event"
+    )
+    
+    # Proxy latency command
+    proxy_parser = subparsers.add_parser(
+        "proxy-latency",
+        help="Measure the latency the OpenAI-compatible API adds over the model server"
+    )
+    proxy_parser.add_argument(
+        "--proxy",
+        default="http://localhost:8000",
+        help="Base URL of nexus serve"
+    )
+    proxy_parser.add_argument(
+        "--upstream",
+        help="Base URL of the model server (default: OLLAMA_HOST, or OpenAI with the openai provider)"
+    )
+    proxy_parser.add_argument(
+        "--model",
+        help="Model to request (default: the configured model)"
+    )
+    proxy_parser.add_argument(
+        "--requests",
+        type=int,
+        default=20,
+        help="Measured requests per target"
+    )
+    proxy_parser.add_argument(
+        "--no-stream",
+        action="store_true",
+        help="Compare whole responses instead of streamed ones"
+    )
+    
     return parser
 
 
+def load_assistant(model=None):
+    """
+    Assistant for chat, ask, stats and improve: the running daemon's, else a new one
+    
+    Args:
+        model: Model to answer with instead of the daemon's
+    """
+    from nexus.daemon import connect
+    
+    client = connect(model=model)
+    if client is not None:
+        return client
+    
+    from nexus import AIAssistant
+    return AIAssistant()
+
+
 def cmd_chat(args):
     """Handle chat command"""
     print("🚀 Welcome to Nexus AI Assistant!")
@@ -163,7 +523,7 @@ def cmd_chat(args):
             os.environ['OLLAMA_MODEL'] = args.model
             print(f"🤖 Using model: {args.model}")
         
-        assistant = AIAssistant()
+        assistant = load_assistant(args.model)
         
         if args.reset:
             assistant.reset_conversation()
@@ -201,9 +561,14 @@ def cmd_chat(args):
                             if len(history) >= 2:
                                 last_user = history[-2]['content']
                                 last_assistant = history[-1]['content']
-                                result = assistant.provide_feedback(last_user, last_assistant, rating)
-                                print(f"\n💡 Feedback recorded! Quality score: {result['overall_quality']:.2f}")
-                                if result['suggestions']:
+                                result = assistant.provide_feedback(
+                                    last_user, last_assistant, rating,
+                                    conversation_id=assistant.last_conversation_id
+                                )
+                                quality = result.get('overall_quality')
+                                print("\n💡 Feedback recorded!" +
+                                      (f" Quality score: {quality:.2f}" if quality is not None else ""))
+                                if result.get('suggestions'):
                                     print("🎯 Improvement suggestions:")
                                     for suggestion in result['suggestions']:
                                         print(f"  - {suggestion}")
@@ -264,7 +629,7 @@ def cmd_ask(args):
             os.environ['OLLAMA_MODEL'] = args.model
             print(f"🤖 Using model: {args.model}")
         
-        assistant = AIAssistant()
+        assistant = load_assistant(args.model)
         
         print(f"💭 Question: {args.question}")
         print("\n🤖 Nexus: ", end="", flush=True)
@@ -386,8 +751,15 @@ def cmd_pull(args):
 def cmd_stats(args):
     """Handle stats command"""
     try:
-        assistant = AIAssistant()
-        stats = assistant.get_learning_stats()
+        if args.storage:
+            return print_storage_stats()
+        
+        assistant = load_assistant()
+        
+        if args.since or args.by:
+            return print_rollup_stats(assistant, args)
+        
+        stats = assistant.get_learning_stats(recompute=args.recompute)
         
         print("📊 Nexus Learning Statistics")
         print("=" * 40)
@@ -407,9 +779,69 @@ def cmd_stats(args):
         return 1
 
 
+def print_storage_stats():
+    """Print conversation text storage savings for the stats command"""
+    from nexus.core.learning import LearningDatabase
+    
+    report = LearningDatabase().get_storage_report()
+    
+    print("💾 Conversation Text Storage")
+    print("=" * 40)
+    print(f"Conversations: {report['conversations']}")
+    print(f"Distinct texts: {report['blobs']}")
+    print(f"Text as written: {report['text_bytes'] / (1024 * 1024):.1f} MB")
+    print(f"Stored: {report['stored_bytes'] / (1024 * 1024):.1f} MB")
+    print(f"  Saved by deduplication: {report['deduplication_saved_bytes'] / (1024 * 1024):.1f} MB")
+    print(f"  Saved by compression: {report['compression_saved_bytes'] / (1024 * 1024):.1f} MB")
+    print(f"Total saved: {report['saved_bytes'] / (1024 * 1024):.1f} MB ({report['saved_ratio']:.1%})")
+    return 0
+
+
+def print_rollup_stats(assistant, args):
+    """Print time-bucketed statistics for the stats command"""
+    from nexus.utils.helpers import parse_since
+    
+    group_by = args.by or ["day"]
+    granularity = "hour" if "hour" in group_by else "day"
+    by_model = "model" in group_by
+    since = parse_since(args.since) if args.since else None
+    
+    rows = assistant.get_rollup_stats(since=since, granularity=granularity, by_model=by_model)
+    
+    print(f"📈 Nexus Statistics per {granularity}" + (" and model" if by_model else ""))
+    print("=" * 40)
+    if not rows:
+        print("No conversations in the selected window")
+        return 0
+    
+    for row in rows:
+        label = row['bucket_start'][:13 if granularity == "hour" else 10]
+        if by_model:
+            label += f"  {row['model'] or 'unknown'}"
+        p95 = row['p95_response_time']
+        print(f"{label}: {row['conversations']} conversations, "
+              f"avg {row['avg_response_time']:.2f}s, "
+              f"p95 {'n/a' if p95 is None else f'{p95:.2f}s'}, "
+              f"quality {row['avg_quality_score']:.1%}")
+    
+    return 0
+
+
 def cmd_feedback(args):
     """Handle feedback command"""
     try:
+        if args.conversation_id:
+            from nexus.core.learning import SelfImprovementEngine
+            
+            engine = SelfImprovementEngine()
+            conversation_id = engine.db.resolve_conversation_id(args.conversation_id)
+            if conversation_id is None:
+                print(f"❌ No conversation with ID {args.conversation_id}")
+                return 1
+            engine.record_feedback(conversation_id, args.rating)
+            print(f"💡 Feedback {args.rating:+d} recorded for conversation {conversation_id[:12]}")
+            return 0
+        
         print("💡 Feedback feature requires an active conversation.")
         print("Use this command within the chat interface:")
         print("  nexus chat")
@@ -425,7 +857,7 @@ def cmd_feedback(args):
 def cmd_improve(args):
     """Handle improve command"""
     try:
-        assistant = AIAssistant()
+        assistant = load_assistant()
         summary = assistant.continuous_improvement_summary()
         
         print("🧠 Continuous Improvement Status")
@@ -451,13 +883,416 @@ def cmd_improve(args):
         return 1
 
 
+def cmd_maintenance(args):
+    """Handle maintenance command"""
+    try:
+        from nexus.core.maintenance import DatabaseMaintenance, MaintenanceScheduler
+        
+        maintenance = DatabaseMaintenance(
+            retention_days=args.retention_days,
+            pattern_retention_days=args.pattern_retention_days,
+            archive_dir=args.archive_dir
+        )
+        
+        if args.interval:
+            import time
+            
+            scheduler = MaintenanceScheduler(maintenance, interval=args.interval)
+            scheduler.start()
+            print(f"🧹 Running maintenance every {args.interval}s (Ctrl+C to stop)")
+            try:
+                while True:
+                    time.sleep(1)
+            except KeyboardInterrupt:
+                scheduler.stop()
+                print("\n👋 Maintenance scheduler stopped")
+            return 0
+        
+        report = maintenance.run(dry_run=args.dry_run, vacuum=not args.no_vacuum)
+        
+        print("🧹 Nexus Database Maintenance" + (" (dry run)" if args.dry_run else ""))
+        print("=" * 40)
+        print(f"Conversations archived: {report['conversations_archived']}")
+        print(f"Patterns archived: {report['patterns_archived']}")
+        for path in report['archive_files']:
+            print(f"  → {path}")
+        if 'blobs_purged' in report:
+            print(f"Unreferenced texts removed: {report['blobs_purged']}")
+        print(f"Database size: {report['database_bytes'] / (1024 * 1024):.1f} MB")
+        if 'bytes_freed' in report:
+            print(f"Space reclaimed: {report['bytes_freed'] / (1024 * 1024):.1f} MB")
+        
+        return 0
+        
+    except Exception as e:
+        print(f"❌ Error running maintenance: {e}")
+        return 1
+
+
+def cmd_export(args):
+    """Handle export command"""
+    try:
+        from nexus.core.transfer import LearningDataTransfer, TRANSFER_TABLES
+        
+        transfer = LearningDataTransfer()
+        counts = transfer.export(
+            args.output,
+            tables=args.tables or TRANSFER_TABLES,
+            compress=True if args.gzip else None
+        )
+        
+        print(f"📦 Exported learning data to {args.output}")
+        for table, count in counts.items():
+            print(f"  {table}: {count} rows")
+        return 0
+        
+    except Exception as e:
+        print(f"❌ Error exporting learning data: {e}")
+        return 1
+
+
+def cmd_import(args):
+    """Handle import command"""
+    try:
+        from nexus.core.transfer import LearningDataTransfer
+        
+        transfer = LearningDataTransfer()
+        
+        if args.feedback:
+            result = transfer.apply_feedback(args.input)
+            print(f"💡 Applied {result['applied']} ratings ({result['unmatched']} unmatched)")
+            return 0
+        
+        counts = transfer.import_file(args.input)
+        print(f"📥 Imported learning data from {args.input}")
+        for table, count in counts.items():
+            print(f"  {table}: {count} new rows")
+        return 0
+        
+    except Exception as e:
+        print(f"❌ Error importing learning data: {e}")
+        return 1
+
+
+def cmd_writer(args):
+    """Handle writer command"""
+    try:
+        from nexus.core.writer import LearningWriter
+        
+        writer = LearningWriter(args.address, batch_size=args.batch_size)
+        print(f"✍️  Learning writer listening on {writer.address} (Ctrl+C to stop)")
+        try:
+            writer.serve_forever()
+        except KeyboardInterrupt:
+            print(f"\n👋 Learning writer stopped after {writer.committed} writes")
+        return 0
+        
+    except Exception as e:
+        print(f"❌ Error running learning writer: {e}")
+        return 1
+
+
+def cmd_search(args):
+    """Handle search command"""
+    try:
+        from nexus.core.learning import LearningDatabase
+        
+        # Bold matches on a terminal, markdown-style markers otherwise
+        highlight = ("\033[1m", "\033[0m") if sys.stdout.isatty() else ("**", "**")
+        page = max(args.page, 1)
+        results = LearningDatabase().search_conversations(
+            args.query, limit=args.limit, offset=(page - 1) * args.limit,
+            raw=args.raw, highlight=highlight
+        )
+        
+        if not results:
+            print(f"🔍 No conversations match '{args.query}'" + (f" on page {page}" if page > 1 else ""))
+            return 0
+        
+        print(f"🔍 Results for '{args.query}' (page {page})")
+        print("=" * 40)
+        for number, result in enumerate(results, start=(page - 1) * args.limit + 1):
+            print(f"{number}. {result['timestamp']}  [{result['conversation_id'][:12]}]")
+            print(f"   👤 {result['user_input']}")
+            print(f"   🤖 {result['assistant_response']}")
+        if len(results) == args.limit:
+            print(f"\nMore results: nexus search \"{args.query}\" --page {page + 1}")
+        return 0
+        
+    except Exception as e:
+        print(f"❌ Error searching conversations: {e}")
+        return 1
+
+
+def cmd_rescore(args):
+    """Handle rescore command"""
+    try:
+        from nexus.core.batch_analysis import BatchQualityScorer
+        
+        result = BatchQualityScorer(chunk_size=args.chunk_size).rescore(dry_run=args.dry_run)
+        
+        rate = result['scored'] / result['seconds'] if result['seconds'] else 0
+        print(f"📐 Scored {result['scored']} conversations in {result['seconds']:.1f}s ({rate:.0f}/s)")
+        if args.dry_run:
+            print(f"   {result['changed']} scores would change")
+        else:
+            print(f"   {result['changed']} scores updated")
+        return 0
+        
+    except Exception as e:
+        print(f"❌ Error rescoring conversations: {e}")
+        return 1
+
+
+def cmd_reanalyze(args):
+    """Handle reanalyze command"""
+    try:
+        from nexus.core.reanalysis import PatternReanalyzer
+        
+        def show_progress(status):
+            eta = int(status['eta_seconds'])
+            print(f"\r   Shard {status['shards_done']}/{status['shards_total']}"
+                  f"  ETA {eta // 60}m{eta % 60:02d}s   ", end="", flush=True)
+        
+        print("🔁 Reanalyzing conversations...")
+        reanalyzer = PatternReanalyzer(workers=args.workers, shard_size=args.shard_size)
+        result = reanalyzer.run(restart=args.restart, progress=show_progress)
+        
+        print()
+        if result['resumed']:
+            print("   Resumed an interrupted run")
+        print(f"✅ Rebuilt {result['patterns']} patterns from {result['conversations']} "
+              f"conversations in {result['seconds']:.1f}s")
+        return 0
+        
+    except KeyboardInterrupt:
+        print("\n⏸️  Interrupted; run 'nexus reanalyze' again to resume")
+        return 1
+    except Exception as e:
+        print(f"\n❌ Error reanalyzing conversations: {e}")
+        return 1
+
+
+def cmd_train_classifier(args):
+    """Handle train-classifier command"""
+    try:
+        from nexus.core.classifier import ClassifierTrainer
+        from nexus.core.config import config
+        
+        result = ClassifierTrainer().train(rebuild=args.rebuild)
+        
+        print(f"🧠 Trained on {result['added']} new conversations ({result['examples']} in total)")
+        print(f"   Stored model: {result['model_bytes'] / 1024:.1f} KB")
+        if result['examples'] < config.classifier_min_examples:
+            print(f"   Keyword rules stay in use until {config.classifier_min_examples} conversations "
+                  f"have been seen (CLASSIFIER_MIN_EXAMPLES)")
+        return 0
+        
+    except Exception as e:
+        print(f"❌ Error training classifier: {e}")
+        return 1
+
+
+def cmd_score_worker(args):
+    """Handle score-worker command"""
+    try:
+        from nexus.core.deferred_scoring import DeferredScoringWorker
+        
+        scorers = [name.strip() for name in args.scorers.split(",")] if args.scorers else None
+        worker = DeferredScoringWorker(scorers=scorers, workers=args.workers)
+        if not worker.scorer_names:
+            print("⚠️ No expensive scorers are enabled or installed (DEFERRED_SCORERS); nothing to score")
+            return 0
+        
+        if not args.once:
+            print(f"🔬 Scoring queued conversations with {', '.join(worker.scorer_names)}"
+                  f" (Ctrl+C to stop)")
+            try:
+                worker.serve_forever(interval=args.interval)
+            except KeyboardInterrupt:
+                worker.stop()
+                print("\n👋 Score worker stopped")
+            return 0
+        
+        try:
+            report = worker.run_once()
+        finally:
+            worker.close()
+        
+        print(f"🔬 Scored {report['scored']} conversations ({report['failed']} failed)")
+        for stage, timing in report['timings'].items():
+            print(f"   {stage}: {timing['count']} runs, avg {timing['avg_ms']:.1f} ms, "
+                  f"max {timing['max_ms']:.1f} ms")
+        return 0
+        
+    except Exception as e:
+        print(f"❌ Error running score worker: {e}")
+        return 1
+
+
+def cmd_batch(args):
+    """Handle batch command"""
+    try:
+        import asyncio
+        from nexus.batch import run_batch
+        
+        if args.concurrency < 1:
+            print("❌ Error: --concurrency must be at least 1")
+            return 1
+        
+        def progress(report):
+            eta_text = "--:--:--"
+            if report['eta'] is not None:
+                hours, seconds = divmod(int(report['eta']), 3600)
+                eta_text = f"{hours:02d}:{seconds // 60:02d}:{seconds % 60:02d}"
+            finished = report['skipped'] + report['done'] + report['failed']
+            print(f"\r⏳ {finished}/{report['total']} prompts ({report['failed']} failed), "
+                  f"{report['rate']:.1f}/s, ETA {eta_text}", end="", flush=True)
+        
+        from nexus import AIAssistant
+        
+        assistant = AIAssistant()
+        print(f"📦 Answering {args.input} into {args.output} with {args.concurrency} concurrent prompts")
+        report = asyncio.run(run_batch(assistant, args.input, args.output, concurrency=args.concurrency,
+                                       learn=not args.no_learn, progress=progress))
+        print(f"\n✅ {report['done']} answered, {report['failed']} failed, {report['skipped']} already done "
+              f"in {report['elapsed']:.1f}s")
+        if report['failed']:
+            print("   Run the same command again to retry the failed prompts")
+        return 0 if not report['failed'] else 1
+        
+    except KeyboardInterrupt:
+        print("\n⏸️  Interrupted; run the same command again to resume")
+        return 130
+    except Exception as e:
+        print(f"\n❌ Error running batch: {e}")
+        return 1
+
+
+def cmd_daemon(args):
+    """Handle daemon command"""
+    try:
+        from nexus.daemon import AssistantDaemon, connect
+        
+        if args.status or args.stop:
+            client = connect(args.address)
+            if client is None:
+                print("💤 No Nexus daemon is running")
+                return 1
+            status = client.shutdown() if args.stop else client.status()
+            print(f"{'🛑 Stopped' if args.stop else '⚡ Running'}: pid {status['pid']} on {status['address']}, "
+                  f"model {status['model']}, up {status['uptime']:.0f}s, {status['requests']} requests")
+            return 0
+        
+        daemon = AssistantDaemon(args.address)
+        print(f"⚡ Nexus daemon listening on {daemon.address} (Ctrl+C to stop)")
+        try:
+            daemon.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        print(f"\n👋 Nexus daemon stopped after {daemon.requests} requests")
+        return 0
+        
+    except Exception as e:
+        print(f"❌ Error running daemon: {e}")
+        return 1
+
+
+def cmd_serve(args):
+    """Handle serve command"""
+    try:
+        from nexus.core.config import config
+        from nexus.server import serve
+        
+        host = args.host or config.web_host
+        port = args.port or config.web_port
+        print(f"🌐 Serving the Nexus API on http://{host}:{port} with {args.workers} worker(s)")
+        serve(host=host, port=port, workers=args.workers)
+        return 0
+        
+    except ImportError as e:
+        print(f"❌ {e}")
+        return 1
+    except Exception as e:
+        print(f"❌ Error running server: {e}")
+        return 1
+
+
+def cmd_loadtest(args):
+    """Handle loadtest command"""
+    try:
+        import asyncio
+        from nexus.loadtest import run_load_test
+        
+        levels = [int(level) for level in args.levels.split(",")]
+        
+        def progress(report):
+            status = "✅" if report['sustained'] else "❌"
+            print(f"{status} {report['concurrency']:>5} streams: {report['streams_per_second']:7.1f}/s, "
+                  f"first event p50 {report['first_event_p50'] * 1000:6.0f} ms / "
+                  f"p95 {report['first_event_p95'] * 1000:6.0f} ms, "
+                  f"duration p95 {report['duration_p95']:5.2f}s, {report['errors']} errors")
+            if report['first_error']:
+                print(f"      first error: {report['first_error']}")
+        
+        print(f"🚦 Load testing {args.url}")
+        result = asyncio.run(run_load_test(
+            args.url, levels, streams_per_level=args.streams, message=args.message,
+            max_first_event=args.max_first_event, progress=progress
+        ))
+        print(f"\n📈 Sustained concurrent streams: {result['sustained_concurrency']}")
+        return 0
+        
+    except Exception as e:
+        print(f"❌ Error running load test: {e}")
+        return 1
+
+
+def cmd_proxy_latency(args):
+    """Handle proxy-latency command"""
+    try:
+        import asyncio
+        from nexus.core.config import config
+        from nexus.loadtest import measure_proxy_latency
+        
+        if config.model_provider.lower() == "openai":
+            upstream = args.upstream or "https://api.openai.com"
+            model = args.model or config.openai_model
+            api_key = config.openai_api_key
+        else:
+            upstream = args.upstream or config.ollama_host
+            model = args.model or config.current_ollama_model
+            api_key = None
+        
+        print(f"⏱️  Comparing {args.proxy} with {upstream} ({model}, {args.requests} requests each)")
+        report = asyncio.run(measure_proxy_latency(
+            args.proxy, upstream, model, requests=args.requests, stream=not args.no_stream,
+            upstream_api_key=api_key
+        ))
+        
+        measures = [('total', "Whole response")]
+        if report['stream']:
+            measures.insert(0, ('first_event', "First event"))
+        for measure, label in measures:
+            print(f"{label}: upstream p50 {report[f'upstream_{measure}_p50'] * 1000:.1f} ms "
+                  f"(p95 {report[f'upstream_{measure}_p95'] * 1000:.1f}), "
+                  f"proxy p50 {report[f'proxy_{measure}_p50'] * 1000:.1f} ms "
+                  f"(p95 {report[f'proxy_{measure}_p95'] * 1000:.1f})")
+            print(f"   added by Nexus: {report[f'added_{measure}_p50'] * 1000:+.1f} ms")
+        return 0
+        
+    except Exception as e:
+        print(f"❌ Error measuring proxy latency: {e}")
+        return 1
+
+
 def main():
     """Main CLI entry point"""
     parser = create_parser()
     args = parser.parse_args()
     
-    # Set up logging
-    logger = setup_logger()
+    # Logging is set up when a command first imports the assistant, so commands
+    # answered by the daemon never load it
     
     if not args.command:
         # Default to chat mode if no command specified
@@ -481,6 +1316,34 @@ def main():
         return cmd_feedback(args)
     elif args.command == "improve":
         return cmd_improve(args)
+    elif args.command == "maintenance":
+        return cmd_maintenance(args)
+    elif args.command == "export":
+        return cmd_export(args)
+    elif args.command == "import":
+        return cmd_import(args)
+    elif args.command == "writer":
+        return cmd_writer(args)
+    elif args.command == "search":
+        return cmd_search(args)
+    elif args.command == "rescore":
+        return cmd_rescore(args)
+    elif args.command == "reanalyze":
+        return cmd_reanalyze(args)
+    elif args.command == "train-classifier":
+        return cmd_train_classifier(args)
+    elif args.command == "score-worker":
+        return cmd_score_worker(args)
+    elif args.command == "batch":
+        return cmd_batch(args)
+    elif args.command == "daemon":
+        return cmd_daemon(args)
+    elif args.command == "serve":
+        return cmd_serve(args)
+    elif args.command == "loadtest":
+        return cmd_loadtest(args)
+    elif args.command == "proxy-latency":
+        return cmd_proxy_latency(args)
     else:
         parser.print_help()
         return 1
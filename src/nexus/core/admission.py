@@ -0,0 +1,417 @@
+"""
+Admission control in front of the model provider: token-bucket rate limits
+and a bounded, prioritized queue of generations
+"""
+
+import asyncio
+import hashlib
+import heapq
+import itertools
+import math
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Deque, Dict, List, Optional, Tuple
+
+from ..core.config import config
+
+
+class AdmissionError(Exception):
+    """A request turned away; retry_after is the suggested wait in seconds"""
+
+    status_code = 503
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+    @property
+    def retry_after_header(self) -> str:
+        """Value of the Retry-After header, in whole seconds"""
+        return str(max(1, math.ceil(self.retry_after)))
+
+
+class RateLimited(AdmissionError):
+    """A client, API key or the whole server used up its requests for the window"""
+
+    status_code = 429
+
+
+class Overloaded(AdmissionError):
+    """Every generation slot is busy and the queue is full or was waited on too long"""
+
+
+class TokenBucket:
+    """Allows a burst of capacity requests, refilled evenly over window seconds"""
+
+    __slots__ = ('capacity', 'rate', 'tokens', 'updated')
+
+    def __init__(self, capacity: int, window: float, now: float):
+        self.capacity = capacity
+        self.rate = capacity / window
+        self.tokens = float(capacity)
+        self.updated = now
+
+    def wait_time(self, now: float) -> float:
+        """Seconds until a token is available (0 if one is now)"""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def take(self):
+        """Use up one token"""
+        self.tokens -= 1
+
+
+class RateLimiter:
+    """
+    Token buckets per client, per API key and for the whole server
+
+    Each client address and each API key may make `requests` requests per
+    `window` seconds, with bursts of up to `requests`; `global_requests`
+    caps all requests together. A request takes a token from every bucket
+    that applies, or from none if any of them is empty. Buckets of at most
+    max_keys clients and keys are kept, least recently used first out.
+    """
+
+    def __init__(self, requests: Optional[int] = None, window: Optional[float] = None,
+                 global_requests: Optional[int] = None, max_keys: int = 10000,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            requests: Requests per window of each client and API key, 0 for no
+                limit (defaults to RATE_LIMIT_REQUESTS)
+            window: Window in seconds (defaults to RATE_LIMIT_WINDOW)
+            global_requests: Requests per window of the whole server, 0 for no
+                limit (defaults to RATE_LIMIT_GLOBAL_REQUESTS)
+            max_keys: Client and API key buckets kept
+            clock: Monotonic time source
+        """
+        self.requests = config.rate_limit_requests if requests is None else requests
+        self.window = float(config.rate_limit_window if window is None else window)
+        self.global_requests = config.rate_limit_global_requests if global_requests is None else global_requests
+        self.max_keys = max_keys
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._buckets: "OrderedDict[Tuple[str, str], TokenBucket]" = OrderedDict()
+        self._global: Optional[TokenBucket] = None
+        self.limited = {'client': 0, 'api_key': 0, 'global': 0}
+
+    def acquire(self, client: Optional[str] = None, api_key: Optional[str] = None):
+        """
+        Admit one request
+
+        Args:
+            client: Address of the client
+            api_key: API key the request carries
+
+        Raises:
+            RateLimited: A bucket is empty; retry_after says when it has a token again
+        """
+        with self._lock:
+            now = self._clock()
+            buckets: List[Tuple[str, TokenBucket]] = []
+            if self.requests > 0:
+                if client:
+                    buckets.append(('client', self._bucket('client', client, now)))
+                if api_key:
+                    # Only a digest of the key is kept in memory
+                    digest = hashlib.sha256(api_key.encode()).hexdigest()
+                    buckets.append(('api_key', self._bucket('api_key', digest, now)))
+            if self.global_requests > 0:
+                if self._global is None:
+                    self._global = TokenBucket(self.global_requests, self.window, now)
+                buckets.append(('global', self._global))
+
+            waits = [(bucket.wait_time(now), scope) for scope, bucket in buckets]
+            wait, scope = max(waits, default=(0.0, None))
+            if wait > 0:
+                self.limited[scope] += 1
+                raise RateLimited(f"Rate limit exceeded ({scope}); retry in {wait:.1f}s", wait)
+            for _, bucket in buckets:
+                bucket.take()
+
+    def _bucket(self, scope: str, key: str, now: float) -> TokenBucket:
+        """Bucket of a client or API key, created full (lock held)"""
+        bucket = self._buckets.get((scope, key))
+        if bucket is None:
+            bucket = self._buckets[(scope, key)] = TokenBucket(self.requests, self.window, now)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end((scope, key))
+        return bucket
+
+    def stats(self) -> Dict[str, Any]:
+        """Rejections per scope and the number of tracked clients and keys"""
+        with self._lock:
+            return {'limited': dict(self.limited), 'tracked_keys': len(self._buckets)}
+
+
+# Priority classes of generations, most urgent first: live chat, bulk jobs,
+# and work the assistant does for itself such as summarization
+PRIORITIES = ('interactive', 'batch', 'background')
+
+
+class GenerationSlot:
+    """Permission to run one generation; release it when the generation is over"""
+
+    __slots__ = ('_gate', 'priority', '_acquired', 'released')
+
+    def __init__(self, gate: "ConcurrencyGate", priority: str):
+        self._gate = gate
+        self.priority = priority
+        self._acquired = time.monotonic()
+        self.released = False
+
+    def release(self):
+        """Hand the slot to the next scheduled request (repeated calls do nothing)"""
+        if not self.released:
+            self.released = True
+            self._gate._release(self.priority, time.monotonic() - self._acquired)
+
+
+class _Waiter:
+    """A request queued for a slot"""
+
+    __slots__ = ('future', 'priority', 'tenant')
+
+    def __init__(self, future: asyncio.Future, priority: str, tenant: str):
+        self.future = future
+        self.priority = priority
+        self.tenant = tenant
+
+
+class _ClassStatistics:
+    """Counters and recent waits of one priority class"""
+
+    __slots__ = ('admitted', 'completed', 'rejected', 'preempted', 'timed_out', 'held', 'waits')
+
+    def __init__(self):
+        self.admitted = 0
+        self.completed = 0
+        self.rejected = 0
+        self.preempted = 0
+        self.timed_out = 0
+        self.held = 0.0
+        self.waits: Deque[float] = deque(maxlen=1000)
+
+    def summary(self, queued: int, elapsed: float) -> Dict[str, Any]:
+        """Counters, wait percentiles of the recent requests, generation time and throughput"""
+        waits = sorted(self.waits)
+
+        def percentile(fraction: float) -> float:
+            return waits[min(len(waits) - 1, int(fraction * len(waits)))] * 1000 if waits else 0.0
+
+        return {
+            'queued': queued,
+            'admitted': self.admitted,
+            'completed': self.completed,
+            'rejected': self.rejected,
+            'preempted': self.preempted,
+            'timed_out': self.timed_out,
+            'wait_p50_ms': percentile(0.5),
+            'wait_p99_ms': percentile(0.99),
+            'generation_avg_ms': self.held / self.completed * 1000 if self.completed else 0.0,
+            'completed_per_s': self.completed / elapsed if elapsed > 0 else 0.0,
+        }
+
+
+class ConcurrencyGate:
+    """
+    Scheduler of the generations sent to the model provider
+
+    Up to `limit` generations run at the same time; up to `queue_size`
+    further requests wait for a slot, each for at most `timeout` seconds.
+    Free slots go to the most urgent priority class with waiting requests
+    (see PRIORITIES). Within a class, tenants share the slots by weighted
+    fair queuing (start-time fair queuing over the request cost), so one
+    tenant's burst does not hold up the others. When the queue is full, a
+    request pushes out the newest waiting request of a less urgent class,
+    which is rejected; running generations are never interrupted. A request
+    that finds no room, or waits too long, is rejected with Overloaded and
+    a retry-after estimate based on how long generations hold their slot.
+    Used from one event loop.
+    """
+
+    def __init__(self, limit: Optional[int] = None, queue_size: Optional[int] = None,
+                 timeout: Optional[float] = None, weights: Optional[Dict[str, float]] = None):
+        """
+        Args:
+            limit: Concurrent generations, 0 for no limit (defaults to MAX_CONCURRENT_GENERATIONS)
+            queue_size: Requests allowed to wait (defaults to GENERATION_QUEUE_SIZE)
+            timeout: Seconds a request may wait (defaults to GENERATION_QUEUE_TIMEOUT)
+            weights: Share of each tenant within a class (tenants not listed weigh 1)
+        """
+        self.limit = config.max_concurrent_generations if limit is None else limit
+        self.queue_size = config.generation_queue_size if queue_size is None else queue_size
+        self.timeout = config.generation_queue_timeout if timeout is None else timeout
+        self.weights = weights or {}
+        self.active = 0
+        # Per class: heap of (start tag, arrival, waiter), the virtual time and
+        # the finish tag of each tenant's last queued request
+        self._queues: Dict[str, List[Tuple[float, int, _Waiter]]] = {priority: [] for priority in PRIORITIES}
+        self._virtual_time = dict.fromkeys(PRIORITIES, 0.0)
+        self._finish_tags: Dict[str, Dict[str, float]] = {priority: {} for priority in PRIORITIES}
+        self._queued = dict.fromkeys(PRIORITIES, 0)
+        self._arrivals = itertools.count()
+        self._classes = {priority: _ClassStatistics() for priority in PRIORITIES}
+        self._started = time.monotonic()
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.max_queued = 0
+        self._waited = 0.0
+        self._longest_wait = 0.0
+        self._held = 0.0
+        self._releases = 0
+
+    @property
+    def queued(self) -> int:
+        """Requests waiting for a slot"""
+        return sum(self._queued.values())
+
+    async def acquire(self, priority: str = 'interactive', tenant: Optional[str] = None,
+                      cost: float = 1.0) -> GenerationSlot:
+        """
+        Wait for a generation slot
+
+        Args:
+            priority: Class of the request, one of PRIORITIES
+            tenant: Whose request it is, for fair sharing within the class
+            cost: Relative size of the request, e.g. its token budget
+
+        Returns:
+            The slot, to be released when the generation is over
+
+        Raises:
+            ValueError: Unknown priority
+            Overloaded: No room in the queue, the wait exceeded the timeout,
+                or a more urgent request took the place in the queue
+        """
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority {priority!r}; expected one of {', '.join(PRIORITIES)}")
+        statistics = self._classes[priority]
+        start = time.monotonic()
+        if self.limit <= 0 or (self.active < self.limit and not self.queued):
+            self.active += 1
+        else:
+            if self.queued >= self.queue_size and not self._preempt(priority):
+                self.rejected += 1
+                statistics.rejected += 1
+                raise Overloaded(f"Server busy: {self.active} generations running and "
+                                 f"{self.queued} waiting", self.retry_after())
+            waiter = self._enqueue(priority, tenant or "", cost)
+            try:
+                await asyncio.wait_for(waiter.future, self.timeout)
+            except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+                if waiter.future.cancelled():
+                    # Still queued: its heap entry is skipped when reached
+                    self._queued[priority] -= 1
+                    self._forget_if_idle(priority)
+                else:
+                    # The slot was handed over just as the wait ended
+                    self._hand_over()
+                if isinstance(e, asyncio.TimeoutError):
+                    self.timed_out += 1
+                    statistics.timed_out += 1
+                    raise Overloaded(f"Server busy: no generation slot within {self.timeout:g}s",
+                                     self.retry_after()) from None
+                raise
+        wait = time.monotonic() - start
+        self.admitted += 1
+        statistics.admitted += 1
+        statistics.waits.append(wait)
+        self._waited += wait
+        self._longest_wait = max(self._longest_wait, wait)
+        return GenerationSlot(self, priority)
+
+    @asynccontextmanager
+    async def slot(self, priority: str = 'interactive', tenant: Optional[str] = None,
+                   cost: float = 1.0) -> AsyncIterator[GenerationSlot]:
+        """Hold a generation slot for the duration of the block (see acquire())"""
+        slot = await self.acquire(priority, tenant, cost)
+        try:
+            yield slot
+        finally:
+            slot.release()
+
+    def _enqueue(self, priority: str, tenant: str, cost: float) -> _Waiter:
+        """Queue a request, tagged with its virtual start time"""
+        finish_tags = self._finish_tags[priority]
+        start_tag = max(self._virtual_time[priority], finish_tags.get(tenant, 0.0))
+        finish_tags[tenant] = start_tag + cost / self.weights.get(tenant, 1.0)
+        waiter = _Waiter(asyncio.get_running_loop().create_future(), priority, tenant)
+        heapq.heappush(self._queues[priority], (start_tag, next(self._arrivals), waiter))
+        self._queued[priority] += 1
+        self.max_queued = max(self.max_queued, self.queued)
+        return waiter
+
+    def _preempt(self, priority: str) -> bool:
+        """Reject the newest waiting request of the least urgent class below priority"""
+        for lower in reversed(PRIORITIES):
+            if lower == priority:
+                return False
+            waiting = [entry for entry in self._queues[lower] if not entry[2].future.done()]
+            if waiting:
+                waiter = max(waiting)[2]
+                waiter.future.set_exception(Overloaded(f"Server busy: queued {lower} request "
+                                                       f"preempted by {priority} work", self.retry_after()))
+                self._queued[lower] -= 1
+                self._classes[lower].preempted += 1
+                self._forget_if_idle(lower)
+                return True
+        return False
+
+    def _forget_if_idle(self, priority: str):
+        """Reset the fair-queuing state of a class once nothing of it waits"""
+        if not self._queued[priority]:
+            self._queues[priority].clear()
+            self._finish_tags[priority].clear()
+            self._virtual_time[priority] = 0.0
+
+    def _release(self, priority: str, held: float):
+        """Account for a finished generation and pass its slot on"""
+        self._classes[priority].completed += 1
+        self._classes[priority].held += held
+        self._held += held
+        self._releases += 1
+        self._hand_over()
+
+    def _hand_over(self):
+        """Give a free slot to the next scheduled waiter, or free it"""
+        for priority in PRIORITIES:
+            queue = self._queues[priority]
+            while queue:
+                start_tag, _, waiter = heapq.heappop(queue)
+                if waiter.future.done():
+                    continue
+                self._queued[priority] -= 1
+                self._virtual_time[priority] = start_tag
+                self._forget_if_idle(priority)
+                waiter.future.set_result(None)
+                return
+        self.active -= 1
+
+    def retry_after(self) -> float:
+        """Estimated seconds until a new request would get a slot"""
+        average = self._held / self._releases if self._releases else 1.0
+        return average * (self.queued + 1) / max(self.limit, 1)
+
+    def stats(self) -> Dict[str, Any]:
+        """Slots in use, queue depth and waiting times, overall and per priority class"""
+        elapsed = time.monotonic() - self._started
+        return {
+            'limit': self.limit,
+            'active': self.active,
+            'queued': self.queued,
+            'max_queued': self.max_queued,
+            'admitted': self.admitted,
+            'rejected': self.rejected,
+            'timed_out': self.timed_out,
+            'wait_avg_ms': self._waited / self.admitted * 1000 if self.admitted else 0.0,
+            'wait_max_ms': self._longest_wait * 1000,
+            'classes': {priority: statistics.summary(self._queued[priority], elapsed)
+                        for priority, statistics in self._classes.items()},
+        }
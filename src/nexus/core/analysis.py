@@ -0,0 +1,272 @@
+"""
+Single-pass text analysis shared by quality scoring, insight extraction
+and prompt adaptation
+"""
+
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable, List, Optional
+
+
+# Keyword tables; all matching is by substring of the lowercased text
+
+# Topics detected when learning from a conversation
+TOPIC_KEYWORDS: Dict[str, List[str]] = {
+    'programming': ['code', 'function', 'python', 'javascript', 'algorithm', 'debug'],
+    'science': ['research', 'experiment', 'hypothesis', 'data', 'analysis'],
+    'creative': ['write', 'poem', 'story', 'creative', 'art', 'design'],
+    'technical': ['system', 'network', 'server', 'database', 'API'],
+    'learning': ['learn', 'understand', 'explain', 'teach', 'how']
+}
+
+# Topics used to pick learned adaptations for the system prompt
+PROMPT_TOPIC_KEYWORDS: Dict[str, List[str]] = {
+    'programming': ['code', 'function', 'python', 'javascript', 'algorithm'],
+    'science': ['research', 'experiment', 'data', 'analysis'],
+    'creative': ['write', 'poem', 'story', 'creative', 'art'],
+    'technical': ['system', 'network', 'server', 'database']
+}
+
+ENGAGEMENT_MARKERS = ['?', 'example', 'imagine', 'consider', 'let me', 'here\'s']
+TECHNICAL_TERMS = ['function', 'algorithm', 'data', 'system', 'process', 'method']
+HELP_WORDS = ['help', 'assist', 'support']
+CREATION_WORDS = ['create', 'make', 'build']
+CONVERSATIONAL_MARKERS = ['!', '?', '...']
+CODE_FENCE = '```'
+
+
+def _all_keywords() -> List[str]:
+    """Every keyword the matcher has to find"""
+    keywords = set(ENGAGEMENT_MARKERS + TECHNICAL_TERMS + HELP_WORDS + CREATION_WORDS
+                   + CONVERSATIONAL_MARKERS + [CODE_FENCE])
+    for table in (TOPIC_KEYWORDS, PROMPT_TOPIC_KEYWORDS):
+        for words in table.values():
+            keywords.update(words)
+    # Keywords with capitals can never occur in lowercased text ('API'), as before
+    return sorted(keyword for keyword in keywords if keyword == keyword.lower())
+
+
+def _trie_pattern(words: Iterable[str]) -> str:
+    """
+    Regex alternation of words arranged as a trie, longest match first
+
+    Sharing prefixes ('data', 'database', 'debug') lets a failed position be
+    rejected after a character or two instead of trying every keyword.
+    """
+    trie: Dict[str, dict] = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def build(node: Dict[str, dict]) -> str:
+        ends_here = '' in node
+        branches = [re.escape(char) + build(child)
+                    for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+        return f"(?:{body})?" if ends_here else body
+
+    return build(trie)
+
+
+class KeywordMatcher:
+    """
+    Finds which of many keywords occur anywhere in a text
+
+    One precompiled regex holds all keywords. A lookahead at every position
+    reports the longest keyword starting there, and shorter keywords
+    contained in it come from a precomputed table, so the result equals
+    checking `keyword in text` for each keyword.
+
+    Keywords without whitespace can only occur inside a whitespace-delimited
+    token, so the regex runs once per distinct token and the result per token
+    is cached; across responses most tokens are repeats. Keywords containing
+    whitespace are checked against the full text.
+    """
+
+    def __init__(self, keywords: Iterable[str], cache_size: int = 65536):
+        self.keywords = sorted(set(keywords))
+        self._phrases = [keyword for keyword in self.keywords if len(keyword.split()) != 1]
+        self._regex = re.compile(f"(?=({_trie_pattern(self.keywords)}))")
+        self._implied = {
+            keyword: frozenset(other for other in self.keywords if other in keyword)
+            for keyword in self.keywords
+        }
+        self._scan_token = lru_cache(maxsize=cache_size)(self._scan)
+
+    def find(self, text: str, tokens: Optional[Iterable[str]] = None) -> FrozenSet[str]:
+        """
+        Keywords occurring in text as substrings
+
+        Args:
+            text: The text to search
+            tokens: text.split(), if the caller already has it
+        """
+        found = set()
+        for token in set(text.split() if tokens is None else tokens):
+            keywords = self._scan_token(token)
+            if keywords:
+                found.update(keywords)
+        for phrase in self._phrases:
+            if phrase in text:
+                found.add(phrase)
+        return frozenset(found)
+
+    def _scan(self, text: str) -> FrozenSet[str]:
+        """Run the regex over a text, adding keywords implied by each match"""
+        found = set()
+        for match in self._regex.finditer(text):
+            keyword = match.group(1)
+            if keyword not in found:
+                found.update(self._implied[keyword])
+        return frozenset(found)
+
+
+_MATCHER = KeywordMatcher(_all_keywords())
+
+
+@dataclass(frozen=True)
+class TextProfile:
+    """Everything the heuristics need to know about one text, computed once"""
+
+    word_count: int
+    tokens: FrozenSet[str]
+    keywords: FrozenSet[str]
+    length: int
+    sentence_count: int
+    sentence_words: int
+
+    def has_any(self, words: Iterable[str]) -> bool:
+        """Whether any of the words occurs in the text"""
+        return any(word in self.keywords for word in words)
+
+    def topics(self, table: Dict[str, List[str]] = TOPIC_KEYWORDS) -> List[str]:
+        """Topics of a keyword table whose keywords occur, in table order"""
+        return [topic for topic, words in table.items() if self.has_any(words)]
+
+
+@dataclass(frozen=True)
+class ConversationAnalysis:
+    """Profiles of a user input and the response to it"""
+
+    user: TextProfile
+    response: TextProfile
+
+
+@lru_cache(maxsize=256)
+def profile_text(text: str) -> TextProfile:
+    """
+    Tokenize and keyword-match a text in a single pass
+
+    Results are cached, so the prompt adaptation before a response and the
+    learning step after it share the analysis of the user input.
+    """
+    lowered = text.lower()
+    tokens = lowered.split()
+    distinct = frozenset(tokens)
+    return TextProfile(
+        word_count=len(tokens),
+        tokens=distinct,
+        keywords=_MATCHER.find(lowered, distinct),
+        length=len(text),
+        sentence_count=text.count('.') + 1,
+        # Words of all text.split('.') segments together
+        sentence_words=len(lowered.replace('.', ' ').split()),
+    )
+
+
+class IncrementalAnalyzer:
+    """
+    Builds the TextProfile of a text that arrives in chunks, as it streams
+
+    Each chunk is analyzed as it is fed: complete whitespace-delimited
+    tokens update the counts and keyword hits right away, and only the
+    unfinished last token is held back. finish() returns the same profile as
+    profile_text() on the whole text without another pass over it.
+    """
+
+    def __init__(self, matcher: KeywordMatcher = _MATCHER):
+        self._matcher = matcher
+        # Characters of lowered text kept to find phrases spanning chunks
+        self._overlap = max((len(phrase) - 1 for phrase in matcher._phrases), default=0)
+        self._pending = ''
+        self._tail = ''
+        self._tokens = set()
+        self._keywords = set()
+        self._word_count = 0
+        self._sentence_words = 0
+        self._length = 0
+        self._dots = 0
+        self._fences = 0
+        self._profile: Optional[TextProfile] = None
+
+    @property
+    def in_code_block(self) -> bool:
+        """Whether the text so far ends inside a ``` code block"""
+        return self._fences % 2 == 1
+
+    def feed(self, chunk: str):
+        """Analyze the next chunk of the text"""
+        if self._profile is not None:
+            raise ValueError("The analysis is already finished")
+        self._length += len(chunk)
+        self._dots += chunk.count('.')
+
+        text = self._pending + chunk
+        # Everything up to the last whitespace is made of complete tokens
+        cut = self._last_space(text) + 1
+        self._pending = text[cut:]
+        if cut:
+            self._consume(text[:cut])
+
+    def finish(self) -> TextProfile:
+        """Profile of the whole text fed so far"""
+        if self._profile is None:
+            if self._pending:
+                self._consume(self._pending)
+                self._pending = ''
+            self._profile = TextProfile(
+                word_count=self._word_count,
+                tokens=frozenset(self._tokens),
+                keywords=frozenset(self._keywords),
+                length=self._length,
+                sentence_count=self._dots + 1,
+                sentence_words=self._sentence_words,
+            )
+        return self._profile
+
+    @staticmethod
+    def _last_space(text: str) -> int:
+        """Index of the last whitespace character, or -1"""
+        for i in range(len(text) - 1, -1, -1):
+            if text[i].isspace():
+                return i
+        return -1
+
+    def _consume(self, text: str):
+        """Add complete tokens (and the whitespace between them) to the analysis"""
+        # Lowercasing never looks across whitespace, so piecewise equals whole
+        lowered = text.lower()
+        for token in lowered.split():
+            self._word_count += 1
+            self._sentence_words += len(token.replace('.', ' ').split())
+            self._fences += token.count(CODE_FENCE)
+            if token not in self._tokens:
+                self._tokens.add(token)
+                self._keywords.update(self._matcher._scan_token(token))
+
+        if self._overlap:
+            window = self._tail + lowered
+            for phrase in self._matcher._phrases:
+                if phrase in window:
+                    self._keywords.add(phrase)
+            self._tail = window[-self._overlap:]
+
+
+def analyze_conversation(user_input: str, assistant_response: str) -> ConversationAnalysis:
+    """Profile both sides of a conversation"""
+    return ConversationAnalysis(profile_text(user_input), profile_text(assistant_response))
@@ -2,25 +2,49 @@
 Core AI Assistant implementation for Nexus
 """
 
+import asyncio
 import openai
 import ollama
+import threading
 import time
-from typing import List, Dict, Any, Optional
+from dataclasses import dataclass
+from functools import partial
+from typing import List, Dict, Any, AsyncIterator, Iterator, Optional
 from datetime import datetime
+from ..core.analysis import ConversationAnalysis, IncrementalAnalyzer, profile_text
 from ..core.config import config
+from ..core.degradation import DegradationController
 from ..core.learning import SelfImprovementEngine
 from ..utils.logger import nexus_logger
 
 
 class ConversationMemory:
-    """Manages conversation history and context"""
+    """
+    Manages conversation history and context
+    
+    Safe to share between threads: every change happens under a lock, and
+    a question is only recorded together with its answer, so turns running
+    at the same time never interleave in the history.
+    """
     
     def __init__(self, max_size: int = 10):
         self.max_size = max_size
         self.messages: List[Dict[str, str]] = []
+        self._lock = threading.Lock()
     
     def add_message(self, role: str, content: str):
         """Add a message to conversation history"""
+        with self._lock:
+            self._append(role, content)
+    
+    def add_exchange(self, question: str, answer: str):
+        """Add a question and its answer as one step"""
+        with self._lock:
+            self._append("user", question)
+            self._append("assistant", answer)
+    
+    def _append(self, role: str, content: str):
+        """Append a message and trim the history (lock held)"""
         message = {
             "role": role,
             "content": content,
@@ -34,12 +58,44 @@ class ConversationMemory:
     
     def get_context(self) -> List[Dict[str, str]]:
         """Get conversation context for OpenAI API"""
-        return [{"role": msg["role"], "content": msg["content"]} 
-                for msg in self.messages]
+        with self._lock:
+            return [{"role": msg["role"], "content": msg["content"]} 
+                    for msg in self.messages]
+    
+    def context_for(self, question: str, system_prompt: Optional[str] = None) -> List[Dict[str, str]]:
+        """
+        Messages to send for a new question, leaving the history untouched
+        
+        Args:
+            question: The user's question, appended to the context
+            system_prompt: Replaces the leading system message in this request only
+            
+        Returns:
+            A fresh message list owned by the caller
+        """
+        messages = self.get_context()
+        if system_prompt is not None and messages and messages[0]['role'] == 'system':
+            messages[0] = {"role": "system", "content": system_prompt}
+        messages.append({"role": "user", "content": question})
+        return messages
+    
+    def clear(self, system_prompt: Optional[str] = None):
+        """Clear conversation history, optionally starting over with a system prompt"""
+        with self._lock:
+            self.messages.clear()
+            if system_prompt is not None:
+                self._append("system", system_prompt)
+
+
+@dataclass
+class TurnResult:
+    """Outcome of one question and answer, filled in by the async ask methods"""
     
-    def clear(self):
-        """Clear conversation history"""
-        self.messages.clear()
+    response: str = ""
+    conversation_id: Optional[str] = None
+    response_time: float = 0.0
+    error: Optional[str] = None
+    cancelled: bool = False
 
 
 class AIAssistant:
@@ -55,6 +111,12 @@ class AIAssistant:
         
         # Initialize learning engine
         self.learning_engine = SelfImprovementEngine()
+        # Makes answers cheaper while latency exceeds its objective
+        self.degradation = DegradationController()
+        # ID of the conversation stored by the last successful ask()
+        self.last_conversation_id: Optional[str] = None
+        # Client for the async methods, created on first use
+        self._async_client = None
         
         # Initialize the appropriate client based on provider
         if self.model_provider == "openai":
@@ -123,77 +185,58 @@ class AIAssistant:
         self.logger.info(f"AI Assistant initialized successfully with {self.model_provider} provider")
         self.logger.info(f"Using model: {self.model_name}")
     
-    def ask(self, question: str, **kwargs) -> str:
+    def ask(self, question: str, memory: Optional[ConversationMemory] = None,
+            result: Optional[TurnResult] = None, **kwargs) -> str:
         """
         Ask a question to the AI assistant with learning capabilities
         
         Args:
             question: The user's question or prompt
+            memory: Conversation to continue (defaults to this assistant's own)
+            result: Receives the conversation ID and timing of the turn
             **kwargs: Additional parameters for the API
             
         Returns:
-            The assistant's response
+            The assistant's response; its conversation ID is kept in
+            last_conversation_id for provide_feedback
         """
+        memory = memory or self.memory
+        result = result if result is not None else TurnResult()
         start_time = time.time()
+        self.last_conversation_id = None
         
         try:
             self.logger.info(f"Processing question: {question[:100]}...")
+            if self._answer_from_cache(question, memory, result, start_time):
+                return result.response
             
             # Get adaptive prompt enhancement based on learning
             enhanced_prompt = self.learning_engine.get_adaptive_prompt_enhancement(
                 question, self.system_prompt
             )
             
-            # Temporarily update system prompt for this interaction
-            original_system = self.memory.messages[0] if self.memory.messages else None
-            if original_system and original_system['role'] == 'system':
-                self.memory.messages[0] = {"role": "system", "content": enhanced_prompt}
-            
-            # Add user message to memory
-            self.memory.add_message("user", question)
-            
-            # Prepare messages for API call
-            messages = self.memory.get_context()
-            
-            # Make API call based on provider
-            if self.model_provider == "openai":
-                response = self.client.chat.completions.create(
-                    model=self.model_name,
-                    messages=messages,
-                    max_tokens=kwargs.get("max_tokens", config.max_tokens),
-                    temperature=kwargs.get("temperature", config.temperature),
-                    **kwargs
-                )
-                assistant_response = response.choices[0].message.content
-                
-            elif self.model_provider == "ollama":
-                response = self.client.chat(
-                    model=self.model_name,
-                    messages=messages,
-                    options={
-                        'temperature': kwargs.get("temperature", config.temperature),
-                        'num_predict': kwargs.get("max_tokens", config.max_tokens),
-                    }
-                )
-                assistant_response = response['message']['content']
+            # The enhanced prompt goes into this request only, so turns running
+            # in other threads never see it
+            messages = self.degradation.current().apply(memory.context_for(question, enhanced_prompt), kwargs)
+            assistant_response = self._complete(messages, **kwargs)
             
             # Calculate response time
             response_time = time.time() - start_time
+            self._answered(question, assistant_response, response_time)
             
-            # Add assistant response to memory
-            self.memory.add_message("assistant", assistant_response)
-            
-            # Restore original system prompt
-            if original_system:
-                self.memory.messages[0] = original_system
+            memory.add_exchange(question, assistant_response)
             
             # Auto-analyze conversation quality for learning
-            self.learning_engine.learn_from_feedback(
+            learning = self.learning_engine.learn_from_feedback(
                 user_input=question,
                 assistant_response=assistant_response,
                 feedback=0,  # Neutral feedback for auto-analysis
-                context={'response_time': response_time}
+                context={'response_time': response_time, 'model': kwargs.get('model') or self.model_name}
             )
+            self.last_conversation_id = learning['conversation_id']
+            result.response = assistant_response
+            result.conversation_id = learning['conversation_id']
+            result.response_time = response_time
             
             self.logger.info(f"Question processed successfully in {response_time:.2f}s")
             return assistant_response
@@ -201,7 +244,165 @@ class AIAssistant:
         except Exception as e:
             error_msg = f"Error processing question: {str(e)}"
             self.logger.error(error_msg)
-            return f"Sorry, I encountered an error: {str(e)}"
+            self.degradation.record(time.time() - start_time)
+            result.error = str(e)
+            result.response = f"Sorry, I encountered an error: {str(e)}"
+            return result.response
+    
+    def ask_stream(self, question: str, memory: Optional[ConversationMemory] = None,
+                   result: Optional[TurnResult] = None, **kwargs) -> Iterator[str]:
+        """
+        Ask a question and receive the response in chunks as it is generated
+        
+        The response is analyzed while it streams, so learning from it takes
+        no extra pass over the full text once the last chunk has arrived.
+        
+        Args:
+            question: The user's question or prompt
+            memory: Conversation to continue (defaults to this assistant's own)
+            result: Receives the full response, conversation ID and timing
+            **kwargs: Additional parameters for the API
+            
+        Yields:
+            Pieces of the assistant's response; afterwards its conversation ID
+            is kept in last_conversation_id
+        """
+        memory = memory or self.memory
+        result = result if result is not None else TurnResult()
+        start_time = time.time()
+        self.last_conversation_id = None
+        
+        try:
+            self.logger.info(f"Streaming answer to: {question[:100]}...")
+            if self._answer_from_cache(question, memory, result, start_time):
+                yield result.response
+                return
+            
+            # Get adaptive prompt enhancement based on learning
+            enhanced_prompt = self.learning_engine.get_adaptive_prompt_enhancement(
+                question, self.system_prompt
+            )
+            
+            messages = self.degradation.current().apply(memory.context_for(question, enhanced_prompt), kwargs)
+            
+            analyzer = IncrementalAnalyzer()
+            parts = []
+            for chunk in self._stream_completion(messages, **kwargs):
+                analyzer.feed(chunk)
+                parts.append(chunk)
+                yield chunk
+            
+            assistant_response = "".join(parts)
+            response_time = time.time() - start_time
+            self._answered(question, assistant_response, response_time)
+            memory.add_exchange(question, assistant_response)
+            
+            # The user input's profile is cached from the prompt enhancement
+            learning = self.learning_engine.learn_from_feedback(
+                user_input=question,
+                assistant_response=assistant_response,
+                feedback=0,  # Neutral feedback for auto-analysis
+                context={'response_time': response_time, 'model': kwargs.get('model') or self.model_name},
+                conversation=ConversationAnalysis(profile_text(question), analyzer.finish())
+            )
+            self.last_conversation_id = learning['conversation_id']
+            result.response = assistant_response
+            result.conversation_id = learning['conversation_id']
+            result.response_time = response_time
+            
+            self.logger.info(f"Streamed answer completed in {response_time:.2f}s")
+            
+        except Exception as e:
+            error_msg = f"Error processing question: {str(e)}"
+            self.logger.error(error_msg)
+            self.degradation.record(time.time() - start_time)
+            result.error = str(e)
+            yield f"Sorry, I encountered an error: {str(e)}"
+    
+    def _answer_from_cache(self, question: str, memory: ConversationMemory, result: TurnResult,
+                           start_time: float) -> bool:
+        """
+        Answer a repeated question from the cache while degraded to cached answers
+        
+        Cached answers are neither timed for the latency objective nor learned from.
+        
+        Returns:
+            Whether the question was answered
+        """
+        if not self.degradation.current().use_cache:
+            return False
+        answer = self.degradation.cached_answer(question)
+        if answer is None:
+            return False
+        memory.add_exchange(question, answer)
+        result.response = answer
+        result.response_time = time.time() - start_time
+        self.logger.info("Answered from the cache to keep latency within its objective")
+        return True
+    
+    def _answered(self, question: str, response: str, response_time: float):
+        """Report a model answer to the degradation controller"""
+        self.degradation.record(response_time)
+        self.degradation.remember(question, response)
+    
+    def _complete(self, messages: List[Dict[str, str]], **kwargs) -> str:
+        """Request a completion from the provider"""
+        max_tokens = kwargs.pop("max_tokens", config.max_tokens)
+        temperature = kwargs.pop("temperature", config.temperature)
+        model = kwargs.pop("model", None) or self.model_name
+        
+        if self.model_provider == "openai":
+            response = self.client.chat.completions.create(
+                model=model,
+                messages=messages,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                **kwargs
+            )
+            return response.choices[0].message.content
+        
+        response = self.client.chat(
+            model=model,
+            messages=messages,
+            options={
+                'temperature': temperature,
+                'num_predict': max_tokens,
+            }
+        )
+        return response['message']['content']
+    
+    def _stream_completion(self, messages: List[Dict[str, str]], **kwargs) -> Iterator[str]:
+        """Request a streamed completion from the provider and yield its text pieces"""
+        max_tokens = kwargs.pop("max_tokens", config.max_tokens)
+        temperature = kwargs.pop("temperature", config.temperature)
+        model = kwargs.pop("model", None) or self.model_name
+        
+        if self.model_provider == "openai":
+            stream = self.client.chat.completions.create(
+                model=model,
+                messages=messages,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                stream=True,
+                **kwargs
+            )
+            for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        
+        elif self.model_provider == "ollama":
+            stream = self.client.chat(
+                model=model,
+                messages=messages,
+                options={
+                    'temperature': temperature,
+                    'num_predict': max_tokens,
+                },
+                stream=True
+            )
+            for chunk in stream:
+                if chunk['message']['content']:
+                    yield chunk['message']['content']
     
     def chat(self, message: str) -> str:
         """
@@ -217,8 +418,7 @@ class AIAssistant:
     
     def reset_conversation(self):
         """Reset the conversation memory"""
-        self.memory.clear()
-        self.memory.add_message("system", self.system_prompt)
+        self.memory.clear(self.system_prompt)
         self.logger.info("Conversation reset")
     
     def get_conversation_history(self) -> List[Dict[str, Any]]:
@@ -236,35 +436,296 @@ class AIAssistant:
         self.reset_conversation()
         self.logger.info("System prompt updated")
     
-    async def ask_async(self, question: str, **kwargs) -> str:
+    def new_memory(self) -> ConversationMemory:
+        """Memory for a separate conversation, starting with the system prompt"""
+        memory = ConversationMemory(config.conversation_memory_size)
+        memory.add_message("system", self.system_prompt)
+        return memory
+    
+    @property
+    def async_client(self):
+        """Async client of the configured provider"""
+        if self._async_client is None:
+            if self.model_provider == "openai":
+                self._async_client = openai.AsyncOpenAI(api_key=config.openai_api_key)
+            else:
+                self._async_client = ollama.AsyncClient(host=config.ollama_host)
+        return self._async_client
+    
+    async def ask_async(self, question: str, memory: Optional[ConversationMemory] = None,
+                        result: Optional[TurnResult] = None, **kwargs) -> str:
         """
         Async version of ask method
         
+        The model is called with the provider's async client and the
+        database work runs in the default executor, so many questions can be
+        in flight on one event loop.
+        
         Args:
             question: The user's question or prompt
-            **kwargs: Additional parameters for the OpenAI API
+            memory: Conversation to continue (defaults to this assistant's own)
+            result: Receives the conversation ID and timing of the turn
+            **kwargs: Additional parameters for the API
             
         Returns:
             The assistant's response
         """
-        # For now, just call the sync version
-        # In a real implementation, you'd use an async OpenAI client
-        return self.ask(question, **kwargs)
+        result = result if result is not None else TurnResult()
+        memory = memory or self.memory
+        start_time = time.time()
+        
+        try:
+            if self._answer_from_cache(question, memory, result, start_time):
+                return result.response
+            messages = await self._begin_turn_async(question, memory, kwargs)
+            result.response = await self._complete_async(messages, **kwargs)
+            await self._finish_turn_async(question, memory, result, start_time, model=kwargs.get('model'))
+            return result.response
+            
+        except Exception as e:
+            self.logger.error(f"Error processing question: {str(e)}")
+            self.degradation.record(time.time() - start_time)
+            result.error = str(e)
+            result.response = f"Sorry, I encountered an error: {str(e)}"
+            return result.response
+    
+    async def ask_stream_async(self, question: str, memory: Optional[ConversationMemory] = None,
+                               result: Optional[TurnResult] = None, **kwargs) -> AsyncIterator[str]:
+        """
+        Async version of ask_stream
+        
+        The turn can be aborted by cancelling the task consuming the stream
+        or closing the generator: the upstream request is closed at once,
+        the text generated so far is kept in memory as the answer and the
+        turn is not learned from.
+        
+        Args:
+            question: The user's question or prompt
+            memory: Conversation to continue (defaults to this assistant's own)
+            result: Receives the full response, conversation ID and timing
+                once the stream has ended (the partial response if aborted)
+            **kwargs: Additional parameters for the API
+            
+        Yields:
+            Pieces of the assistant's response
+        """
+        result = result if result is not None else TurnResult()
+        memory = memory or self.memory
+        start_time = time.time()
+        parts: List[str] = []
+        stream = None
+        generated = False
+        
+        try:
+            if self._answer_from_cache(question, memory, result, start_time):
+                generated = True
+                yield result.response
+                return
+            messages = await self._begin_turn_async(question, memory, kwargs)
+            analyzer = IncrementalAnalyzer()
+            stream = self._stream_completion_async(messages, **kwargs)
+            async for chunk in stream:
+                analyzer.feed(chunk)
+                parts.append(chunk)
+                yield chunk
+            
+            generated = True
+            result.response = "".join(parts)
+            await self._finish_turn_async(question, memory, result, start_time,
+                                          ConversationAnalysis(profile_text(question), analyzer.finish()),
+                                          model=kwargs.get('model'))
+            
+        except (asyncio.CancelledError, GeneratorExit):
+            if not generated:
+                self._abort_turn(question, memory, result, parts, start_time)
+            raise
+        except Exception as e:
+            self.logger.error(f"Error processing question: {str(e)}")
+            self.degradation.record(time.time() - start_time)
+            result.error = str(e)
+            yield f"Sorry, I encountered an error: {str(e)}"
+        finally:
+            if stream is not None:
+                await stream.aclose()
+    
+    def _abort_turn(self, question: str, memory: ConversationMemory, result: TurnResult,
+                    parts: List[str], start_time: float):
+        """Keep the partial answer of an aborted turn in memory, without learning from it"""
+        result.cancelled = True
+        result.response = "".join(parts)
+        result.response_time = time.time() - start_time
+        if parts:
+            memory.add_exchange(question, result.response)
+        self.logger.info(f"Turn aborted after {len(result.response)} characters")
+    
+    async def _begin_turn_async(self, question: str, memory: ConversationMemory,
+                                options: Dict[str, Any]) -> List[Dict[str, str]]:
+        """
+        Build the messages for the model; the question is recorded with its answer
+        
+        The generation options are adjusted in place to the degradation mode.
+        """
+        loop = asyncio.get_running_loop()
+        enhanced_prompt = await loop.run_in_executor(
+            None, self.learning_engine.get_adaptive_prompt_enhancement, question, self.system_prompt
+        )
+        
+        # The enhanced prompt replaces the system message in this request only,
+        # so concurrent turns never see each other's prompt
+        return self.degradation.current().apply(memory.context_for(question, enhanced_prompt), options)
+    
+    async def _finish_turn_async(self, question: str, memory: ConversationMemory, result: TurnResult,
+                                 start_time: float, conversation: Optional[ConversationAnalysis] = None,
+                                 model: Optional[str] = None):
+        """Record the exchange and learn from the turn"""
+        result.response_time = time.time() - start_time
+        self._answered(question, result.response, result.response_time)
+        memory.add_exchange(question, result.response)
+        result.conversation_id = await self.learn_async(question, result.response, result.response_time,
+                                                        model=model, conversation=conversation)
+        self.last_conversation_id = result.conversation_id
+    
+    async def learn_async(self, question: str, response: str, response_time: float,
+                          model: Optional[str] = None,
+                          conversation: Optional[ConversationAnalysis] = None) -> str:
+        """
+        Learn from a finished exchange in the default executor
+        
+        Returns:
+            ID of the stored conversation
+        """
+        loop = asyncio.get_running_loop()
+        learning = await loop.run_in_executor(None, partial(
+            self.learning_engine.learn_from_feedback,
+            user_input=question,
+            assistant_response=response,
+            feedback=0,  # Neutral feedback for auto-analysis
+            context={'response_time': response_time, 'model': model or self.model_name},
+            conversation=conversation
+        ))
+        return learning['conversation_id']
+    
+    async def generate_async(self, messages: List[Dict[str, str]], **kwargs) -> str:
+        """
+        Complete a whole message list, without prompt enhancement or memory
+        
+        For clients that send the full conversation with every request, such
+        as the OpenAI-compatible API. Provider errors are raised.
+        
+        Args:
+            messages: Chat messages, sent to the model unchanged
+            **kwargs: model, temperature, max_tokens and further API parameters
+            
+        Returns:
+            The model's response
+        """
+        return await self._complete_async(messages, **kwargs)
+    
+    def generate_stream_async(self, messages: List[Dict[str, str]], **kwargs) -> AsyncIterator[str]:
+        """Streaming version of generate_async, yielding the response in pieces"""
+        return self._stream_completion_async(messages, **kwargs)
+    
+    async def list_models_async(self) -> List[str]:
+        """Models the provider serves (for OpenAI, only the configured one)"""
+        if self.model_provider == "openai":
+            return [self.model_name]
+        response = await self.async_client.list()
+        return [model.model for model in response.models]
+    
+    async def _complete_async(self, messages: List[Dict[str, str]], **kwargs) -> str:
+        """Request a completion from the provider with the async client"""
+        max_tokens = kwargs.pop("max_tokens", config.max_tokens)
+        temperature = kwargs.pop("temperature", config.temperature)
+        model = kwargs.pop("model", None) or self.model_name
+        
+        if self.model_provider == "openai":
+            response = await self.async_client.chat.completions.create(
+                model=model,
+                messages=messages,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                **kwargs
+            )
+            return response.choices[0].message.content
+        
+        response = await self.async_client.chat(
+            model=model,
+            messages=messages,
+            options={
+                'temperature': temperature,
+                'num_predict': max_tokens,
+            }
+        )
+        return response['message']['content']
+    
+    async def _stream_completion_async(self, messages: List[Dict[str, str]], **kwargs) -> AsyncIterator[str]:
+        """Request a streamed completion with the async client and yield its text pieces"""
+        max_tokens = kwargs.pop("max_tokens", config.max_tokens)
+        temperature = kwargs.pop("temperature", config.temperature)
+        model = kwargs.pop("model", None) or self.model_name
+        
+        if self.model_provider == "openai":
+            stream = await self.async_client.chat.completions.create(
+                model=model,
+                messages=messages,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                stream=True,
+                **kwargs
+            )
+            try:
+                async for chunk in stream:
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        yield chunk.choices[0].delta.content
+            finally:
+                # Closing the response makes the server stop generating
+                await stream.close()
+            return
+        
+        stream = await self.async_client.chat(
+            model=model,
+            messages=messages,
+            options={
+                'temperature': temperature,
+                'num_predict': max_tokens,
+            },
+            stream=True
+        )
+        try:
+            async for chunk in stream:
+                if chunk['message']['content']:
+                    yield chunk['message']['content']
+        finally:
+            await stream.aclose()
     
     def provide_feedback(self, user_input: str, assistant_response: str, 
-                        feedback: int, context: Dict[str, Any] = None) -> Dict[str, Any]:
+                        feedback: int, context: Dict[str, Any] = None,
+                        conversation_id: Optional[str] = None) -> Dict[str, Any]:
         """
         Provide feedback on a conversation for learning
         
+        A conversation already stored by ask() is updated in place; it is
+        identified by conversation_id or, failing that, by its texts. Only
+        conversations not stored yet are analyzed and stored.
+        
         Args:
             user_input: The user's original input
             assistant_response: The assistant's response
             feedback: Feedback score (1: positive, 0: neutral, -1: negative)
             context: Additional context information
+            conversation_id: ID of the stored conversation (see last_conversation_id)
             
         Returns:
-            Learning analysis results
+            The conversation ID and quality score, plus the full learning
+            analysis when the conversation was newly stored
         """
+        if conversation_id is None:
+            conversation_id = self.learning_engine.db.find_conversation(user_input, assistant_response)
+        if conversation_id is not None:
+            result = self.learning_engine.record_feedback(conversation_id, feedback)
+            if result['updated']:
+                return result
+        
         return self.learning_engine.learn_from_feedback(
             user_input=user_input,
             assistant_response=assistant_response,
@@ -272,10 +733,50 @@ class AIAssistant:
             context=context
         )
     
-    def get_learning_stats(self) -> Dict[str, Any]:
-        """Get learning and improvement statistics"""
-        return self.learning_engine.get_learning_statistics()
+    def get_learning_stats(self, recompute: bool = False) -> Dict[str, Any]:
+        """
+        Get learning and improvement statistics
+        
+        Args:
+            recompute: Rebuild the maintained aggregates from raw data first
+            
+        Returns:
+            Learning statistics
+        """
+        return self.learning_engine.get_learning_statistics(recompute=recompute)
     
+    def get_rollup_stats(self, since: Optional[datetime] = None, granularity: str = 'day',
+                         by_model: bool = False) -> List[Dict[str, Any]]:
+        """
+        Get time-bucketed latency and quality statistics
+        
+        Args:
+            since: Start of the window in UTC (defaults to the last 7 days)
+            granularity: Bucket size, 'hour' or 'day'
+            by_model: Break each bucket down per model
+            
+        Returns:
+            Per-bucket statistics
+        """
+        return self.learning_engine.get_rollup_statistics(
+            since=since, granularity=granularity, by_model=by_model
+        )
+
+    def search_history(self, query: str, limit: int = 10, offset: int = 0, **kwargs) -> List[Dict[str, Any]]:
+        """
+        Search past conversations
+
+        Args:
+            query: Words to look for
+            limit: Maximum number of results
+            offset: Number of results to skip, for paging
+            **kwargs: raw / highlight options of LearningDatabase.search_conversations
+
+        Returns:
+            Ranked matches with highlighted snippets
+        """
+        return self.learning_engine.search_conversations(query, limit=limit, offset=offset, **kwargs)
+
     def continuous_improvement_summary(self) -> Dict[str, Any]:
         """Get a summary of continuous improvement progress"""
         stats = self.get_learning_stats()
@@ -0,0 +1,51 @@
+"""
+Content-addressed, compressed storage of conversation text
+"""
+
+import hashlib
+import sqlite3
+import zlib
+from typing import Optional, Tuple
+
+
+# Values of conversation_blobs.codec
+CODEC_NONE = 0
+CODEC_ZLIB = 1
+
+
+def text_hash(text: str) -> str:
+    """SHA-256 hash addressing a text in the blob table"""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def pack_text(text: str, threshold: int = 256) -> Tuple[bytes, int]:
+    """
+    Encode a text for storage, compressing it when that pays off
+
+    Args:
+        text: The text to store
+        threshold: Minimum size in bytes worth compressing
+
+    Returns:
+        The stored bytes and their codec
+    """
+    data = text.encode("utf-8")
+    if len(data) >= threshold:
+        compressed = zlib.compress(data, 6)
+        if len(compressed) < len(data):
+            return compressed, CODEC_ZLIB
+    return data, CODEC_NONE
+
+
+def unpack_text(data: Optional[bytes], codec: Optional[int]) -> Optional[str]:
+    """Decode bytes written by pack_text (None passes through)"""
+    if data is None:
+        return None
+    if codec == CODEC_ZLIB:
+        data = zlib.decompress(data)
+    return bytes(data).decode("utf-8")
+
+
+def register_functions(conn: sqlite3.Connection):
+    """Make nexus_inflate(data, codec) available to SQL on a connection"""
+    conn.create_function("nexus_inflate", 2, unpack_text, deterministic=True)
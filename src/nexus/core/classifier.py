@@ -0,0 +1,290 @@
+"""
+Hashed TF-IDF naive Bayes classifier for conversation topics and intents
+"""
+
+import io
+import re
+import zlib
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+from ..core.analysis import CREATION_WORDS, HELP_WORDS, TOPIC_KEYWORDS
+from ..core.config import config
+from ..core.learning import LearningDatabase, utc_timestamp
+from ..utils.logger import nexus_logger
+
+try:
+    import numpy as np
+except ImportError:  # optional: pip install nexus-ai-assistant[data]
+    np = None
+
+
+TOPICS = list(TOPIC_KEYWORDS)
+INTENTS = ['question', 'help_request', 'creation_request', 'general_interaction']
+
+# Name of the model row in classifier_models
+MODEL_NAME = "topic_intent"
+
+# Conversations users liked teach the model more; disliked ones are left out,
+# as their labels are the likeliest to be wrong
+FEEDBACK_WEIGHTS = {1: 2.0, 0: 1.0, None: 1.0, -1: 0.0}
+
+_TOKEN = re.compile(r"[a-z0-9_']+|[?!]")
+
+# Endings a token may add to a keyword and still match it
+_INFLECTIONS = ('', 's', 'es', 'ed', 'ing', 'er', 'ers')
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased word tokens, with '?' and '!' as tokens of their own"""
+    return _TOKEN.findall(text.lower())
+
+
+@lru_cache(maxsize=65536)
+def _bucket(feature: str, n_features: int) -> int:
+    """Stable hash bucket of a feature (unlike hash(), the same in every process)"""
+    return zlib.crc32(feature.encode("utf-8")) & (n_features - 1)
+
+
+@lru_cache(maxsize=None)
+def _word_forms(words: Tuple[str, ...]) -> FrozenSet[str]:
+    """Tokens matching a keyword list: each keyword and its inflected forms"""
+    forms = set()
+    for word in words:
+        word = word.lower()
+        forms.update(word + ending for ending in _INFLECTIONS)
+        if word.endswith('e'):
+            forms.update((word + 'd', word + 'r', word + 'rs', word[:-1] + 'ing'))
+    return frozenset(forms)
+
+
+def rule_labels(tokens: List[str]) -> Tuple[List[str], str]:
+    """
+    Topics and intent by keyword rules, used to label training examples
+
+    A keyword matches a whole token or an inflection of it ('functions',
+    'making'), so 'how' does not match inside 'show' or 'however', nor
+    'art' inside 'article'.
+    """
+    present = set(tokens)
+
+    def matches_any(words):
+        return not present.isdisjoint(_word_forms(tuple(words)))
+
+    topics = [topic for topic, words in TOPIC_KEYWORDS.items() if matches_any(words)]
+    if '?' in present:
+        intent = 'question'
+    elif matches_any(HELP_WORDS):
+        intent = 'help_request'
+    elif matches_any(CREATION_WORDS):
+        intent = 'creation_request'
+    else:
+        intent = 'general_interaction'
+    return topics, intent
+
+
+class TopicIntentClassifier:
+    """
+    Multinomial naive Bayes over hashed unigram and bigram features
+
+    Training only adds to per-class feature counts, so it is incremental:
+    each run consumes the conversations stored since the previous one and
+    the result equals training on all of them at once. At prediction, the
+    sublinear term frequencies of a message are weighted by IDF from the
+    accumulated document frequencies. Topics are one-vs-rest decisions; the
+    intent is the most likely of INTENTS.
+    """
+
+    def __init__(self, n_features: int = 2 ** 16, alpha: float = 0.1):
+        if np is None:
+            raise ImportError("The classifier needs NumPy: pip install nexus-ai-assistant[data]")
+        if n_features & (n_features - 1):
+            raise ValueError(f"n_features must be a power of two, got {n_features}")
+        self.n_features = n_features
+        self.alpha = alpha
+        self.examples = 0
+        self.trained_through = 0
+        # Weighted feature counts; row 0 of topic_counts holds all examples
+        self.topic_counts = np.zeros((len(TOPICS) + 1, n_features), dtype=np.float32)
+        self.intent_counts = np.zeros((len(INTENTS), n_features), dtype=np.float32)
+        self.topic_docs = np.zeros(len(TOPICS) + 1, dtype=np.float64)
+        self.intent_docs = np.zeros(len(INTENTS), dtype=np.float64)
+        self.document_frequency = np.zeros(n_features, dtype=np.float32)
+        self._compiled = False
+
+    def features(self, text: str) -> Tuple[Any, Any]:
+        """
+        Hashed features of a text
+
+        Returns:
+            Distinct bucket indices and their sublinear term frequencies
+        """
+        tokens = tokenize(text)
+        terms = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+        buckets = np.fromiter((_bucket(term, self.n_features) for term in terms),
+                              dtype=np.int64, count=len(terms))
+        index, counts = np.unique(buckets, return_counts=True)
+        return index, np.log1p(counts).astype(np.float32)
+
+    def partial_fit(self, text: str, topics: List[str], intent: str, weight: float = 1.0):
+        """Add one labelled example"""
+        index, tf = self.features(text)
+        weighted = tf * weight
+        rows = [0] + [TOPICS.index(topic) + 1 for topic in topics]
+        for row in rows:
+            self.topic_counts[row, index] += weighted
+            self.topic_docs[row] += weight
+        intent_row = INTENTS.index(intent)
+        self.intent_counts[intent_row, index] += weighted
+        self.intent_docs[intent_row] += weight
+        self.document_frequency[index] += 1
+        self.examples += 1
+        self._compiled = False
+
+    def _compile(self):
+        """Precompute the log probabilities used at prediction"""
+        alpha, n_features = self.alpha, self.n_features
+        everything = self.topic_counts[0]
+        positive = self.topic_counts[1:]
+        negative = np.maximum(everything - positive, 0)
+
+        def log_probabilities(counts):
+            smoothed = counts + alpha
+            return np.log(smoothed / smoothed.sum(axis=-1, keepdims=True)).astype(np.float32)
+
+        self._topic_weights = log_probabilities(positive) - log_probabilities(negative)
+        total = self.topic_docs[0]
+        self._topic_bias = (np.log(self.topic_docs[1:] + 1) - np.log(total - self.topic_docs[1:] + 1))
+        self._intent_weights = log_probabilities(self.intent_counts)
+        self._intent_bias = np.log((self.intent_docs + 1) / (self.intent_docs.sum() + len(INTENTS)))
+        self._idf = (np.log((1 + self.examples) / (1 + self.document_frequency)) + 1).astype(np.float32)
+        self._compiled = True
+
+    def predict(self, text: str) -> Tuple[List[str], str]:
+        """
+        Topics and intent of a message
+
+        Returns:
+            Topics in TOPICS order, and the intent
+        """
+        if not self._compiled:
+            self._compile()
+        index, tf = self.features(text)
+        if not len(index):
+            return [], 'general_interaction'
+        weights = tf * self._idf[index]
+        topic_scores = self._topic_bias + self._topic_weights[:, index] @ weights
+        intent_scores = self._intent_bias + self._intent_weights[:, index] @ weights
+        topics = [topic for topic, score in zip(TOPICS, topic_scores) if score > 0]
+        return topics, INTENTS[int(np.argmax(intent_scores))]
+
+    def to_bytes(self) -> bytes:
+        """Serialize the counts, compressed; the all-zero rows of rare classes cost little"""
+        buffer = io.BytesIO()
+        np.savez_compressed(
+            buffer, topic_counts=self.topic_counts, intent_counts=self.intent_counts,
+            topic_docs=self.topic_docs, intent_docs=self.intent_docs,
+            document_frequency=self.document_frequency,
+            meta=np.array([self.examples, self.trained_through, self.alpha], dtype=np.float64),
+        )
+        return buffer.getvalue()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "TopicIntentClassifier":
+        """Restore a classifier serialized by to_bytes"""
+        arrays = np.load(io.BytesIO(data))
+        examples, trained_through, alpha = arrays['meta']
+        model = cls(n_features=arrays['document_frequency'].shape[0], alpha=float(alpha))
+        for name in ('topic_counts', 'intent_counts', 'topic_docs', 'intent_docs', 'document_frequency'):
+            setattr(model, name, arrays[name])
+        model.examples = int(examples)
+        model.trained_through = int(trained_through)
+        return model
+
+
+class ClassifierTrainer:
+    """Trains the topic/intent classifier from stored conversations and persists it"""
+
+    def __init__(self, db: Optional[LearningDatabase] = None, batch_size: int = 5000):
+        self.db = db or LearningDatabase()
+        self.batch_size = batch_size
+        self.logger = nexus_logger
+
+    def train(self, rebuild: bool = False, n_features: int = 2 ** 16) -> Dict[str, Any]:
+        """
+        Learn from the conversations stored since the last training run
+
+        User inputs are labelled by the keyword rules and weighted by their
+        feedback, leaving out disliked conversations. The model generalizes
+        to words seen alongside the keywords, which the rules miss, but
+        there are no corrected labels to learn from: where the rules label
+        a kind of message wrongly, the model learns the same mistake.
+
+        Args:
+            rebuild: Start from an empty model instead of the stored one
+            n_features: Hash buckets of a new model
+
+        Returns:
+            Examples added and in total, and the stored model size in bytes
+        """
+        model = None if rebuild else load_model(self.db)
+        if model is None:
+            model = TopicIntentClassifier(n_features=n_features)
+
+        added = 0
+        conn = self.db.connect()
+        while True:
+            rows = conn.execute("""
+                SELECT id, user_input, user_feedback FROM conversation_text
+                WHERE id > ?
+                ORDER BY id
+                LIMIT ?
+            """, (model.trained_through, self.batch_size)).fetchall()
+            if not rows:
+                break
+            for _, user_input, feedback in rows:
+                weight = FEEDBACK_WEIGHTS.get(feedback, 1.0)
+                if weight:
+                    topics, intent = rule_labels(tokenize(user_input))
+                    model.partial_fit(user_input, topics, intent, weight)
+                    added += 1
+            model.trained_through = rows[-1][0]
+        conn.close()
+
+        data = model.to_bytes()
+        with self.db.transaction() as conn:
+            conn.execute("""
+                INSERT OR REPLACE INTO classifier_models (name, data, examples, updated_at)
+                VALUES (?, ?, ?, ?)
+            """, (MODEL_NAME, data, model.examples, utc_timestamp()))
+
+        self.logger.info(f"Classifier trained on {added} new conversations ({model.examples} in total)")
+        return {'added': added, 'examples': model.examples, 'model_bytes': len(data)}
+
+
+def load_model(db: LearningDatabase, min_examples: int = 0) -> Optional[TopicIntentClassifier]:
+    """
+    The stored classifier, or None when there is none yet, it has seen fewer
+    than min_examples conversations, or NumPy is not installed
+    """
+    if np is None:
+        return None
+    conn = db.connect()
+    row = conn.execute("SELECT data, examples FROM classifier_models WHERE name = ?",
+                       (MODEL_NAME,)).fetchone()
+    conn.close()
+    if row is None or row[1] < min_examples:
+        return None
+    return TopicIntentClassifier.from_bytes(row[0])
+
+
+def model_version(db: LearningDatabase) -> Optional[str]:
+    """When the stored classifier was last trained, or None when there is none"""
+    conn = db.connect()
+    row = conn.execute("SELECT updated_at FROM classifier_models WHERE name = ?", (MODEL_NAME,)).fetchone()
+    conn.close()
+    return row[0] if row else None
+
+
+def load_classifier(db: LearningDatabase) -> Optional[TopicIntentClassifier]:
+    """The classifier to use for live traffic, once it has seen enough examples"""
+    return load_model(db, min_examples=config.classifier_min_examples)
@@ -34,7 +34,35 @@ class Config(BaseSettings):
     temperature: float = Field(0.7, env="TEMPERATURE")
     
     # Database Configuration
-    database_url: str = Field("sqlite:///nexus.db", env="DATABASE_URL")
+    # sqlite:///file.db, memory://[name] or sqlite+sharded:///directory
+    database_url: str = Field("sqlite:///nexus_learning.db", env="DATABASE_URL")
+    
+    # Send learning writes to a single writer process listening on this
+    # Unix socket path or Windows pipe name (empty writes directly)
+    learning_writer_address: str = Field("", env="LEARNING_WRITER_ADDRESS")
+    
+    # Unix socket path (or Windows pipe name) of 'nexus daemon'; next to the
+    # default database so each working directory gets its own daemon. Clients
+    # read DAEMON_ADDRESS from the environment directly, without this config;
+    # empty disables the daemon
+    daemon_address: str = Field("nexus-daemon.sock", env="DAEMON_ADDRESS")
+    
+    # Conversation texts of at least this many bytes are stored compressed
+    blob_compression_threshold: int = Field(256, env="BLOB_COMPRESSION_THRESHOLD")
+    
+    # Conversations the trained topic/intent classifier must have seen before
+    # it replaces the keyword rules ('nexus train-classifier')
+    classifier_min_examples: int = Field(200, env="CLASSIFIER_MIN_EXAMPLES")
+    
+    # Expensive scorers run in the background by 'nexus score-worker',
+    # comma-separated (e.g. "spacy,transformers"); empty disables them
+    deferred_scorers: str = Field("", env="DEFERRED_SCORERS")
+    
+    # Retention and Maintenance
+    retention_days: int = Field(30, env="RETENTION_DAYS")  # 0 keeps conversations forever
+    pattern_retention_days: int = Field(90, env="PATTERN_RETENTION_DAYS")
+    archive_dir: str = Field("archives", env="ARCHIVE_DIR")
+    maintenance_interval: int = Field(0, env="MAINTENANCE_INTERVAL")  # seconds, 0 disables
     
     # Web Interface Settings
     web_host: str = Field("localhost", env="WEB_HOST")
@@ -44,9 +72,36 @@ class Config(BaseSettings):
     secret_key: str = Field("default-secret-key", env="SECRET_KEY")
     session_timeout: int = Field(3600, env="SESSION_TIMEOUT")
     
-    # Rate Limiting
+    # Sessions of the API server and web interface: how many conversation
+    # memories stay in RAM, and where idle ones are written until they return
+    session_max_active: int = Field(1000, env="SESSION_MAX_ACTIVE")
+    session_dir: str = Field("sessions", env="SESSION_DIR")
+    
+    # Rate Limiting: requests per window of each client address and each API
+    # key, and of the whole server (0 disables a limit)
     rate_limit_requests: int = Field(100, env="RATE_LIMIT_REQUESTS")
     rate_limit_window: int = Field(60, env="RATE_LIMIT_WINDOW")
+    rate_limit_global_requests: int = Field(0, env="RATE_LIMIT_GLOBAL_REQUESTS")
+    
+    # Generations sent to the model provider at once (0 for no limit); further
+    # requests wait in a queue of GENERATION_QUEUE_SIZE for at most
+    # GENERATION_QUEUE_TIMEOUT seconds before being turned away
+    max_concurrent_generations: int = Field(4, env="MAX_CONCURRENT_GENERATIONS")
+    generation_queue_size: int = Field(32, env="GENERATION_QUEUE_SIZE")
+    generation_queue_timeout: float = Field(30.0, env="GENERATION_QUEUE_TIMEOUT")
+    
+    # Latency objective: while the 95th percentile answer time of the last
+    # SLO_WINDOW answers exceeds SLO_LATENCY_P95 seconds (0 disables), answers
+    # degrade a step at a time (shorter answers, shorter context, the fallback
+    # model, cached answers) and recover below SLO_RECOVERY_RATIO of the target
+    slo_latency_p95: float = Field(0.0, env="SLO_LATENCY_P95")
+    slo_window: int = Field(50, env="SLO_WINDOW")
+    slo_recovery_ratio: float = Field(0.7, env="SLO_RECOVERY_RATIO")
+    slo_cooldown: float = Field(30.0, env="SLO_COOLDOWN")  # least seconds between mode changes
+    slo_degraded_max_tokens: int = Field(500, env="SLO_DEGRADED_MAX_TOKENS")
+    slo_degraded_context: int = Field(4, env="SLO_DEGRADED_CONTEXT")  # messages after the system prompt
+    slo_fallback_model: str = Field("", env="SLO_FALLBACK_MODEL")  # empty skips the model switch
+    slo_audit_log: str = Field("logs/degradation.jsonl", env="SLO_AUDIT_LOG")
     
     # Memory and Context
     conversation_memory_size: int = Field(10, env="CONVERSATION_MEMORY_SIZE")
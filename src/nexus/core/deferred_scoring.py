@@ -0,0 +1,204 @@
+"""
+Background runner for the expensive conversation scorers
+"""
+
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+from ..core.analysis import analyze_conversation
+from ..core.learning import LearningDatabase, utc_timestamp
+from ..core.scoring import Scorer, StageStatistics, StageTimer, deferred_scorers
+from ..utils.logger import nexus_logger
+
+
+# (conversation_id, user_input, assistant_response)
+QueuedConversation = Tuple[str, str, str]
+
+# conversation_id -> scorer name -> scores
+ScoreResults = Dict[str, Dict[str, Dict[str, float]]]
+
+
+def score_conversations(scorers: List[Scorer], rows: List[QueuedConversation]) -> Tuple[ScoreResults, Dict[str, float]]:
+    """
+    Run expensive scorers over conversations
+
+    Returns:
+        Scores per conversation and scorer, and the seconds spent per stage
+    """
+    timer = StageTimer()
+    results: ScoreResults = {}
+    for conversation_id, user_input, assistant_response in rows:
+        with timer.stage("profile"):
+            conversation = analyze_conversation(user_input, assistant_response)
+        results[conversation_id] = {}
+        for scorer in scorers:
+            with timer.stage(f"score.{scorer.name}"):
+                results[conversation_id][scorer.name] = scorer.score(user_input, assistant_response, conversation)
+    return results, timer.seconds
+
+
+# Scorers of a pool process, handed over by the worker that started the pool
+_pool_scorers: List[Scorer] = []
+
+
+def _init_pool_process(scorers: List[Scorer]):
+    """Pool initializer: keep the worker's scorers, including ones registered at runtime"""
+    _pool_scorers[:] = scorers
+
+
+def _score_in_pool(rows: List[QueuedConversation]) -> Tuple[ScoreResults, Dict[str, float]]:
+    """Score conversations in a pool process; scorers keep their loaded models between calls"""
+    return score_conversations(_pool_scorers, rows)
+
+
+class DeferredScoringWorker:
+    """
+    Scores queued conversations with the expensive scorers
+
+    Conversations are claimed from scoring_queue in batches and split across
+    a process pool; their scores are written to conversation_scores and the
+    queue entries removed in one transaction per batch. A batch that fails is
+    retried up to max_attempts times.
+    """
+
+    def __init__(self, db: Optional[LearningDatabase] = None, scorers: Optional[List[str]] = None,
+                 workers: Optional[int] = None, batch_size: int = 64, max_attempts: int = 3):
+        """
+        Args:
+            db: Learning database holding the queue
+            scorers: Names of the scorers to run (defaults to DEFERRED_SCORERS)
+            workers: Pool processes; 0 scores in this process
+            batch_size: Conversations claimed per batch
+            max_attempts: Failed attempts after which a conversation is skipped
+        """
+        self.db = db or LearningDatabase()
+        self.scorers = deferred_scorers(scorers)
+        self.scorer_names = [scorer.name for scorer in self.scorers]
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.statistics = StageStatistics()
+        self.logger = nexus_logger
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._stop = threading.Event()
+
+    def run_once(self) -> Dict[str, Any]:
+        """
+        Score everything in the queue
+
+        Returns:
+            Numbers of scored and failed conversations and the stage timings
+        """
+        if not self.scorer_names:
+            raise ValueError("No expensive scorers are enabled or installed (DEFERRED_SCORERS)")
+        scored = failed = 0
+        while not self._stop.is_set():
+            rows = self._claim()
+            if not rows:
+                break
+            batch_scored, batch_failed = self._score_batch(rows)
+            scored += batch_scored
+            failed += batch_failed
+        return {'scored': scored, 'failed': failed, 'timings': self.statistics.summary()}
+
+    def serve_forever(self, interval: float = 5.0):
+        """Keep scoring queued conversations, polling every interval seconds, until stop()"""
+        self._stop.clear()
+        if not self.scorer_names:
+            self.logger.warning("No expensive scorers are enabled or installed (DEFERRED_SCORERS); "
+                                "score worker exiting")
+            return
+        try:
+            while not self._stop.is_set():
+                self.run_once()
+                self._stop.wait(interval)
+        finally:
+            self.close()
+
+    def stop(self):
+        """Stop serve_forever after the current batch"""
+        self._stop.set()
+
+    def close(self):
+        """Shut the process pool down"""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def _claim(self) -> List[QueuedConversation]:
+        """Next batch of queued conversations; entries whose conversation is gone are dropped"""
+        conn = self.db.connect()
+        rows = conn.execute("""
+            SELECT q.conversation_id, t.user_input, t.assistant_response
+            FROM scoring_queue q
+            LEFT JOIN conversation_text t ON t.content_hash = q.conversation_id
+            WHERE q.attempts < ?
+            ORDER BY q.enqueued_at
+            LIMIT ?
+        """, (self.max_attempts, self.batch_size)).fetchall()
+        missing = [(row[0],) for row in rows if row[1] is None]
+        if missing:
+            # Archived before it was scored
+            conn.executemany("DELETE FROM scoring_queue WHERE conversation_id = ?", missing)
+            conn.commit()
+        conn.close()
+        return [row for row in rows if row[1] is not None]
+
+    def _score_batch(self, rows: List[QueuedConversation]) -> Tuple[int, int]:
+        """Score a batch across the pool and write the results back"""
+        chunks = self._split(rows)
+        if self.workers and len(chunks) > 1:
+            if self._pool is None:
+                # Pool processes get the scorers themselves: they may not be in
+                # the registry a fresh process builds on import
+                self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_pool_process,
+                                                 initargs=(self.scorers,))
+            futures = [(chunk, self._pool.submit(_score_in_pool, chunk)) for chunk in chunks]
+            outcomes = [(chunk, self._outcome(future.result)) for chunk, future in futures]
+        else:
+            outcomes = [(chunk, self._outcome(lambda: score_conversations(self.scorers, chunk)))
+                        for chunk in chunks]
+
+        results: ScoreResults = {}
+        failed: List[Tuple[str]] = []
+        for chunk, outcome in outcomes:
+            if outcome is None:
+                failed.extend((row[0],) for row in chunk)
+                continue
+            chunk_results, seconds = outcome
+            results.update(chunk_results)
+            timer = StageTimer()
+            timer.seconds = seconds
+            self.statistics.record(timer)
+
+        scored_at = utc_timestamp()
+        with self.db.transaction() as conn:
+            conn.executemany("""
+                INSERT OR REPLACE INTO conversation_scores
+                (conversation_id, score_name, scorer, value, scored_at)
+                VALUES (?, ?, ?, ?, ?)
+            """, [(conversation_id, score_name, scorer, value, scored_at)
+                  for conversation_id, by_scorer in results.items()
+                  for scorer, scores in by_scorer.items()
+                  for score_name, value in scores.items()])
+            conn.executemany("DELETE FROM scoring_queue WHERE conversation_id = ?",
+                             [(conversation_id,) for conversation_id in results])
+            conn.executemany("UPDATE scoring_queue SET attempts = attempts + 1 WHERE conversation_id = ?",
+                             failed)
+
+        self.logger.info(f"Deferred scoring: {len(results)} scored, {len(failed)} failed")
+        return len(results), len(failed)
+
+    def _split(self, rows: List[QueuedConversation]) -> List[List[QueuedConversation]]:
+        """One chunk per pool process"""
+        count = max(1, min(self.workers, len(rows)))
+        return [rows[i::count] for i in range(count)]
+
+    def _outcome(self, result):
+        """Call result(), logging and swallowing a scorer failure"""
+        try:
+            return result()
+        except Exception as e:
+            self.logger.error(f"Deferred scorer failed: {e}")
+            return None
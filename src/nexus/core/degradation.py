@@ -0,0 +1,214 @@
+"""
+Latency objective (SLO) driven degradation of answers
+
+When the assistant gets slower than its latency objective, answers are made
+cheaper step by step instead of letting requests time out, and restored
+once latency is healthy again.
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Deque, Dict, List, Optional
+
+from ..core.config import config
+from ..utils.logger import nexus_logger
+
+
+# Degradation modes from full quality to cheapest; each one adds to the previous:
+# short answers (SLO_DEGRADED_MAX_TOKENS), a short context (SLO_DEGRADED_CONTEXT
+# messages), the smaller SLO_FALLBACK_MODEL, and cached answers for repeated questions
+MODES = ('normal', 'short_answers', 'short_context', 'small_model', 'cached_answers')
+
+
+@dataclass
+class Degradation:
+    """How to answer in the current mode"""
+
+    mode: str = 'normal'
+    max_tokens: Optional[int] = None
+    context_messages: Optional[int] = None
+    model: Optional[str] = None
+    use_cache: bool = False
+
+    def apply(self, messages: List[Dict[str, str]], options: Dict[str, Any]) -> List[Dict[str, str]]:
+        """
+        Adjust a request to the mode
+
+        Args:
+            messages: Messages for the model, starting with the system prompt
+            options: Generation options, changed in place (max_tokens, model)
+
+        Returns:
+            The messages, without the oldest ones beyond context_messages
+        """
+        if self.max_tokens is not None:
+            options['max_tokens'] = min(options.get('max_tokens', config.max_tokens), self.max_tokens)
+        if self.model is not None:
+            options['model'] = self.model
+        if self.context_messages is not None:
+            head = messages[:1] if messages and messages[0]['role'] == 'system' else []
+            messages = head + messages[len(head):][-self.context_messages:]
+        return messages
+
+
+class DegradationController:
+    """
+    Switches degradation modes to keep answer latency within its objective
+
+    Answer times reported with record() go into a window of the last
+    `window` samples. When their 95th percentile exceeds `target` seconds,
+    the controller moves one mode down MODES; when it falls below
+    `recovery_ratio` of the target, one mode back up. The gap between the
+    two thresholds, a fresh window after every change and at least
+    `cooldown` seconds between changes keep it from flapping. The
+    small_model mode is skipped when no fallback model is set. Every change
+    is logged and appended to the audit log as a JSON line.
+    """
+
+    def __init__(self, target: Optional[float] = None, window: Optional[int] = None,
+                 recovery_ratio: Optional[float] = None, cooldown: Optional[float] = None,
+                 fallback_model: Optional[str] = None, audit_log: Optional[str] = None,
+                 cache_size: int = 500):
+        """
+        Args:
+            target: Objective for the 95th percentile answer time in seconds, 0
+                disables degradation (defaults to SLO_LATENCY_P95)
+            window: Recent answers the percentile is taken over (defaults to SLO_WINDOW)
+            recovery_ratio: Fraction of the target to get below before recovering
+                (defaults to SLO_RECOVERY_RATIO)
+            cooldown: Least seconds between mode changes (defaults to SLO_COOLDOWN)
+            fallback_model: Smaller model for the small_model mode (defaults to SLO_FALLBACK_MODEL)
+            audit_log: JSON lines file of mode changes (defaults to SLO_AUDIT_LOG)
+            cache_size: Answers kept for the cached_answers mode
+        """
+        self.target = config.slo_latency_p95 if target is None else target
+        self.window = config.slo_window if window is None else window
+        self.recovery_ratio = config.slo_recovery_ratio if recovery_ratio is None else recovery_ratio
+        self.cooldown = config.slo_cooldown if cooldown is None else cooldown
+        self.fallback_model = config.slo_fallback_model if fallback_model is None else fallback_model
+        self.audit_log = config.slo_audit_log if audit_log is None else audit_log
+        self.cache_size = cache_size
+        self.modes = [mode for mode in MODES if mode != 'small_model' or self.fallback_model]
+        self.level = 0
+        self.logger = nexus_logger
+        self._lock = threading.Lock()
+        self._samples: Deque[float] = deque(maxlen=max(self.window, 1))
+        self._changed = float("-inf")
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
+        self.cache_hits = 0
+        self.events: Deque[Dict[str, Any]] = deque(maxlen=100)
+
+    @property
+    def enabled(self) -> bool:
+        """Whether a latency objective is set"""
+        return self.target > 0
+
+    @property
+    def mode(self) -> str:
+        """Name of the current mode"""
+        return self.modes[self.level]
+
+    def current(self) -> Degradation:
+        """How to answer right now"""
+        level = self.level
+        active = set(self.modes[1:level + 1])
+        return Degradation(
+            mode=self.modes[level],
+            max_tokens=config.slo_degraded_max_tokens if 'short_answers' in active else None,
+            context_messages=config.slo_degraded_context if 'short_context' in active else None,
+            model=self.fallback_model if 'small_model' in active else None,
+            use_cache='cached_answers' in active,
+        )
+
+    def record(self, seconds: float):
+        """Report the time one answer took from the model, and change mode if due"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._samples.append(seconds)
+            if len(self._samples) < min(10, self._samples.maxlen):
+                return
+            now = time.monotonic()
+            if now - self._changed < self.cooldown:
+                return
+            p95 = self.percentile(0.95)
+            if p95 > self.target and self.level < len(self.modes) - 1:
+                self._change(self.level + 1, p95, now)
+            elif p95 < self.target * self.recovery_ratio and self.level > 0:
+                self._change(self.level - 1, p95, now)
+
+    def percentile(self, fraction: float) -> float:
+        """Nearest-rank percentile of the current window (0 when empty)"""
+        ordered = sorted(self._samples)
+        if not ordered:
+            return 0.0
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+    def _change(self, level: int, p95: float, now: float):
+        """Switch mode, start a fresh window and audit the change (lock held)"""
+        event = {
+            'time': datetime.now(timezone.utc).isoformat(),
+            'from': self.modes[self.level],
+            'to': self.modes[level],
+            'p95': round(p95, 3),
+            'target': self.target,
+            'samples': len(self._samples),
+        }
+        self.level = level
+        self._changed = now
+        self._samples.clear()
+        self.events.append(event)
+        self.logger.warning(f"Latency p95 {p95:.2f}s against an objective of {self.target:g}s: "
+                            f"answering in mode {event['to']} (was {event['from']})")
+        try:
+            directory = os.path.dirname(self.audit_log)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.audit_log, "a", encoding="utf-8") as f:
+                f.write(json.dumps(event) + "\n")
+        except OSError as e:
+            self.logger.error(f"Could not write degradation audit log {self.audit_log}: {e}")
+
+    @staticmethod
+    def _cache_key(question: str) -> str:
+        """Questions differing only in case and spacing share an answer"""
+        return re.sub(r"\s+", " ", question.strip().lower())
+
+    def cached_answer(self, question: str) -> Optional[str]:
+        """Answer given earlier to the same question, if any"""
+        with self._lock:
+            answer = self._cache.get(self._cache_key(question))
+            if answer is not None:
+                self._cache.move_to_end(self._cache_key(question))
+                self.cache_hits += 1
+            return answer
+
+    def remember(self, question: str, answer: str):
+        """Keep an answer for the cached_answers mode"""
+        if not self.enabled or self.cache_size <= 0:
+            return
+        with self._lock:
+            key = self._cache_key(question)
+            self._cache[key] = answer
+            self._cache.move_to_end(key)
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        """Current mode, recent latency and mode changes"""
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'mode': self.mode,
+                'target_p95': self.target,
+                'p95': self.percentile(0.95),
+                'samples': len(self._samples),
+                'cache_hits': self.cache_hits,
+                'events': list(self.events),
+            }
@@ -2,28 +2,154 @@
 Self-Improving Learning System for Nexus AI Assistant
 """
 
+import hashlib
 import json
 import sqlite3
-from datetime import datetime
-from typing import Dict, List, Any, Optional, Tuple
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Any, Optional, Tuple
 from pathlib import Path
 from ..utils.logger import nexus_logger
 from ..core.config import config
+from ..core.analysis import (
+    CODE_FENCE, CONVERSATIONAL_MARKERS, CREATION_WORDS, HELP_WORDS,
+    PROMPT_TOPIC_KEYWORDS, TOPIC_KEYWORDS, ConversationAnalysis,
+    analyze_conversation, profile_text
+)
+from ..core.blobs import pack_text, text_hash
+from ..core.scoring import StageStatistics, StageTimer, deferred_scorers, score_inline
+from ..core.storage import StorageBackend, SQLiteFileBackend, create_backend
+
+
+# Upper bounds (seconds) of the latency histogram bins kept per rollup bucket;
+# the last bin is open-ended
+LATENCY_BINS = [0.1, 0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 15.0, 30.0, 60.0, 120.0]
+
+# Seconds between checks for a newly trained classifier ('nexus train-classifier')
+CLASSIFIER_RELOAD_INTERVAL = 60.0
+
+ROLLUP_GRANULARITIES = {
+    'hour': '%Y-%m-%d %H:00:00',
+    'day': '%Y-%m-%d 00:00:00',
+}
+
+
+# Columns identifying a row independently of the database it lives in; their
+# hash keeps imports idempotent across nodes
+CONTENT_HASH_COLUMNS = {
+    'conversations': ('user_input', 'assistant_response', 'timestamp'),
+    'knowledge_patterns': ('pattern_type', 'pattern_data', 'last_updated'),
+    'learning_insights': ('insight_type', 'insight_data', 'created_at'),
+}
+
+
+# Conversation text columns and the columns referencing their blobs; new rows
+# keep the text columns empty and store each text once in conversation_blobs
+TEXT_COLUMNS = {
+    'user_input': 'user_input_hash',
+    'assistant_response': 'response_hash',
+}
+
+# Views exposing tables with their texts resolved, for readers of raw rows
+TEXT_VIEWS = {
+    'conversations': 'conversation_text',
+}
+
+
+def content_hash(*values: Any) -> str:
+    """Stable SHA-256 hash over a sequence of column values"""
+    return hashlib.sha256(json.dumps(values, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+def utc_timestamp() -> str:
+    """Current UTC time in the database timestamp format"""
+    return datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S.%f")
+
+
+def _text_sql(row: str, column: str) -> str:
+    """SQL expression for a conversation text, whether stored inline or as a blob"""
+    return (f"COALESCE((SELECT nexus_inflate(data, codec) FROM conversation_blobs "
+            f"WHERE hash = {row}.{TEXT_COLUMNS[column]}), {row}.{column})")
+
+
+def _latency_bin_sql(column: str) -> str:
+    """SQL expression mapping a response time column to its histogram bin"""
+    cases = " ".join(f"WHEN {column} <= {bound} THEN {i}" for i, bound in enumerate(LATENCY_BINS))
+    return f"CASE {cases} ELSE {len(LATENCY_BINS)} END"
 
 
 class LearningDatabase:
     """Manages persistent learning data"""
     
-    def __init__(self, db_path: str = "nexus_learning.db"):
-        self.db_path = Path(db_path)
+    def __init__(self, db_path: Optional[str] = None, backend: Optional[StorageBackend] = None,
+                 tenant: Optional[str] = None, read_only: bool = False):
+        """
+        Args:
+            db_path: SQLite file to use instead of the configured DATABASE_URL
+            backend: Storage backend to use instead of the configured DATABASE_URL
+            tenant: Tenant whose data to use when the backend is sharded
+            read_only: Open read-only connections and leave the schema alone
+                (the database must already have been initialized by a writer)
+        """
+        if backend is None:
+            backend = SQLiteFileBackend(db_path) if db_path else create_backend(config.database_url)
+        if tenant is not None:
+            backend = backend.for_tenant(tenant)
+        
+        self.backend = backend
+        self.db_path = backend.path
+        self.read_only = read_only
         self.logger = nexus_logger
-        self.init_database()
+        self._local = threading.local()
+        if not read_only:
+            self.init_database()
+    
+    def connect(self) -> sqlite3.Connection:
+        """Open a connection to the learning database"""
+        return self.backend.connect(read_only=self.read_only)
+    
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """
+        Group writes made by this thread into a single transaction
+        
+        Inside the block, store_* methods share one connection and commit
+        together when the block exits.
+        """
+        if getattr(self._local, 'conn', None) is not None:
+            yield self._local.conn
+            return
+        
+        conn = self.connect()
+        self._local.conn = conn
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            self._local.conn = None
+            conn.close()
+    
+    @contextmanager
+    def _write_cursor(self) -> Iterator[sqlite3.Cursor]:
+        """Cursor for a write, joining the current transaction if there is one"""
+        with self.transaction() as conn:
+            yield conn.cursor()
     
     def init_database(self):
         """Initialize the learning database"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self.connect()
         cursor = conn.cursor()
         
+        # Let maintenance return freed pages incrementally (only takes effect
+        # before the first table is created) and allow readers during writes
+        cursor.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        cursor.execute("PRAGMA journal_mode = WAL")
+        
         # Conversations table
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS conversations (
@@ -33,7 +159,10 @@ class LearningDatabase:
                 user_feedback INTEGER, -- 1: positive, 0: neutral, -1: negative
                 context_quality REAL,
                 response_time REAL,
-                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+                model TEXT,
+                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+                user_input_hash TEXT,
+                response_hash TEXT
             )
         """)
         
@@ -61,43 +190,752 @@ class LearningDatabase:
             )
         """)
         
+        self._migrate_columns(cursor)
+        
+        # Running aggregates over conversations, maintained by the triggers
+        # below so statistics can be read without scanning the history.
+        # The 'live' scope covers rows in the table, 'archived' accumulates
+        # rows removed by retention maintenance
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS conversation_stats (
+                scope TEXT PRIMARY KEY,
+                total_conversations INTEGER NOT NULL DEFAULT 0,
+                positive_feedback INTEGER NOT NULL DEFAULT 0,
+                neutral_feedback INTEGER NOT NULL DEFAULT 0,
+                negative_feedback INTEGER NOT NULL DEFAULT 0,
+                quality_sum REAL NOT NULL DEFAULT 0.0,
+                quality_count INTEGER NOT NULL DEFAULT 0,
+                response_time_sum REAL NOT NULL DEFAULT 0.0,
+                response_time_count INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        
+        # Number of stored patterns per pattern type
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS pattern_stats (
+                pattern_type TEXT PRIMARY KEY,
+                pattern_count INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS conversation_stats_insert
+            AFTER INSERT ON conversations
+            BEGIN
+                UPDATE conversation_stats SET
+                    total_conversations = total_conversations + 1,
+                    positive_feedback = positive_feedback + (NEW.user_feedback IS 1),
+                    neutral_feedback = neutral_feedback + (NEW.user_feedback IS 0),
+                    negative_feedback = negative_feedback + (NEW.user_feedback IS -1),
+                    quality_sum = quality_sum + COALESCE(NEW.context_quality, 0.0),
+                    quality_count = quality_count + (NEW.context_quality IS NOT NULL),
+                    response_time_sum = response_time_sum + COALESCE(NEW.response_time, 0.0),
+                    response_time_count = response_time_count + (NEW.response_time IS NOT NULL)
+                WHERE scope = 'live';
+            END
+        """)
+        
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS conversation_stats_delete
+            AFTER DELETE ON conversations
+            BEGIN
+                UPDATE conversation_stats SET
+                    total_conversations = total_conversations - 1,
+                    positive_feedback = positive_feedback - (OLD.user_feedback IS 1),
+                    neutral_feedback = neutral_feedback - (OLD.user_feedback IS 0),
+                    negative_feedback = negative_feedback - (OLD.user_feedback IS -1),
+                    quality_sum = quality_sum - COALESCE(OLD.context_quality, 0.0),
+                    quality_count = quality_count - (OLD.context_quality IS NOT NULL),
+                    response_time_sum = response_time_sum - COALESCE(OLD.response_time, 0.0),
+                    response_time_count = response_time_count - (OLD.response_time IS NOT NULL)
+                WHERE scope = 'live';
+            END
+        """)
+        
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS conversation_stats_update
+            AFTER UPDATE OF user_feedback, context_quality, response_time ON conversations
+            BEGIN
+                UPDATE conversation_stats SET
+                    positive_feedback = positive_feedback
+                        - (OLD.user_feedback IS 1) + (NEW.user_feedback IS 1),
+                    neutral_feedback = neutral_feedback
+                        - (OLD.user_feedback IS 0) + (NEW.user_feedback IS 0),
+                    negative_feedback = negative_feedback
+                        - (OLD.user_feedback IS -1) + (NEW.user_feedback IS -1),
+                    quality_sum = quality_sum
+                        - COALESCE(OLD.context_quality, 0.0) + COALESCE(NEW.context_quality, 0.0),
+                    quality_count = quality_count
+                        - (OLD.context_quality IS NOT NULL) + (NEW.context_quality IS NOT NULL),
+                    response_time_sum = response_time_sum
+                        - COALESCE(OLD.response_time, 0.0) + COALESCE(NEW.response_time, 0.0),
+                    response_time_count = response_time_count
+                        - (OLD.response_time IS NOT NULL) + (NEW.response_time IS NOT NULL)
+                WHERE scope = 'live';
+            END
+        """)
+        
+        self._init_pattern_triggers(cursor)
+        
+        # Databases created before the aggregates existed need a one-off backfill
+        cursor.execute("INSERT OR IGNORE INTO conversation_stats (scope) VALUES ('live')")
+        if cursor.rowcount:
+            self._recompute_statistics(cursor)
+        
+        self._init_rollups(cursor)
+        self._init_blobs(cursor)
+        
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS learning_meta (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            )
+        """)
+        
+        # Trained models, serialized by the classifier module
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS classifier_models (
+                name TEXT PRIMARY KEY,
+                data BLOB NOT NULL,
+                examples INTEGER NOT NULL DEFAULT 0,
+                updated_at DATETIME
+            )
+        """)
+        
+        # Conversations waiting for the expensive scorers, and their results
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS scoring_queue (
+                conversation_id TEXT PRIMARY KEY,
+                enqueued_at DATETIME NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS conversation_scores (
+                conversation_id TEXT NOT NULL,
+                score_name TEXT NOT NULL,
+                scorer TEXT NOT NULL,
+                value REAL,
+                scored_at DATETIME NOT NULL,
+                PRIMARY KEY (conversation_id, score_name)
+            ) WITHOUT ROWID
+        """)
         conn.commit()
+        
+        # Moving texts into blobs reindexes rows, so an interrupted index
+        # backfill finishes first; a missing index is built after the move
+        if self._has_search_index(cursor):
+            self._backfill_search(conn)
+        self._migrate_inline_text(conn)
+        self._init_search(conn)
         conn.close()
     
-    def store_conversation(self, user_input: str, assistant_response: str, 
-                          user_feedback: Optional[int] = None,
-                          context_quality: Optional[float] = None,
-                          response_time: Optional[float] = None):
-        """Store conversation for learning analysis"""
-        conn = sqlite3.connect(self.db_path)
+    def _migrate_columns(self, cursor: sqlite3.Cursor):
+        """Add columns introduced after the initial schema to older databases"""
+        added_columns = {
+            'conversations': {'model': 'TEXT', 'content_hash': 'TEXT',
+                              'user_input_hash': 'TEXT', 'response_hash': 'TEXT'},
+            'knowledge_patterns': {'content_hash': 'TEXT', 'conversation_id': 'TEXT'},
+            'learning_insights': {'content_hash': 'TEXT'},
+        }
+        
+        for table, columns in added_columns.items():
+            existing = {row[1] for row in cursor.execute(f"PRAGMA table_info({table})")}
+            for column, column_type in columns.items():
+                if column not in existing:
+                    cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {column_type}")
+        
+        for table, hash_columns in CONTENT_HASH_COLUMNS.items():
+            # Rows stored before hashing existed get their hash in batches
+            while True:
+                rows = cursor.execute(f"""
+                    SELECT id, {', '.join(hash_columns)} FROM {table}
+                    WHERE content_hash IS NULL
+                    LIMIT 1000
+                """).fetchall()
+                if not rows:
+                    break
+                cursor.executemany(f"UPDATE {table} SET content_hash = ? WHERE id = ?",
+                                   [(content_hash(*row[1:]), row[0]) for row in rows])
+
+            indexed = cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = ?",
+                                     (f"idx_{table}_content_hash",)).fetchone()
+            if not indexed:
+                self._merge_duplicate_rows(cursor, table)
+                cursor.execute(f"CREATE UNIQUE INDEX idx_{table}_content_hash ON {table} (content_hash)")
+        
+        # Patterns point at the conversation they were learned from (by its
+        # content hash) so later feedback can be applied to them
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_knowledge_patterns_conversation_id
+            ON knowledge_patterns (conversation_id)
+        """)
+    
+    def _merge_duplicate_rows(self, cursor: sqlite3.Cursor, table: str):
+        """
+        Collapse legacy rows sharing a content hash into the oldest of them
+
+        Older versions stored the same exchange again when it was rated, and
+        their timestamps only have one-second resolution, so such copies hash
+        alike. The oldest row is kept; a conversation takes the latest
+        feedback given to any of its copies.
+        """
+        duplicates = cursor.execute(f"""
+            SELECT content_hash, MIN(id) FROM {table}
+            GROUP BY content_hash
+            HAVING COUNT(*) > 1
+        """).fetchall()
+        for row_hash, kept_id in duplicates:
+            if table == 'conversations':
+                cursor.execute("""
+                    UPDATE conversations SET user_feedback = COALESCE((
+                        SELECT user_feedback FROM conversations
+                        WHERE content_hash = ? AND user_feedback IS NOT NULL
+                        ORDER BY id DESC LIMIT 1
+                    ), user_feedback)
+                    WHERE id = ?
+                """, (row_hash, kept_id))
+            cursor.execute(f"DELETE FROM {table} WHERE content_hash = ? AND id != ?", (row_hash, kept_id))
+        if duplicates:
+            self.logger.info(f"Merged duplicate rows of {len(duplicates)} entries in {table}")
+    
+    def _init_pattern_triggers(self, cursor: sqlite3.Cursor):
+        """Create the triggers keeping pattern_stats in step with knowledge_patterns"""
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS pattern_stats_insert
+            AFTER INSERT ON knowledge_patterns
+            BEGIN
+                INSERT INTO pattern_stats (pattern_type, pattern_count)
+                VALUES (NEW.pattern_type, 1)
+                ON CONFLICT(pattern_type) DO UPDATE SET pattern_count = pattern_count + 1;
+            END
+        """)
+        
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS pattern_stats_delete
+            AFTER DELETE ON knowledge_patterns
+            BEGIN
+                UPDATE pattern_stats SET pattern_count = pattern_count - 1
+                WHERE pattern_type = OLD.pattern_type;
+            END
+        """)
+    
+    def _init_rollups(self, cursor: sqlite3.Cursor):
+        """Create the time-bucketed rollup tables and their insert triggers"""
+        # Per hour/day and model: counts, sums, min and max of latency and quality
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS conversation_rollups (
+                granularity TEXT NOT NULL, -- 'hour' or 'day'
+                bucket_start TEXT NOT NULL,
+                model TEXT NOT NULL DEFAULT '',
+                conversation_count INTEGER NOT NULL DEFAULT 0,
+                response_time_count INTEGER NOT NULL DEFAULT 0,
+                response_time_sum REAL NOT NULL DEFAULT 0.0,
+                response_time_min REAL,
+                response_time_max REAL,
+                quality_count INTEGER NOT NULL DEFAULT 0,
+                quality_sum REAL NOT NULL DEFAULT 0.0,
+                quality_min REAL,
+                quality_max REAL,
+                PRIMARY KEY (granularity, bucket_start, model)
+            )
+        """)
+        
+        # Sparse latency histogram for each rollup bucket (see LATENCY_BINS)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS latency_histogram (
+                granularity TEXT NOT NULL,
+                bucket_start TEXT NOT NULL,
+                model TEXT NOT NULL DEFAULT '',
+                bin INTEGER NOT NULL,
+                bin_count INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (granularity, bucket_start, model, bin)
+            )
+        """)
+        
+        # Rollups grow on insert and are not touched by deletes: they
+        # summarize history that retention may later remove from the raw table.
+        # Rescored quality replaces the old score in the count and sum; the
+        # min and max can only widen here (see refresh_rollup_bounds)
+        for granularity, bucket_format in ROLLUP_GRANULARITIES.items():
+            cursor.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS conversation_rollup_{granularity}
+                AFTER INSERT ON conversations
+                BEGIN
+                    INSERT INTO conversation_rollups (
+                        granularity, bucket_start, model, conversation_count,
+                        response_time_count, response_time_sum, response_time_min, response_time_max,
+                        quality_count, quality_sum, quality_min, quality_max
+                    )
+                    VALUES (
+                        '{granularity}',
+                        strftime('{bucket_format}', NEW.timestamp),
+                        COALESCE(NEW.model, ''),
+                        1,
+                        NEW.response_time IS NOT NULL,
+                        COALESCE(NEW.response_time, 0.0),
+                        NEW.response_time,
+                        NEW.response_time,
+                        NEW.context_quality IS NOT NULL,
+                        COALESCE(NEW.context_quality, 0.0),
+                        NEW.context_quality,
+                        NEW.context_quality
+                    )
+                    ON CONFLICT (granularity, bucket_start, model) DO UPDATE SET
+                        conversation_count = conversation_count + 1,
+                        response_time_count = response_time_count + excluded.response_time_count,
+                        response_time_sum = response_time_sum + excluded.response_time_sum,
+                        response_time_min = COALESCE(
+                            MIN(response_time_min, excluded.response_time_min),
+                            response_time_min, excluded.response_time_min),
+                        response_time_max = COALESCE(
+                            MAX(response_time_max, excluded.response_time_max),
+                            response_time_max, excluded.response_time_max),
+                        quality_count = quality_count + excluded.quality_count,
+                        quality_sum = quality_sum + excluded.quality_sum,
+                        quality_min = COALESCE(
+                            MIN(quality_min, excluded.quality_min),
+                            quality_min, excluded.quality_min),
+                        quality_max = COALESCE(
+                            MAX(quality_max, excluded.quality_max),
+                            quality_max, excluded.quality_max);
+                END
+            """)
+            
+            cursor.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS conversation_rollup_{granularity}_quality
+                AFTER UPDATE OF context_quality ON conversations
+                WHEN OLD.context_quality IS NOT NEW.context_quality
+                BEGIN
+                    UPDATE conversation_rollups SET
+                        quality_count = quality_count
+                            - (OLD.context_quality IS NOT NULL) + (NEW.context_quality IS NOT NULL),
+                        quality_sum = quality_sum
+                            - COALESCE(OLD.context_quality, 0.0) + COALESCE(NEW.context_quality, 0.0),
+                        quality_min = COALESCE(MIN(quality_min, NEW.context_quality),
+                                               quality_min, NEW.context_quality),
+                        quality_max = COALESCE(MAX(quality_max, NEW.context_quality),
+                                               quality_max, NEW.context_quality)
+                    WHERE granularity = '{granularity}'
+                      AND bucket_start = strftime('{bucket_format}', NEW.timestamp)
+                      AND model = COALESCE(NEW.model, '');
+                END
+            """)
+            
+            cursor.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS latency_histogram_{granularity}
+                AFTER INSERT ON conversations
+                WHEN NEW.response_time IS NOT NULL
+                BEGIN
+                    INSERT INTO latency_histogram (granularity, bucket_start, model, bin, bin_count)
+                    VALUES (
+                        '{granularity}',
+                        strftime('{bucket_format}', NEW.timestamp),
+                        COALESCE(NEW.model, ''),
+                        {_latency_bin_sql('NEW.response_time')},
+                        1
+                    )
+                    ON CONFLICT (granularity, bucket_start, model, bin) DO UPDATE SET
+                        bin_count = bin_count + 1;
+                END
+            """)
+        
+        # Backfill rollups for history stored before they existed
+        cursor.execute("""
+            SELECT NOT EXISTS (SELECT 1 FROM conversation_rollups)
+               AND EXISTS (SELECT 1 FROM conversations)
+        """)
+        if cursor.fetchone()[0]:
+            self._backfill_rollups(cursor)
+    
+    def _init_blobs(self, cursor: sqlite3.Cursor):
+        """Create the conversation text blob table and the view resolving it"""
+        # Each distinct text is stored once, compressed when large (see blobs.py)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS conversation_blobs (
+                hash TEXT PRIMARY KEY,
+                data BLOB NOT NULL,
+                codec INTEGER NOT NULL DEFAULT 0,
+                size INTEGER NOT NULL -- uncompressed bytes
+            ) WITHOUT ROWID
+        """)
+        for hash_column in TEXT_COLUMNS.values():
+            cursor.execute(f"""
+                CREATE INDEX IF NOT EXISTS idx_conversations_{hash_column}
+                ON conversations ({hash_column})
+            """)
+        
+        # The view lists every other column, so rebuild it when columns change
+        columns = [row[1] for row in cursor.execute("PRAGMA table_info(conversations)")
+                   if row[1] not in TEXT_COLUMNS.values()]
+        select = ",\n                   ".join(
+            f"{_text_sql('c', column)} AS {column}" if column in TEXT_COLUMNS else f"c.{column} AS {column}"
+            for column in columns
+        )
+        view_sql = f"""CREATE VIEW conversation_text AS
+            SELECT {select}
+            FROM conversations AS c"""
+        cursor.execute("SELECT sql FROM sqlite_master WHERE type = 'view' AND name = 'conversation_text'")
+        existing = cursor.fetchone()
+        if existing is None or existing[0] != view_sql:
+            cursor.execute("DROP VIEW IF EXISTS conversation_text")
+            cursor.execute(view_sql)
+    
+    def _migrate_inline_text(self, conn: sqlite3.Connection, batch_size: int = 1000):
+        """Move texts of rows stored verbatim into the blob table, one batch per commit"""
         cursor = conn.cursor()
+        moved = 0
+        while True:
+            rows = cursor.execute("""
+                SELECT id, user_input, assistant_response FROM conversations
+                WHERE user_input_hash IS NULL
+                LIMIT ?
+            """, (batch_size,)).fetchall()
+            if not rows:
+                break
+            
+            cursor.executemany("""
+                UPDATE conversations
+                SET user_input = '', assistant_response = '', user_input_hash = ?, response_hash = ?
+                WHERE id = ?
+            """, [(self.store_text(cursor, user_input), self.store_text(cursor, response), row_id)
+                  for row_id, user_input, response in rows])
+            conn.commit()
+            moved += len(rows)
+        
+        if moved:
+            self.logger.info(f"Moved the texts of {moved} conversations into blob storage")
+    
+    def store_text(self, cursor: sqlite3.Cursor, text: str) -> str:
+        """
+        Store a conversation text in the blob table unless it is already there
         
+        Returns:
+            The hash referencing the text
+        """
+        blob_hash = text_hash(text)
+        # Always insert (rather than check first) so the write lock is held
+        # before the caller references the blob
+        data, codec = pack_text(text, config.blob_compression_threshold)
         cursor.execute("""
-            INSERT INTO conversations 
-            (user_input, assistant_response, user_feedback, context_quality, response_time)
-            VALUES (?, ?, ?, ?, ?)
-        """, (user_input, assistant_response, user_feedback, context_quality, response_time))
+            INSERT OR IGNORE INTO conversation_blobs (hash, data, codec, size)
+            VALUES (?, ?, ?, ?)
+        """, (blob_hash, data, codec, len(text.encode("utf-8"))))
+        return blob_hash
+    
+    def _has_search_index(self, cursor: sqlite3.Cursor) -> bool:
+        """Whether the full-text index exists, dropping one built over raw rows"""
+        cursor.execute("SELECT sql FROM sqlite_master WHERE name = 'conversations_fts'")
+        row = cursor.fetchone()
+        if row is None:
+            return False
+        if "content='conversations'" not in row[0]:
+            return True
+        
+        # Indexes over the raw table cannot see texts stored as blobs
+        for trigger in ('insert', 'delete', 'update'):
+            cursor.execute(f"DROP TRIGGER IF EXISTS conversations_fts_{trigger}")
+        cursor.execute("DROP TABLE conversations_fts")
+        cursor.execute("DELETE FROM learning_meta WHERE key IN ('fts_backfill_end', 'fts_backfill_next')")
+        cursor.connection.commit()
+        return False
+    
+    def _init_search(self, conn: sqlite3.Connection):
+        """Create the full-text index over conversations and backfill it in batches"""
+        cursor = conn.cursor()
+        created = not self._has_search_index(cursor)
+        try:
+            # External content: the index stores tokens only, texts are read
+            # back through the conversation_text view
+            cursor.execute("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS conversations_fts USING fts5(
+                    user_input, assistant_response,
+                    content='conversation_text', content_rowid='id',
+                    tokenize='porter unicode61'
+                )
+            """)
+        except sqlite3.OperationalError as e:
+            self.logger.warning(f"Full-text search unavailable (SQLite built without FTS5): {e}")
+            conn.commit()
+            return
+        
+        # Blobs are written before the rows referencing them and removed only
+        # once unreferenced, so the triggers can always resolve both versions
+        new_texts = f"{_text_sql('NEW', 'user_input')}, {_text_sql('NEW', 'assistant_response')}"
+        old_texts = f"{_text_sql('OLD', 'user_input')}, {_text_sql('OLD', 'assistant_response')}"
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS conversations_fts_insert
+            AFTER INSERT ON conversations
+            BEGIN
+                INSERT INTO conversations_fts (rowid, user_input, assistant_response)
+                VALUES (NEW.id, {new_texts});
+            END
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS conversations_fts_delete
+            AFTER DELETE ON conversations
+            BEGIN
+                INSERT INTO conversations_fts (conversations_fts, rowid, user_input, assistant_response)
+                VALUES ('delete', OLD.id, {old_texts});
+            END
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS conversations_fts_update
+            AFTER UPDATE OF user_input, assistant_response, user_input_hash, response_hash
+            ON conversations
+            BEGIN
+                INSERT INTO conversations_fts (conversations_fts, rowid, user_input, assistant_response)
+                VALUES ('delete', OLD.id, {old_texts});
+                INSERT INTO conversations_fts (rowid, user_input, assistant_response)
+                VALUES (NEW.id, {new_texts});
+            END
+        """)
         
+        if created:
+            # Rows after the current maximum are indexed by the triggers
+            cursor.execute("SELECT MAX(id) FROM conversations")
+            last_id = cursor.fetchone()[0]
+            if last_id is not None:
+                cursor.execute("INSERT OR REPLACE INTO learning_meta (key, value) VALUES ('fts_backfill_end', ?)",
+                               (last_id,))
         conn.commit()
-        conn.close()
+        self._backfill_search(conn)
     
-    def store_pattern(self, pattern_type: str, pattern_data: Dict[str, Any]):
-        """Store learned patterns"""
-        conn = sqlite3.connect(self.db_path)
+    def _backfill_search(self, conn: sqlite3.Connection, batch_size: int = 5000):
+        """
+        Index conversations stored before the full-text index existed
+        
+        Each batch commits its progress, so an interrupted backfill resumes
+        where it stopped the next time the database is opened.
+        """
         cursor = conn.cursor()
+        progress = dict(cursor.execute("""
+            SELECT key, value FROM learning_meta
+            WHERE key IN ('fts_backfill_end', 'fts_backfill_next')
+        """).fetchall())
+        if 'fts_backfill_end' not in progress:
+            return
         
-        cursor.execute("""
-            INSERT OR REPLACE INTO knowledge_patterns 
-            (pattern_type, pattern_data, last_updated)
-            VALUES (?, ?, CURRENT_TIMESTAMP)
-        """, (pattern_type, json.dumps(pattern_data)))
+        end = int(progress['fts_backfill_end'])
+        next_id = int(progress.get('fts_backfill_next', 1))
+        self.logger.info(f"Building full-text search index for {end - next_id + 1} conversation ids")
+        while next_id <= end:
+            batch_end = min(next_id + batch_size - 1, end)
+            cursor.execute("""
+                INSERT INTO conversations_fts (rowid, user_input, assistant_response)
+                SELECT id, user_input, assistant_response FROM conversation_text
+                WHERE id BETWEEN ? AND ?
+            """, (next_id, batch_end))
+            next_id = batch_end + 1
+            cursor.execute("INSERT OR REPLACE INTO learning_meta (key, value) VALUES ('fts_backfill_next', ?)",
+                           (next_id,))
+            conn.commit()
         
+        cursor.execute("DELETE FROM learning_meta WHERE key IN ('fts_backfill_end', 'fts_backfill_next')")
         conn.commit()
+    
+    def refresh_rollup_bounds(self, cursor: sqlite3.Cursor):
+        """
+        Recompute the quality min and max of rollup buckets from the raw rows
+        
+        Only buckets whose conversations are all still in the table are
+        refreshed; those partly removed by retention keep their bounds.
+        The caller commits.
+        """
+        for granularity, bucket_format in ROLLUP_GRANULARITIES.items():
+            cursor.execute(f"""
+                UPDATE conversation_rollups SET quality_min = raw.quality_min, quality_max = raw.quality_max
+                FROM (
+                    SELECT strftime('{bucket_format}', timestamp) AS bucket_start,
+                           COALESCE(model, '') AS model, COUNT(*) AS conversations,
+                           MIN(context_quality) AS quality_min, MAX(context_quality) AS quality_max
+                    FROM conversations
+                    GROUP BY 1, 2
+                ) AS raw
+                WHERE conversation_rollups.granularity = '{granularity}'
+                  AND conversation_rollups.bucket_start = raw.bucket_start
+                  AND conversation_rollups.model = raw.model
+                  AND conversation_rollups.conversation_count = raw.conversations
+            """)
+    
+    def _backfill_rollups(self, cursor: sqlite3.Cursor):
+        """Build the rollup tables from the raw conversations (caller commits)"""
+        for granularity, bucket_format in ROLLUP_GRANULARITIES.items():
+            cursor.execute(f"""
+                INSERT INTO conversation_rollups (
+                    granularity, bucket_start, model, conversation_count,
+                    response_time_count, response_time_sum, response_time_min, response_time_max,
+                    quality_count, quality_sum, quality_min, quality_max
+                )
+                SELECT
+                    '{granularity}',
+                    strftime('{bucket_format}', timestamp),
+                    COALESCE(model, ''),
+                    COUNT(*),
+                    COUNT(response_time),
+                    COALESCE(SUM(response_time), 0.0),
+                    MIN(response_time),
+                    MAX(response_time),
+                    COUNT(context_quality),
+                    COALESCE(SUM(context_quality), 0.0),
+                    MIN(context_quality),
+                    MAX(context_quality)
+                FROM conversations
+                GROUP BY 2, 3
+            """)
+            
+            cursor.execute(f"""
+                INSERT INTO latency_histogram (granularity, bucket_start, model, bin, bin_count)
+                SELECT
+                    '{granularity}',
+                    strftime('{bucket_format}', timestamp),
+                    COALESCE(model, ''),
+                    {_latency_bin_sql('response_time')},
+                    COUNT(*)
+                FROM conversations
+                WHERE response_time IS NOT NULL
+                GROUP BY 2, 3, 4
+            """)
+    
+    def store_conversation(self, user_input: str, assistant_response: str, 
+                          user_feedback: Optional[int] = None,
+                          context_quality: Optional[float] = None,
+                          response_time: Optional[float] = None,
+                          model: Optional[str] = None,
+                          timestamp: Optional[str] = None) -> str:
+        """
+        Store conversation for learning analysis
+        
+        The texts go to the blob table, so repeated prompts and answers are
+        stored once.
+        
+        Returns:
+            The content hash identifying the stored conversation
+        """
+        timestamp = timestamp or utc_timestamp()
+        row_hash = content_hash(user_input, assistant_response, timestamp)
+        
+        with self._write_cursor() as cursor:
+            user_input_hash = self.store_text(cursor, user_input)
+            response_hash = self.store_text(cursor, assistant_response)
+            cursor.execute("""
+                INSERT OR IGNORE INTO conversations 
+                (user_input, assistant_response, user_input_hash, response_hash, user_feedback,
+                 context_quality, response_time, model, timestamp, content_hash)
+                VALUES ('', '', ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (user_input_hash, response_hash, user_feedback, context_quality, response_time,
+                  model, timestamp, row_hash))
+        
+        return row_hash
+    
+    def store_pattern(self, pattern_type: str, pattern_data: Dict[str, Any],
+                      timestamp: Optional[str] = None, conversation_id: Optional[str] = None):
+        """Store learned patterns"""
+        timestamp = timestamp or utc_timestamp()
+        serialized = json.dumps(pattern_data)
+        
+        with self._write_cursor() as cursor:
+            cursor.execute("""
+                INSERT OR IGNORE INTO knowledge_patterns 
+                (pattern_type, pattern_data, last_updated, content_hash, conversation_id)
+                VALUES (?, ?, ?, ?, ?)
+            """, (pattern_type, serialized, timestamp,
+                  content_hash(pattern_type, serialized, timestamp), conversation_id))
+    
+    def update_feedback(self, conversation_id: str, feedback: int) -> bool:
+        """
+        Set the feedback of a stored conversation and of the patterns learned from it
+        
+        The maintained statistics follow through the update triggers; nothing
+        is re-analyzed or inserted again.
+        
+        Args:
+            conversation_id: Content hash returned by store_conversation
+            feedback: Feedback score (1: positive, 0: neutral, -1: negative)
+            
+        Returns:
+            Whether a conversation with that ID exists
+        """
+        if feedback not in (-1, 0, 1):
+            raise ValueError(f"Feedback must be -1, 0 or 1, got {feedback}")
+        
+        with self._write_cursor() as cursor:
+            cursor.execute("UPDATE conversations SET user_feedback = ? WHERE content_hash = ?",
+                           (feedback, conversation_id))
+            if not cursor.rowcount:
+                return False
+            # The content hash of a pattern stays its original identity
+            cursor.execute("""
+                UPDATE knowledge_patterns
+                SET pattern_data = json_set(pattern_data, '$.feedback', ?)
+                WHERE conversation_id = ?
+            """, (feedback, conversation_id))
+        return True
+    
+    def enqueue_scoring(self, conversation_id: str):
+        """Queue a stored conversation for the expensive scorers"""
+        with self._write_cursor() as cursor:
+            cursor.execute("""
+                INSERT OR IGNORE INTO scoring_queue (conversation_id, enqueued_at) VALUES (?, ?)
+            """, (conversation_id, utc_timestamp()))
+    
+    def get_scores(self, conversation_id: str) -> Dict[str, float]:
+        """Scores written back by the expensive scorers for a conversation"""
+        conn = self.connect()
+        rows = conn.execute("""
+            SELECT score_name, value FROM conversation_scores WHERE conversation_id = ?
+        """, (conversation_id,)).fetchall()
         conn.close()
+        return dict(rows)
+    
+    def get_conversation(self, conversation_id: str) -> Optional[Dict[str, Any]]:
+        """Fetch a stored conversation by its ID, or None if there is none"""
+        conn = self.connect()
+        conn.row_factory = sqlite3.Row
+        row = conn.execute("""
+            SELECT content_hash AS conversation_id, user_input, assistant_response, user_feedback,
+                   context_quality, response_time, model, timestamp
+            FROM conversation_text
+            WHERE content_hash = ?
+        """, (conversation_id,)).fetchone()
+        conn.close()
+        return dict(row) if row else None
+    
+    def find_conversation(self, user_input: str, assistant_response: str) -> Optional[str]:
+        """ID of the most recent conversation with exactly these texts, if any"""
+        conn = self.connect()
+        row = conn.execute("""
+            SELECT content_hash FROM conversations
+            WHERE user_input_hash = ? AND response_hash = ?
+            ORDER BY id DESC
+            LIMIT 1
+        """, (text_hash(user_input), text_hash(assistant_response))).fetchone()
+        conn.close()
+        return row[0] if row else None
+    
+    def resolve_conversation_id(self, prefix: str) -> Optional[str]:
+        """
+        Expand an abbreviated conversation ID, as shown by 'nexus search'
+        
+        Raises:
+            ValueError: If the prefix matches more than one conversation
+        """
+        prefix = prefix.lower()
+        conn = self.connect()
+        # Hex digits sort below 'g', so this range is exactly the prefix matches
+        rows = conn.execute("""
+            SELECT content_hash FROM conversations
+            WHERE content_hash >= ? AND content_hash < ?
+            LIMIT 2
+        """, (prefix, prefix + 'g')).fetchall()
+        conn.close()
+        if len(rows) > 1:
+            raise ValueError(f"Conversation ID prefix '{prefix}' is ambiguous")
+        return rows[0][0] if rows else None
     
     def get_patterns(self, pattern_type: str) -> List[Dict[str, Any]]:
         """Retrieve patterns by type"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self.connect()
         cursor = conn.cursor()
         
         cursor.execute("""
@@ -116,17 +954,336 @@ class LearningDatabase:
         
         conn.close()
         return results
+    
+    def get_statistics(self) -> Dict[str, Any]:
+        """Read conversation and pattern statistics from the maintained aggregates"""
+        conn = self.connect()
+        cursor = conn.cursor()
+        
+        cursor.execute("""
+            SELECT SUM(total_conversations), SUM(positive_feedback),
+                   SUM(quality_sum), SUM(quality_count),
+                   SUM(response_time_sum), SUM(response_time_count)
+            FROM conversation_stats
+        """)
+        total, positive, quality_sum, quality_count, time_sum, time_count = cursor.fetchone()
+        
+        cursor.execute("SELECT pattern_type, pattern_count FROM pattern_stats WHERE pattern_count > 0")
+        pattern_counts = dict(cursor.fetchall())
+        
+        conn.close()
+        
+        return {
+            'total_conversations': total,
+            'positive_feedback_rate': positive / total if total else 0.0,
+            'avg_quality_score': quality_sum / quality_count if quality_count else 0.0,
+            'avg_response_time': time_sum / time_count if time_count else 0.0,
+            'learned_patterns': pattern_counts
+        }
+    
+    def get_storage_report(self) -> Dict[str, Any]:
+        """
+        Report how much space blob storage saves over storing texts verbatim
+        
+        Returns:
+            Conversation text bytes as referenced by each row, the bytes
+            actually stored, and the savings from deduplication and compression
+        """
+        conn = self.connect()
+        cursor = conn.cursor()
+        
+        referenced = 0
+        for hash_column in TEXT_COLUMNS.values():
+            cursor.execute(f"""
+                SELECT COALESCE(SUM(b.size), 0)
+                FROM conversations AS c
+                JOIN conversation_blobs AS b ON b.hash = c.{hash_column}
+            """)
+            referenced += cursor.fetchone()[0]
+        
+        # Rows written directly to the table may still hold their texts inline
+        cursor.execute("""
+            SELECT COUNT(*),
+                   COALESCE(SUM(length(CAST(user_input AS BLOB))
+                                + length(CAST(assistant_response AS BLOB))), 0)
+            FROM conversations
+        """)
+        conversations, inline = cursor.fetchone()
+        
+        cursor.execute("""
+            SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(length(data)), 0)
+            FROM conversation_blobs
+        """)
+        blobs, unique_bytes, blob_bytes = cursor.fetchone()
+        
+        conn.close()
+        
+        text_bytes = referenced + inline
+        stored_bytes = blob_bytes + inline
+        return {
+            'conversations': conversations,
+            'blobs': blobs,
+            'text_bytes': text_bytes,
+            'stored_bytes': stored_bytes,
+            'deduplication_saved_bytes': referenced - unique_bytes,
+            'compression_saved_bytes': unique_bytes - blob_bytes,
+            'saved_bytes': text_bytes - stored_bytes,
+            'saved_ratio': (text_bytes - stored_bytes) / text_bytes if text_bytes else 0.0,
+        }
+    
+    def purge_unused_blobs(self) -> int:
+        """
+        Delete conversation texts no longer referenced by any conversation
+        
+        Returns:
+            Number of deleted blobs
+        """
+        with self._write_cursor() as cursor:
+            cursor.execute("""
+                DELETE FROM conversation_blobs
+                WHERE NOT EXISTS (SELECT 1 FROM conversations WHERE user_input_hash = conversation_blobs.hash)
+                  AND NOT EXISTS (SELECT 1 FROM conversations WHERE response_hash = conversation_blobs.hash)
+            """)
+            return cursor.rowcount
+    
+    def search_conversations(self, query: str, limit: int = 10, offset: int = 0,
+                             raw: bool = False, highlight: Tuple[str, str] = ('[', ']')) -> List[Dict[str, Any]]:
+        """
+        Full-text search over stored conversations, best matches first
+        
+        Args:
+            query: Words to look for; every word must match
+            limit: Maximum number of results
+            offset: Number of results to skip, for paging
+            raw: Pass the query to FTS5 unchanged (phrases, OR, NEAR, prefix*)
+            highlight: Markers placed around matched terms in the snippets
+            
+        Returns:
+            Matching conversations with their bm25 rank and highlighted snippets
+        """
+        match = query if raw else self._fts_query(query)
+        if not match:
+            return []
+        
+        start, end = highlight
+        conn = self.connect()
+        cursor = conn.cursor()
+        
+        # ORDER BY rank with a LIMIT lets FTS5 keep only the top results
+        cursor.execute("""
+            SELECT c.content_hash, c.timestamp, c.user_feedback, c.model, fts.rank,
+                   snippet(conversations_fts, 0, ?, ?, '…', 16),
+                   snippet(conversations_fts, 1, ?, ?, '…', 24)
+            FROM conversations_fts AS fts
+            JOIN conversations AS c ON c.id = fts.rowid
+            WHERE conversations_fts MATCH ?
+            ORDER BY fts.rank
+            LIMIT ? OFFSET ?
+        """, (start, end, start, end, match, limit, offset))
+        
+        results = [
+            {
+                'conversation_id': row[0],
+                'timestamp': row[1],
+                'user_feedback': row[2],
+                'model': row[3],
+                'rank': row[4],
+                'user_input': row[5],
+                'assistant_response': row[6],
+            }
+            for row in cursor.fetchall()
+        ]
+        
+        conn.close()
+        return results
+    
+    @staticmethod
+    def _fts_query(query: str) -> str:
+        """Quote each word so user input cannot trip over FTS5 query syntax"""
+        terms = query.split()
+        return " ".join('"' + term.replace('"', '""') + '"' for term in terms)
+    
+    def get_rollups(self, since: datetime, granularity: str = 'day',
+                    by_model: bool = False) -> List[Dict[str, Any]]:
+        """
+        Query time-bucketed latency and quality statistics from the rollups
+        
+        Args:
+            since: Only include buckets starting at or after this UTC time
+            granularity: Bucket size, 'hour' or 'day'
+            by_model: Break each bucket down per model
+            
+        Returns:
+            One entry per bucket (and model), oldest first
+        """
+        if granularity not in ROLLUP_GRANULARITIES:
+            raise ValueError(f"Unsupported rollup granularity: {granularity}")
+        
+        since_bucket = since.strftime(ROLLUP_GRANULARITIES[granularity])
+        model_column = "model" if by_model else "''"
+        
+        conn = self.connect()
+        cursor = conn.cursor()
+        
+        cursor.execute(f"""
+            SELECT bucket_start, {model_column},
+                   SUM(conversation_count),
+                   SUM(response_time_count), SUM(response_time_sum),
+                   MIN(response_time_min), MAX(response_time_max),
+                   SUM(quality_count), SUM(quality_sum),
+                   MIN(quality_min), MAX(quality_max)
+            FROM conversation_rollups
+            WHERE granularity = ? AND bucket_start >= ?
+            GROUP BY 1, 2
+            ORDER BY 1, 2
+        """, (granularity, since_bucket))
+        rows = cursor.fetchall()
+        
+        cursor.execute(f"""
+            SELECT bucket_start, {model_column}, bin, SUM(bin_count)
+            FROM latency_histogram
+            WHERE granularity = ? AND bucket_start >= ?
+            GROUP BY 1, 2, 3
+        """, (granularity, since_bucket))
+        histograms: Dict[Tuple[str, str], Dict[int, int]] = {}
+        for bucket_start, model, bin_index, count in cursor.fetchall():
+            histograms.setdefault((bucket_start, model), {})[bin_index] = count
+        
+        conn.close()
+        
+        results = []
+        for (bucket_start, model, count, time_count, time_sum, time_min, time_max,
+             quality_count, quality_sum, quality_min, quality_max) in rows:
+            histogram = histograms.get((bucket_start, model), {})
+            results.append({
+                'bucket_start': bucket_start,
+                'model': model or None,
+                'conversations': count,
+                'avg_response_time': time_sum / time_count if time_count else 0.0,
+                'min_response_time': time_min,
+                'max_response_time': time_max,
+                'p95_response_time': self._histogram_percentile(histogram, 0.95, time_min, time_max),
+                'avg_quality_score': quality_sum / quality_count if quality_count else 0.0,
+                'min_quality_score': quality_min,
+                'max_quality_score': quality_max,
+            })
+        
+        return results
+    
+    @staticmethod
+    def _histogram_percentile(histogram: Dict[int, int], percentile: float,
+                              lower: Optional[float], upper: Optional[float]) -> Optional[float]:
+        """Estimate a percentile as the upper bound of the bin that reaches it"""
+        total = sum(histogram.values())
+        if not total:
+            return None
+        
+        threshold = percentile * total
+        cumulative = 0
+        for bin_index in sorted(histogram):
+            cumulative += histogram[bin_index]
+            if cumulative >= threshold:
+                estimate = LATENCY_BINS[bin_index] if bin_index < len(LATENCY_BINS) else upper
+                # Never report outside the observed range
+                return min(max(estimate, lower), upper)
+        return upper
+    
+    def recompute_statistics(self):
+        """Rebuild the maintained aggregates from the raw tables"""
+        conn = self.connect()
+        cursor = conn.cursor()
+        self._recompute_statistics(cursor)
+        conn.commit()
+        conn.close()
+        self.logger.info("Learning statistics recomputed from raw data")
+    
+    def _recompute_statistics(self, cursor: sqlite3.Cursor):
+        """Recompute aggregates using an open cursor (caller commits)"""
+        cursor.execute("""
+            INSERT OR REPLACE INTO conversation_stats (
+                scope, total_conversations, positive_feedback, neutral_feedback,
+                negative_feedback, quality_sum, quality_count,
+                response_time_sum, response_time_count
+            )
+            SELECT
+                'live',
+                COUNT(*),
+                COALESCE(SUM(user_feedback IS 1), 0),
+                COALESCE(SUM(user_feedback IS 0), 0),
+                COALESCE(SUM(user_feedback IS -1), 0),
+                COALESCE(SUM(context_quality), 0.0),
+                COUNT(context_quality),
+                COALESCE(SUM(response_time), 0.0),
+                COUNT(response_time)
+            FROM conversations
+        """)
+        
+        cursor.execute("DELETE FROM pattern_stats")
+        cursor.execute("""
+            INSERT INTO pattern_stats (pattern_type, pattern_count)
+            SELECT pattern_type, COUNT(*) FROM knowledge_patterns GROUP BY pattern_type
+        """)
 
 
 class SelfImprovementEngine:
     """Core engine for self-improvement and learning"""
     
-    def __init__(self):
-        self.db = LearningDatabase()
+    def __init__(self, db: Optional[LearningDatabase] = None, tenant: Optional[str] = None,
+                 load_patterns: bool = True):
+        """
+        Args:
+            db: Learning database to use (defaults to the configured DATABASE_URL)
+            tenant: Tenant whose learning data to use when storage is sharded
+            load_patterns: Read the learned patterns now; offline jobs that
+                only run the analysis skip this
+        """
+        if config.learning_writer_address:
+            # Multi-worker mode: read locally, send all writes to the writer process
+            from ..core.writer import WriterClient
+            
+            self.db = db or LearningDatabase(tenant=tenant, read_only=True)
+            self.writer = WriterClient(tenant=tenant)
+        else:
+            self.db = db or LearningDatabase(tenant=tenant)
+            self.writer = self.db
         self.logger = nexus_logger
         self.learning_patterns = {}
         self.adaptation_rules = {}
-        self.load_learning_patterns()
+        self.stage_statistics = StageStatistics()
+        
+        # Trained topic/intent classifier; the keyword rules serve until there
+        # is one. A model trained later is picked up by reload_classifier()
+        self._classifier = None
+        self._classifier_version = None
+        self._classifier_checked = 0.0
+        self.reload_classifier()
+        
+        if load_patterns:
+            self.load_learning_patterns()
+    
+    @property
+    def classifier(self):
+        """The trained classifier, checked for a newer one at most once a minute"""
+        if time.monotonic() - self._classifier_checked >= CLASSIFIER_RELOAD_INTERVAL:
+            self.reload_classifier()
+        return self._classifier
+    
+    def reload_classifier(self) -> bool:
+        """
+        Load the stored classifier if it was retrained since the last load
+        
+        Returns:
+            Whether a different model (or none) is now in use
+        """
+        from ..core.classifier import load_classifier, model_version
+        
+        self._classifier_checked = time.monotonic()
+        version = model_version(self.db)
+        if version == self._classifier_version:
+            return False
+        self._classifier = load_classifier(self.db)
+        self._classifier_version = version
+        return True
     
     def load_learning_patterns(self):
         """Load existing learning patterns from database"""
@@ -136,49 +1293,19 @@ class SelfImprovementEngine:
             patterns = self.db.get_patterns(pattern_type)
             self.learning_patterns[pattern_type] = patterns
     
-    def analyze_conversation_quality(self, user_input: str, assistant_response: str) -> Dict[str, float]:
-        """Analyze the quality of a conversation"""
-        analysis = {
-            'relevance_score': 0.0,
-            'completeness_score': 0.0,
-            'clarity_score': 0.0,
-            'engagement_score': 0.0,
-            'technical_accuracy': 0.0
-        }
-        
-        # Simple heuristic analysis (can be enhanced with ML models)
-        user_length = len(user_input.split())
-        response_length = len(assistant_response.split())
-        
-        # Relevance: Basic keyword matching
-        user_keywords = set(user_input.lower().split())
-        response_keywords = set(assistant_response.lower().split())
-        keyword_overlap = len(user_keywords & response_keywords)
-        analysis['relevance_score'] = min(1.0, keyword_overlap / max(len(user_keywords), 1))
-        
-        # Completeness: Response length relative to question complexity
-        analysis['completeness_score'] = min(1.0, response_length / max(user_length * 2, 10))
-        
-        # Clarity: Sentence structure and readability
-        sentences = assistant_response.split('.')
-        avg_sentence_length = sum(len(s.split()) for s in sentences) / max(len(sentences), 1)
-        analysis['clarity_score'] = max(0.0, 1.0 - (avg_sentence_length - 15) / 20)
-        
-        # Engagement: Presence of questions, examples, or creative elements
-        engagement_markers = ['?', 'example', 'imagine', 'consider', 'let me', 'here\'s']
-        engagement_count = sum(1 for marker in engagement_markers if marker in assistant_response.lower())
-        analysis['engagement_score'] = min(1.0, engagement_count / 3)
-        
-        # Technical accuracy: Presence of specific technical terms when appropriate
-        technical_terms = ['function', 'algorithm', 'data', 'system', 'process', 'method']
-        tech_question = any(term in user_input.lower() for term in technical_terms)
-        tech_response = any(term in assistant_response.lower() for term in technical_terms)
-        analysis['technical_accuracy'] = 1.0 if (tech_question and tech_response) or not tech_question else 0.5
-        
-        return analysis
+    def analyze_conversation_quality(self, user_input: str, assistant_response: str,
+                                     conversation: Optional[ConversationAnalysis] = None,
+                                     timer: Optional[StageTimer] = None) -> Dict[str, float]:
+        """Analyze the quality of a conversation with the inline scorers (see scoring.py)"""
+        return score_inline(user_input, assistant_response, conversation, timer)
     
-    def extract_conversation_insights(self, user_input: str, assistant_response: str) -> Dict[str, Any]:
+    def extract_conversation_insights(self, user_input: str, assistant_response: str,
+                                      conversation: Optional[ConversationAnalysis] = None) -> Dict[str, Any]:
         """Extract learning insights from conversation"""
+        if conversation is None:
+            conversation = analyze_conversation(user_input, assistant_response)
+        user, response = conversation.user, conversation.response
+        
         insights = {
             'topics': [],
             'user_intent': '',
@@ -186,38 +1313,29 @@ class SelfImprovementEngine:
             'improvement_suggestions': []
         }
         
-        # Topic extraction (simple keyword-based)
-        topics = []
-        topic_keywords = {
-            'programming': ['code', 'function', 'python', 'javascript', 'algorithm', 'debug'],
-            'science': ['research', 'experiment', 'hypothesis', 'data', 'analysis'],
-            'creative': ['write', 'poem', 'story', 'creative', 'art', 'design'],
-            'technical': ['system', 'network', 'server', 'database', 'API'],
-            'learning': ['learn', 'understand', 'explain', 'teach', 'how']
-        }
-        
-        for topic, keywords in topic_keywords.items():
-            if any(keyword in user_input.lower() for keyword in keywords):
-                topics.append(topic)
-        
-        insights['topics'] = topics
-        
-        # User intent analysis
-        if '?' in user_input:
-            insights['user_intent'] = 'question'
-        elif any(word in user_input.lower() for word in ['help', 'assist', 'support']):
-            insights['user_intent'] = 'help_request'
-        elif any(word in user_input.lower() for word in ['create', 'make', 'build']):
-            insights['user_intent'] = 'creation_request'
+        if self.classifier is not None:
+            # Topics and intent learned from past conversations
+            insights['topics'], insights['user_intent'] = self.classifier.predict(user_input)
         else:
-            insights['user_intent'] = 'general_interaction'
+            # Topic extraction (simple keyword-based, see TOPIC_KEYWORDS)
+            insights['topics'] = user.topics(TOPIC_KEYWORDS)
+            
+            # User intent analysis
+            if '?' in user.keywords:
+                insights['user_intent'] = 'question'
+            elif user.has_any(HELP_WORDS):
+                insights['user_intent'] = 'help_request'
+            elif user.has_any(CREATION_WORDS):
+                insights['user_intent'] = 'creation_request'
+            else:
+                insights['user_intent'] = 'general_interaction'
         
         # Response style analysis
-        if len(assistant_response) > 200:
+        if response.length > 200:
             insights['response_style'] = 'detailed'
-        elif '```' in assistant_response:
+        elif CODE_FENCE in response.keywords:
             insights['response_style'] = 'code_focused'
-        elif any(char in assistant_response for char in ['!', '?', '...']):
+        elif response.has_any(CONVERSATIONAL_MARKERS):
             insights['response_style'] = 'conversational'
         else:
             insights['response_style'] = 'concise'
@@ -247,45 +1365,110 @@ class SelfImprovementEngine:
         return suggestions
     
     def learn_from_feedback(self, user_input: str, assistant_response: str, 
-                          feedback: int, context: Dict[str, Any] = None):
-        """Learn from user feedback"""
-        # Analyze conversation quality
-        analysis = self.analyze_conversation_quality(user_input, assistant_response)
-        insights = self.extract_conversation_insights(user_input, assistant_response)
+                          feedback: int, context: Dict[str, Any] = None,
+                          conversation: Optional[ConversationAnalysis] = None):
+        """
+        Learn from user feedback
+        
+        Args:
+            conversation: Analysis of both texts if already made, e.g. by an
+                IncrementalAnalyzer while the response streamed
+        """
+        timer = StageTimer()
+        
+        # Analyze conversation quality from a single pass over both texts
+        if conversation is None:
+            with timer.stage("profile"):
+                conversation = analyze_conversation(user_input, assistant_response)
+        analysis = self.analyze_conversation_quality(user_input, assistant_response, conversation, timer)
+        with timer.stage("insights"):
+            insights = self.extract_conversation_insights(user_input, assistant_response, conversation)
         
         # Calculate overall quality score
         quality_score = sum(analysis.values()) / len(analysis)
         
         # Store conversation with feedback
-        self.db.store_conversation(
-            user_input=user_input,
-            assistant_response=assistant_response,
-            user_feedback=feedback,
-            context_quality=quality_score,
-            response_time=context.get('response_time', 0) if context else 0
-        )
+        with timer.stage("store"):
+            conversation_id = self.writer.store_conversation(
+                user_input=user_input,
+                assistant_response=assistant_response,
+                user_feedback=feedback,
+                context_quality=quality_score,
+                response_time=context.get('response_time', 0) if context else 0,
+                model=context.get('model') if context else None
+            )
         
         # Update learning patterns based on feedback
-        self.update_learning_patterns(insights, feedback, quality_score)
+        with timer.stage("patterns"):
+            self.update_learning_patterns(insights, feedback, quality_score, conversation_id)
+        
+        # Expensive scorers run later, off the request path
+        if deferred_scorers():
+            with timer.stage("enqueue"):
+                self.writer.enqueue_scoring(conversation_id)
         
         # Generate improvement suggestions
         suggestions = self.generate_improvement_suggestions(analysis, insights)
         
+        self.stage_statistics.record(timer)
         self.logger.info(f"Learning from feedback: {feedback}, Quality: {quality_score:.2f}")
+        self.logger.debug(f"Learning stage times (ms): {timer.as_ms()}")
         if suggestions:
             self.logger.info(f"Improvement suggestions: {suggestions}")
         
         return {
+            'conversation_id': conversation_id,
             'quality_analysis': analysis,
             'insights': insights,
             'suggestions': suggestions,
-            'overall_quality': quality_score
+            'overall_quality': quality_score,
+            'timings': timer.as_ms()
+        }
+    
+    def record_feedback(self, conversation_id: str, feedback: int) -> Dict[str, Any]:
+        """
+        Apply user feedback to a conversation stored earlier
+        
+        Updates the original row and its patterns in place instead of
+        analyzing and storing the conversation again.
+        
+        Args:
+            conversation_id: ID returned by learn_from_feedback
+            feedback: Feedback score (1: positive, 0: neutral, -1: negative)
+            
+        Returns:
+            Whether the conversation was found and its stored quality score
+        """
+        # A queued write cannot report a miss, so it counts as applied
+        updated = self.writer.update_feedback(conversation_id, feedback) is not False
+        conversation = self.db.get_conversation(conversation_id)
+        
+        self.logger.info(f"Feedback {feedback} recorded for conversation {conversation_id[:12]}")
+        return {
+            'conversation_id': conversation_id,
+            'feedback': feedback,
+            'updated': updated,
+            'overall_quality': conversation['context_quality'] if conversation else None
         }
     
     def update_learning_patterns(self, insights: Dict[str, Any], 
-                               feedback: int, quality_score: float):
+                               feedback: int, quality_score: float,
+                               conversation_id: Optional[str] = None):
         """Update learning patterns based on new data"""
-        # Update topic expertise patterns
+        for pattern_type, pattern_data in self.derive_patterns(insights, feedback, quality_score):
+            self.writer.store_pattern(pattern_type, pattern_data, conversation_id=conversation_id)
+    
+    def derive_patterns(self, insights: Dict[str, Any], feedback: int,
+                        quality_score: float) -> List[Tuple[str, Dict[str, Any]]]:
+        """
+        Patterns learned from one conversation
+        
+        Returns:
+            (pattern_type, pattern_data) pairs, in the order they are stored
+        """
+        patterns = []
+        
+        # Topic expertise patterns
         for topic in insights['topics']:
             pattern_data = {
                 'topic': topic,
@@ -293,16 +1476,17 @@ class SelfImprovementEngine:
                 'quality_score': quality_score,
                 'response_style': insights['response_style']
             }
-            self.db.store_pattern('topic_expertise', pattern_data)
+            patterns.append(('topic_expertise', pattern_data))
         
-        # Update response style patterns
+        # Response style patterns
         style_pattern = {
             'style': insights['response_style'],
             'intent': insights['user_intent'],
             'feedback': feedback,
             'quality_score': quality_score
         }
-        self.db.store_pattern('response_quality', style_pattern)
+        patterns.append(('response_quality', style_pattern))
+        return patterns
     
     def get_adaptive_prompt_enhancement(self, user_input: str, 
                                       base_prompt: str) -> str:
@@ -311,18 +1495,13 @@ class SelfImprovementEngine:
         topic_patterns = self.db.get_patterns('topic_expertise')
         style_patterns = self.db.get_patterns('response_quality')
         
-        # Analyze user input to determine relevant enhancements
-        user_topics = []
-        topic_keywords = {
-            'programming': ['code', 'function', 'python', 'javascript', 'algorithm'],
-            'science': ['research', 'experiment', 'data', 'analysis'],
-            'creative': ['write', 'poem', 'story', 'creative', 'art'],
-            'technical': ['system', 'network', 'server', 'database']
-        }
-        
-        for topic, keywords in topic_keywords.items():
-            if any(keyword in user_input.lower() for keyword in keywords):
-                user_topics.append(topic)
+        # Analyze user input to determine relevant enhancements; the profile
+        # is cached and reused when learning from the response
+        if self.classifier is not None:
+            user_topics = [topic for topic in self.classifier.predict(user_input)[0]
+                           if topic in PROMPT_TOPIC_KEYWORDS]
+        else:
+            user_topics = profile_text(user_input).topics(PROMPT_TOPIC_KEYWORDS)
         
         # Build enhancement based on successful patterns
         enhancement = "\n\nLearned Adaptations:\n"
@@ -342,33 +1521,44 @@ class SelfImprovementEngine:
         
         return base_prompt + enhancement
     
-    def get_learning_statistics(self) -> Dict[str, Any]:
-        """Get learning and improvement statistics"""
-        conn = sqlite3.connect(self.db.db_path)
-        cursor = conn.cursor()
-        
-        # Get conversation statistics
-        cursor.execute("""
-            SELECT 
-                COUNT(*) as total_conversations,
-                AVG(CASE WHEN user_feedback = 1 THEN 1.0 ELSE 0.0 END) as positive_feedback_rate,
-                AVG(context_quality) as avg_quality,
-                AVG(response_time) as avg_response_time
-            FROM conversations
-        """)
+    def get_learning_statistics(self, recompute: bool = False) -> Dict[str, Any]:
+        """
+        Get learning and improvement statistics
         
-        stats = cursor.fetchone()
+        Args:
+            recompute: Rebuild the maintained aggregates from raw rows first
+            
+        Returns:
+            Conversation counts, feedback rate, averages and pattern counts
+        """
+        if recompute:
+            self.db.recompute_statistics()
         
-        # Get learning pattern counts
-        cursor.execute("SELECT pattern_type, COUNT(*) FROM knowledge_patterns GROUP BY pattern_type")
-        pattern_counts = dict(cursor.fetchall())
+        return self.db.get_statistics()
+    
+    def get_stage_timings(self) -> Dict[str, Dict[str, float]]:
+        """Count, average and maximum milliseconds of each learning stage in this process"""
+        return self.stage_statistics.summary()
+    
+    def get_rollup_statistics(self, since: Optional[datetime] = None, granularity: str = 'day',
+                              by_model: bool = False) -> List[Dict[str, Any]]:
+        """
+        Get latency and quality statistics per time bucket
         
-        conn.close()
+        Args:
+            since: Start of the window in UTC (defaults to the last 7 days)
+            granularity: Bucket size, 'hour' or 'day'
+            by_model: Break each bucket down per model
+            
+        Returns:
+            Per-bucket statistics answered from the rollup tables
+        """
+        if since is None:
+            since = datetime.utcnow() - timedelta(days=7)
         
-        return {
-            'total_conversations': stats[0] if stats[0] else 0,
-            'positive_feedback_rate': stats[1] if stats[1] else 0.0,
-            'avg_quality_score': stats[2] if stats[2] else 0.0,
-            'avg_response_time': stats[3] if stats[3] else 0.0,
-            'learned_patterns': pattern_counts
-        }
+        return self.db.get_rollups(since, granularity=granularity, by_model=by_model)
+    
+    def search_conversations(self, query: str, limit: int = 10, offset: int = 0,
+                             **kwargs: Any) -> List[Dict[str, Any]]:
+        """Full-text search over past conversations (see LearningDatabase.search_conversations)"""
+        return self.db.search_conversations(query, limit=limit, offset=offset, **kwargs)
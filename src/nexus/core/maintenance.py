@@ -0,0 +1,289 @@
+"""
+Retention, archival and compaction for the Nexus learning database
+"""
+
+import gzip
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+from ..core.config import config
+from ..core.learning import LearningDatabase
+from ..utils.logger import nexus_logger
+
+
+class DatabaseMaintenance:
+    """Archives expired learning data and compacts the database"""
+
+    def __init__(self, db: Optional[LearningDatabase] = None,
+                 retention_days: Optional[int] = None,
+                 pattern_retention_days: Optional[int] = None,
+                 archive_dir: Optional[str] = None,
+                 chunk_size: int = 1000):
+        self.db = db or LearningDatabase()
+        self.retention_days = config.retention_days if retention_days is None else retention_days
+        self.pattern_retention_days = (config.pattern_retention_days
+                                       if pattern_retention_days is None else pattern_retention_days)
+        self.archive_dir = Path(archive_dir or config.archive_dir)
+        self.chunk_size = chunk_size
+        self.logger = nexus_logger
+
+    def run(self, dry_run: bool = False, vacuum: bool = True) -> Dict[str, Any]:
+        """
+        Run a full maintenance pass
+
+        Args:
+            dry_run: Only count what would be archived
+            vacuum: Reclaim free pages and checkpoint the WAL afterwards
+
+        Returns:
+            Report with archived row counts, archive files and database size
+        """
+        report: Dict[str, Any] = {'archive_files': []}
+
+        if dry_run:
+            report['conversations_archived'] = self._count_expired(
+                "conversations", "timestamp", self.retention_days)
+            report['patterns_archived'] = self._count_expired(
+                "knowledge_patterns", "last_updated", self.pattern_retention_days)
+            report['database_bytes'] = self._database_size()
+            return report
+
+        size_before = self._database_size()
+        report['conversations_archived'] = self.archive_conversations(report['archive_files'])
+        report['patterns_archived'] = self.archive_patterns(report['archive_files'])
+        report['blobs_purged'] = self.db.purge_unused_blobs()
+        if vacuum:
+            self.compact()
+        report['database_bytes'] = self._database_size()
+        report['bytes_freed'] = max(0, size_before - report['database_bytes'])
+
+        self.logger.info(
+            f"Maintenance archived {report['conversations_archived']} conversations and "
+            f"{report['patterns_archived']} patterns"
+        )
+        return report
+
+    def archive_conversations(self, archive_files: Optional[List[str]] = None) -> int:
+        """
+        Move conversations older than the retention period to the archive
+
+        Their totals are folded into the 'archived' statistics scope so that
+        all-time statistics are unaffected; per-bucket data stays in the rollups.
+        Texts no longer referenced are removed by LearningDatabase.purge_unused_blobs.
+
+        Returns:
+            Number of archived conversations
+        """
+        if self.retention_days <= 0:
+            return 0
+
+        cutoff = self._cutoff(self.retention_days)
+        path = self._archive_path("conversations")
+        archived = 0
+
+        conn = self.db.connect()
+        conn.row_factory = _dict_row
+        cursor = conn.cursor()
+        cursor.execute("INSERT OR IGNORE INTO conversation_stats (scope) VALUES ('archived')")
+        conn.commit()
+
+        while True:
+            # Read through the view so the archive holds the full texts
+            rows = cursor.execute("""
+                SELECT * FROM conversation_text
+                WHERE timestamp < ?
+                ORDER BY id
+                LIMIT ?
+            """, (cutoff, self.chunk_size)).fetchall()
+            if not rows:
+                break
+
+            # Rows reach the archive before they leave the database
+            self._append_archive(path, rows)
+
+            # The chunk is exactly the expired rows within its id range
+            first_id, last_id = rows[0]['id'], rows[-1]['id']
+            totals = (
+                len(rows),
+                sum(row['user_feedback'] == 1 for row in rows),
+                sum(row['user_feedback'] == 0 for row in rows),
+                sum(row['user_feedback'] == -1 for row in rows),
+                sum(row['context_quality'] or 0.0 for row in rows),
+                sum(row['context_quality'] is not None for row in rows),
+                sum(row['response_time'] or 0.0 for row in rows),
+                sum(row['response_time'] is not None for row in rows),
+            )
+            cursor.execute("""
+                UPDATE conversation_stats SET
+                    total_conversations = total_conversations + ?,
+                    positive_feedback = positive_feedback + ?,
+                    neutral_feedback = neutral_feedback + ?,
+                    negative_feedback = negative_feedback + ?,
+                    quality_sum = quality_sum + ?,
+                    quality_count = quality_count + ?,
+                    response_time_sum = response_time_sum + ?,
+                    response_time_count = response_time_count + ?
+                WHERE scope = 'archived'
+            """, totals)
+            cursor.execute("DELETE FROM conversations WHERE id BETWEEN ? AND ? AND timestamp < ?",
+                           (first_id, last_id, cutoff))
+            conn.commit()
+            archived += len(rows)
+
+        conn.close()
+
+        if archived and archive_files is not None:
+            archive_files.append(str(path))
+        return archived
+
+    def archive_patterns(self, archive_files: Optional[List[str]] = None) -> int:
+        """
+        Move knowledge patterns not updated within the pattern retention period
+
+        Returns:
+            Number of archived patterns
+        """
+        if self.pattern_retention_days <= 0:
+            return 0
+
+        cutoff = self._cutoff(self.pattern_retention_days)
+        path = self._archive_path("knowledge_patterns")
+        archived = 0
+
+        conn = self.db.connect()
+        conn.row_factory = _dict_row
+        cursor = conn.cursor()
+
+        while True:
+            rows = cursor.execute("""
+                SELECT * FROM knowledge_patterns
+                WHERE last_updated < ?
+                ORDER BY id
+                LIMIT ?
+            """, (cutoff, self.chunk_size)).fetchall()
+            if not rows:
+                break
+
+            self._append_archive(path, rows)
+            cursor.execute("DELETE FROM knowledge_patterns WHERE id BETWEEN ? AND ? AND last_updated < ?",
+                           (rows[0]['id'], rows[-1]['id'], cutoff))
+            conn.commit()
+            archived += len(rows)
+
+        conn.close()
+
+        if archived and archive_files is not None:
+            archive_files.append(str(path))
+        return archived
+
+    def compact(self):
+        """Return free pages to the filesystem and truncate the WAL"""
+        conn = self.db.connect()
+
+        auto_vacuum = conn.execute("PRAGMA auto_vacuum").fetchone()[0]
+        if auto_vacuum != 2:
+            # Databases created before incremental auto-vacuum need one full
+            # VACUUM for the setting to take effect
+            conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            conn.execute("VACUUM")
+        else:
+            # Each step frees one page, so drain the statement
+            conn.execute("PRAGMA incremental_vacuum").fetchall()
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+        conn.close()
+
+    def _count_expired(self, table: str, column: str, days: int) -> int:
+        """Count rows that a maintenance run would archive"""
+        if days <= 0:
+            return 0
+
+        conn = self.db.connect()
+        count = conn.execute(f"SELECT COUNT(*) FROM {table} WHERE {column} < ?",
+                             (self._cutoff(days),)).fetchone()[0]
+        conn.close()
+        return count
+
+    def _append_archive(self, path: Path, rows: List[Dict[str, Any]]):
+        """Append rows to a gzip-compressed JSONL archive and sync it to disk"""
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        # Appending adds a new gzip member; readers see one continuous stream
+        with open(path, "ab") as raw:
+            with gzip.GzipFile(fileobj=raw, mode="ab") as archive:
+                for row in rows:
+                    archive.write((json.dumps(row, ensure_ascii=False) + "\n").encode("utf-8"))
+            raw.flush()
+            os.fsync(raw.fileno())
+
+    def _archive_path(self, table: str) -> Path:
+        """Archive file for a table, one per day of maintenance runs"""
+        return self.archive_dir / f"{table}-{datetime.utcnow():%Y%m%d}.jsonl.gz"
+
+    def _database_size(self) -> int:
+        """Size of the database file plus its WAL in bytes"""
+        if self.db.db_path is None:
+            conn = self.db.connect()
+            page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+            page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+            conn.close()
+            return page_count * page_size
+
+        size = 0
+        for suffix in ("", "-wal"):
+            path = Path(f"{self.db.db_path}{suffix}")
+            if path.exists():
+                size += path.stat().st_size
+        return size
+
+    @staticmethod
+    def _cutoff(days: int) -> str:
+        """UTC timestamp string before which rows are expired"""
+        return (datetime.utcnow() - timedelta(days=days)).strftime("%Y-%m-%d %H:%M:%S")
+
+
+class MaintenanceScheduler:
+    """Runs database maintenance periodically on a background thread"""
+
+    def __init__(self, maintenance: Optional[DatabaseMaintenance] = None,
+                 interval: Optional[int] = None):
+        self.maintenance = maintenance or DatabaseMaintenance()
+        self.interval = interval or config.maintenance_interval
+        self.logger = nexus_logger
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Start the background maintenance thread"""
+        if self.interval <= 0:
+            raise ValueError("Maintenance interval must be positive")
+        if self._thread and self._thread.is_alive():
+            return
+
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._loop, name="nexus-maintenance", daemon=True)
+        self._thread.start()
+        self.logger.info(f"Maintenance scheduled every {self.interval}s")
+
+    def stop(self, timeout: Optional[float] = None):
+        """Stop the background thread after the current run finishes"""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def _loop(self):
+        """Run maintenance until stopped"""
+        while not self._stop_event.wait(self.interval):
+            try:
+                self.maintenance.run()
+            except Exception as e:
+                self.logger.error(f"Scheduled maintenance failed: {e}")
+
+
+def _dict_row(cursor: sqlite3.Cursor, row: tuple) -> Dict[str, Any]:
+    """sqlite3 row factory producing plain dicts for JSON serialization"""
+    return {column[0]: value for column, value in zip(cursor.description, row)}
@@ -0,0 +1,268 @@
+"""
+Offline re-learning: rebuild the knowledge patterns from stored conversations
+"""
+
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from ..core.learning import LearningDatabase, SelfImprovementEngine, content_hash
+from ..core.storage import StorageBackend
+from ..utils.logger import nexus_logger
+
+
+# Patterns of the run in progress, swapped in for knowledge_patterns at the end
+STAGING_TABLE = "knowledge_patterns_next"
+
+# One row per conversation ID range of the run; completed_at marks merged shards
+SHARDS_TABLE = "reanalysis_shards"
+
+# Pattern types produced by SelfImprovementEngine.derive_patterns
+DERIVED_PATTERN_TYPES = ('topic_expertise', 'response_quality')
+
+# A staged pattern row: pattern_type, pattern_data, last_updated, content_hash, conversation_id
+PatternRow = Tuple[str, str, str, str, str]
+
+
+def analyze_shard(backend: StorageBackend, start_id: int, end_id: int) -> List[PatternRow]:
+    """
+    Run the learning analysis over the conversations in an ID range
+
+    Runs in a worker process and only reads; the coordinator writes.
+
+    Args:
+        backend: Storage backend holding the conversations
+        start_id: First conversation ID of the shard
+        end_id: Last conversation ID of the shard (inclusive)
+
+    Returns:
+        Pattern rows for the staging table
+    """
+    db = LearningDatabase(backend=backend, read_only=True)
+    engine = SelfImprovementEngine(db, load_patterns=False)
+
+    conn = db.connect()
+    rows = conn.execute("""
+        SELECT content_hash, user_input, assistant_response, user_feedback, timestamp
+        FROM conversation_text
+        WHERE id BETWEEN ? AND ?
+        ORDER BY id
+    """, (start_id, end_id)).fetchall()
+    conn.close()
+
+    patterns = []
+    for conversation_id, user_input, assistant_response, feedback, timestamp in rows:
+        analysis = engine.analyze_conversation_quality(user_input, assistant_response)
+        insights = engine.extract_conversation_insights(user_input, assistant_response)
+        quality_score = sum(analysis.values()) / len(analysis)
+
+        # Patterns take the time of their conversation, so reanalyzing the same
+        # history on any node yields the same content hashes
+        for pattern_type, pattern_data in engine.derive_patterns(insights, feedback, quality_score):
+            serialized = json.dumps(pattern_data)
+            patterns.append((pattern_type, serialized, timestamp,
+                             content_hash(pattern_type, serialized, timestamp), conversation_id))
+    return patterns
+
+
+class PatternReanalyzer:
+    """
+    Rebuilds knowledge_patterns by re-running the analysis over all conversations
+
+    The conversation table is split into ID ranges analyzed by a process
+    pool. Their patterns are merged into a staging table, one transaction per
+    shard together with its completion mark, so an interrupted run resumes
+    where it stopped. The staging table then replaces knowledge_patterns in a
+    single transaction; readers see either the old or the new patterns.
+    """
+
+    def __init__(self, db: Optional[LearningDatabase] = None, workers: Optional[int] = None,
+                 shard_size: int = 5000):
+        self.db = db or LearningDatabase()
+        self.workers = workers or os.cpu_count() or 1
+        self.shard_size = shard_size
+        self.logger = nexus_logger
+
+    def run(self, restart: bool = False,
+            progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """
+        Reanalyze all conversations and swap in the rebuilt patterns
+
+        Args:
+            restart: Discard an interrupted run instead of resuming it
+            progress: Called after each merged shard with the progress so far
+
+        Returns:
+            Numbers of analyzed conversations and rebuilt patterns
+        """
+        conn = self.db.connect()
+        if restart:
+            self._discard(conn)
+        resumed = self._prepare(conn)
+
+        pending = conn.execute(f"""
+            SELECT start_id, end_id FROM {SHARDS_TABLE}
+            WHERE completed_at IS NULL
+            ORDER BY start_id
+        """).fetchall()
+        total, done = conn.execute(f"""
+            SELECT COUNT(*), COUNT(completed_at) FROM {SHARDS_TABLE}
+        """).fetchone()
+        if resumed:
+            self.logger.info(f"Resuming reanalysis: {done} of {total} shards already merged")
+
+        start = time.perf_counter()
+        merged = 0
+        for (start_id, end_id), rows in self._analyze(pending):
+            self._merge(conn, start_id, end_id, rows)
+            merged += 1
+            if progress:
+                elapsed = time.perf_counter() - start
+                progress({
+                    'shards_done': done + merged,
+                    'shards_total': total,
+                    'eta_seconds': elapsed / merged * (len(pending) - merged),
+                })
+
+        result = self._swap(conn)
+        conn.close()
+        result['seconds'] = time.perf_counter() - start
+        result['resumed'] = resumed
+        self.logger.info(f"Reanalysis rebuilt {result['patterns']} patterns from "
+                         f"{result['conversations']} conversations")
+        return result
+
+    def _prepare(self, conn) -> bool:
+        """
+        Create the staging and shard tables unless a run is in progress
+
+        Returns:
+            Whether an interrupted run is resumed
+        """
+        if conn.execute("SELECT 1 FROM sqlite_master WHERE name = ?", (SHARDS_TABLE,)).fetchone():
+            return True
+
+        # The staging table copies the live definition, including migrated columns
+        table_sql = conn.execute("""
+            SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'knowledge_patterns'
+        """).fetchone()[0]
+        conn.execute(f"DROP TABLE IF EXISTS {STAGING_TABLE}")
+        conn.execute(table_sql.replace("knowledge_patterns", STAGING_TABLE, 1))
+        conn.execute(f"CREATE UNIQUE INDEX idx_{STAGING_TABLE}_content_hash ON {STAGING_TABLE} (content_hash)")
+
+        # Conversations arriving during the run are analyzed at the swap
+        first_id, last_id = conn.execute("SELECT MIN(id), MAX(id) FROM conversations").fetchone()
+        conn.execute(f"""
+            CREATE TABLE {SHARDS_TABLE} (
+                start_id INTEGER PRIMARY KEY,
+                end_id INTEGER NOT NULL,
+                patterns INTEGER,
+                completed_at DATETIME
+            )
+        """)
+        if last_id is not None:
+            conn.executemany(f"INSERT INTO {SHARDS_TABLE} (start_id, end_id) VALUES (?, ?)", [
+                (shard_start, min(shard_start + self.shard_size - 1, last_id))
+                for shard_start in range(first_id, last_id + 1, self.shard_size)
+            ])
+        conn.commit()
+        return False
+
+    def _analyze(self, shards: List[Tuple[int, int]]):
+        """Yield ((start_id, end_id), rows) for each shard as soon as it is analyzed"""
+        backend = self.db.backend
+        if self.workers == 1 or backend.path is None or len(shards) < 2:
+            # In-memory databases cannot be opened from another process
+            for start_id, end_id in shards:
+                yield (start_id, end_id), analyze_shard(backend, start_id, end_id)
+            return
+
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            # A bounded number of shards in flight keeps memory flat
+            queue = list(reversed(shards))
+            running = {}
+            while queue or running:
+                while queue and len(running) < self.workers * 2:
+                    shard = queue.pop()
+                    running[pool.submit(analyze_shard, backend, *shard)] = shard
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    yield running.pop(future), future.result()
+
+    def _merge(self, conn, start_id: int, end_id: int, rows: List[PatternRow]):
+        """Add the patterns of a shard to the staging table and mark it complete"""
+        conn.executemany(f"""
+            INSERT OR IGNORE INTO {STAGING_TABLE}
+            (pattern_type, pattern_data, last_updated, content_hash, conversation_id)
+            VALUES (?, ?, ?, ?, ?)
+        """, rows)
+        conn.execute(f"""
+            UPDATE {SHARDS_TABLE} SET patterns = ?, completed_at = CURRENT_TIMESTAMP
+            WHERE start_id = ?
+        """, (len(rows), start_id))
+        conn.commit()
+
+    def _swap(self, conn) -> Dict[str, Any]:
+        """Finish the staged patterns and replace knowledge_patterns with them"""
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Conversations stored since the shards were planned
+            last_planned = conn.execute(f"SELECT MAX(end_id) FROM {SHARDS_TABLE}").fetchone()[0] or 0
+            last_id = conn.execute("SELECT MAX(id) FROM conversations").fetchone()[0] or 0
+            if last_id > last_planned:
+                conn.executemany(f"""
+                    INSERT OR IGNORE INTO {STAGING_TABLE}
+                    (pattern_type, pattern_data, last_updated, content_hash, conversation_id)
+                    VALUES (?, ?, ?, ?, ?)
+                """, analyze_shard(self.db.backend, last_planned + 1, last_id))
+
+            # Feedback given while the run was in progress
+            conn.execute(f"""
+                UPDATE {STAGING_TABLE} SET pattern_data = json_set(pattern_data, '$.feedback', (
+                    SELECT user_feedback FROM conversations
+                    WHERE content_hash = {STAGING_TABLE}.conversation_id
+                ))
+                WHERE json_extract(pattern_data, '$.feedback') IS NOT (
+                    SELECT user_feedback FROM conversations
+                    WHERE content_hash = {STAGING_TABLE}.conversation_id
+                )
+            """)
+
+            # Patterns that cannot be derived again: those learned from
+            # conversations since archived, and types the analysis does not
+            # produce. Unlinked patterns predate conversation IDs and are
+            # replaced by the rebuild like the rest
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(knowledge_patterns)")
+                       if row[1] != 'id']
+            conn.execute(f"""
+                INSERT OR IGNORE INTO {STAGING_TABLE} ({', '.join(columns)})
+                SELECT {', '.join(columns)} FROM knowledge_patterns
+                WHERE pattern_type NOT IN ({', '.join('?' * len(DERIVED_PATTERN_TYPES))})
+                   OR conversation_id NOT IN (SELECT content_hash FROM conversations)
+                ORDER BY id
+            """, DERIVED_PATTERN_TYPES)
+
+            conn.execute("DROP TABLE knowledge_patterns")
+            conn.execute(f"ALTER TABLE {STAGING_TABLE} RENAME TO knowledge_patterns")
+            conn.execute(f"DROP INDEX idx_{STAGING_TABLE}_content_hash")
+            cursor = conn.cursor()
+            self.db._migrate_columns(cursor)
+            self.db._init_pattern_triggers(cursor)
+            self.db._recompute_statistics(cursor)
+
+            conversations = conn.execute("SELECT COUNT(*) FROM conversations").fetchone()[0]
+            patterns = conn.execute("SELECT COUNT(*) FROM knowledge_patterns").fetchone()[0]
+            conn.execute(f"DROP TABLE {SHARDS_TABLE}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+        return {'conversations': conversations, 'patterns': patterns}
+
+    def _discard(self, conn):
+        """Drop the tables of an interrupted run"""
+        conn.execute(f"DROP TABLE IF EXISTS {STAGING_TABLE}")
+        conn.execute(f"DROP TABLE IF EXISTS {SHARDS_TABLE}")
+        conn.commit()
@@ -0,0 +1,248 @@
+"""
+Pluggable conversation scorers, run inline or deferred, with per-stage timing
+"""
+
+import importlib.util
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+from ..core.analysis import ENGAGEMENT_MARKERS, TECHNICAL_TERMS, ConversationAnalysis, analyze_conversation
+from ..core.config import config
+
+
+class StageTimer:
+    """Wall-clock time spent in the named stages of one request"""
+
+    def __init__(self):
+        self.seconds: Dict[str, float] = {}
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Time a block as the stage 'name' (repeated stages add up)"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.seconds[name] = self.seconds.get(name, 0.0) + time.perf_counter() - start
+
+    def as_ms(self) -> Dict[str, float]:
+        """Stage times in milliseconds, in the order the stages ran"""
+        return {name: seconds * 1000 for name, seconds in self.seconds.items()}
+
+
+class StageStatistics:
+    """Running count, average and maximum time of each stage across requests"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stages: Dict[str, List[float]] = {}
+
+    def record(self, timer: StageTimer):
+        """Add the stage times of one request"""
+        with self._lock:
+            for name, seconds in timer.seconds.items():
+                stats = self._stages.setdefault(name, [0, 0.0, 0.0])
+                stats[0] += 1
+                stats[1] += seconds
+                stats[2] = max(stats[2], seconds)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Per stage: number of runs, average and maximum milliseconds"""
+        with self._lock:
+            return {
+                name: {'count': count, 'avg_ms': total / count * 1000, 'max_ms': longest * 1000}
+                for name, (count, total, longest) in self._stages.items()
+            }
+
+
+class Scorer:
+    """
+    Computes one or more quality scores for a conversation
+
+    Cheap scorers run inline while learning from a conversation. Expensive
+    ones (expensive = True) run later in a worker pool over queued
+    conversations; they may load models lazily, once per worker process.
+    """
+
+    name = ""
+    expensive = False
+
+    def available(self) -> bool:
+        """Whether the scorer's dependencies are installed"""
+        return True
+
+    def score(self, user_input: str, assistant_response: str,
+              conversation: ConversationAnalysis) -> Dict[str, float]:
+        """Scores keyed by score name, between 0 and 1"""
+        raise NotImplementedError
+
+
+class HeuristicScorer(Scorer):
+    """The built-in relevance, completeness, clarity, engagement and technical heuristics"""
+
+    name = "heuristics"
+
+    def score(self, user_input: str, assistant_response: str,
+              conversation: ConversationAnalysis) -> Dict[str, float]:
+        user, response = conversation.user, conversation.response
+
+        analysis = {
+            'relevance_score': 0.0,
+            'completeness_score': 0.0,
+            'clarity_score': 0.0,
+            'engagement_score': 0.0,
+            'technical_accuracy': 0.0
+        }
+
+        # Simple heuristic analysis (can be enhanced with ML models)
+
+        # Relevance: Basic keyword matching
+        keyword_overlap = len(user.tokens & response.tokens)
+        analysis['relevance_score'] = min(1.0, keyword_overlap / max(len(user.tokens), 1))
+
+        # Completeness: Response length relative to question complexity
+        analysis['completeness_score'] = min(1.0, response.word_count / max(user.word_count * 2, 10))
+
+        # Clarity: Sentence structure and readability
+        avg_sentence_length = response.sentence_words / response.sentence_count
+        analysis['clarity_score'] = max(0.0, 1.0 - (avg_sentence_length - 15) / 20)
+
+        # Engagement: Presence of questions, examples, or creative elements
+        engagement_count = sum(1 for marker in ENGAGEMENT_MARKERS if marker in response.keywords)
+        analysis['engagement_score'] = min(1.0, engagement_count / 3)
+
+        # Technical accuracy: Presence of specific technical terms when appropriate
+        tech_question = user.has_any(TECHNICAL_TERMS)
+        tech_response = response.has_any(TECHNICAL_TERMS)
+        analysis['technical_accuracy'] = 1.0 if (tech_question and tech_response) or not tech_question else 0.5
+
+        return analysis
+
+
+class SpacyScorer(Scorer):
+    """Share of the noun phrases of the question that the response picks up (spaCy)"""
+
+    name = "spacy"
+    expensive = True
+
+    def __init__(self, model: str = "en_core_web_sm"):
+        self.model = model
+        self._nlp = None
+
+    def available(self) -> bool:
+        return importlib.util.find_spec("spacy") is not None
+
+    def score(self, user_input: str, assistant_response: str,
+              conversation: ConversationAnalysis) -> Dict[str, float]:
+        if self._nlp is None:
+            import spacy
+            self._nlp = spacy.load(self.model, disable=["ner"])
+
+        question, response = self._nlp(user_input), self._nlp(assistant_response)
+        phrases = {chunk.root.lemma_.lower() for chunk in question.noun_chunks}
+        if not phrases:
+            return {'entity_coverage': 1.0}
+        lemmas = {token.lemma_.lower() for token in response}
+        return {'entity_coverage': len(phrases & lemmas) / len(phrases)}
+
+
+class TransformerScorer(Scorer):
+    """Semantic similarity of question and response from sentence embeddings (transformers)"""
+
+    name = "transformers"
+    expensive = True
+
+    def __init__(self, model: str = "sentence-transformers/all-MiniLM-L6-v2"):
+        self.model = model
+        self._tokenizer = None
+        self._encoder = None
+
+    def available(self) -> bool:
+        return all(importlib.util.find_spec(module) is not None for module in ("transformers", "torch"))
+
+    def score(self, user_input: str, assistant_response: str,
+              conversation: ConversationAnalysis) -> Dict[str, float]:
+        import torch
+
+        if self._encoder is None:
+            from transformers import AutoModel, AutoTokenizer
+            self._tokenizer = AutoTokenizer.from_pretrained(self.model)
+            self._encoder = AutoModel.from_pretrained(self.model).eval()
+
+        batch = self._tokenizer([user_input, assistant_response], padding=True,
+                                truncation=True, max_length=256, return_tensors="pt")
+        with torch.no_grad():
+            hidden = self._encoder(**batch).last_hidden_state
+        # Mean of the token embeddings, ignoring padding
+        mask = batch["attention_mask"].unsqueeze(-1).float()
+        embeddings = (hidden * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1e-9)
+        similarity = torch.nn.functional.cosine_similarity(embeddings[0:1], embeddings[1:2]).item()
+        return {'semantic_relevance': max(0.0, similarity)}
+
+
+# Scorers by name; register_scorer() adds more
+SCORERS: Dict[str, Scorer] = {}
+
+
+def register_scorer(scorer: Scorer) -> Scorer:
+    """
+    Add a scorer to the registry, replacing one of the same name
+
+    Cheap scorers take part in every quality analysis; expensive ones run
+    only when listed in DEFERRED_SCORERS.
+    """
+    if not scorer.name:
+        raise ValueError("A scorer needs a name")
+    SCORERS[scorer.name] = scorer
+    return scorer
+
+
+def unregister_scorer(name: str):
+    """Remove a scorer from the registry"""
+    SCORERS.pop(name, None)
+
+
+register_scorer(HeuristicScorer())
+register_scorer(SpacyScorer())
+register_scorer(TransformerScorer())
+
+
+def inline_scorers() -> List[Scorer]:
+    """Cheap scorers, run on the request path"""
+    return [scorer for scorer in SCORERS.values() if not scorer.expensive]
+
+
+def deferred_scorers(names: Optional[List[str]] = None) -> List[Scorer]:
+    """
+    Expensive scorers to run in the background
+
+    Args:
+        names: Scorer names (defaults to DEFERRED_SCORERS); unknown names and
+            scorers whose dependencies are missing are left out
+    """
+    if names is None:
+        names = [name.strip() for name in config.deferred_scorers.split(",") if name.strip()]
+    return [SCORERS[name] for name in names
+            if name in SCORERS and SCORERS[name].expensive and SCORERS[name].available()]
+
+
+def score_inline(user_input: str, assistant_response: str,
+                 conversation: Optional[ConversationAnalysis] = None,
+                 timer: Optional[StageTimer] = None) -> Dict[str, float]:
+    """
+    Run the cheap scorers, each timed as the stage 'score.<name>'
+
+    Returns:
+        The scores of all cheap scorers, in registration order
+    """
+    timer = timer or StageTimer()
+    if conversation is None:
+        with timer.stage("profile"):
+            conversation = analyze_conversation(user_input, assistant_response)
+
+    scores: Dict[str, float] = {}
+    for scorer in inline_scorers():
+        with timer.stage(f"score.{scorer.name}"):
+            scores.update(scorer.score(user_input, assistant_response, conversation))
+    return scores
@@ -0,0 +1,228 @@
+"""
+Conversation sessions of many users sharing one assistant
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from ..core.assistant import AIAssistant, ConversationMemory
+from ..core.config import config
+from ..utils.logger import nexus_logger
+
+
+class UnknownSessionError(KeyError):
+    """A session ID that is neither in memory nor spilled to disk"""
+
+
+class _Session:
+    """A session held in memory"""
+
+    __slots__ = ('memory', 'last_used', 'users')
+
+    def __init__(self, memory: ConversationMemory):
+        self.memory = memory
+        self.last_used = time.monotonic()
+        self.users = 0
+
+
+class SessionManager:
+    """
+    Per-session conversation memories around one shared assistant
+
+    All sessions share the assistant's provider client and learning engine.
+    Their memories are kept in an LRU of at most max_sessions entries;
+    sessions idle for longer than timeout seconds, and the least recently
+    used ones beyond max_sessions, are written to spill_dir and dropped from
+    memory. The next message of an evicted session reads it back. Sessions
+    in use (see use()) are never evicted. New sessions get a generated ID;
+    asking for an ID that was never handed out (or was dropped) raises
+    UnknownSessionError rather than silently starting an empty conversation.
+    """
+
+    def __init__(self, assistant: Optional[AIAssistant] = None, max_sessions: Optional[int] = None,
+                 timeout: Optional[float] = None, spill_dir: Optional[str] = None):
+        """
+        Args:
+            assistant: Assistant answering for all sessions (defaults to a new one)
+            max_sessions: Sessions kept in memory (defaults to SESSION_MAX_ACTIVE)
+            timeout: Idle seconds before a session is evicted (defaults to SESSION_TIMEOUT)
+            spill_dir: Directory evicted sessions are written to (defaults to SESSION_DIR)
+        """
+        self.assistant = assistant if assistant is not None else AIAssistant()
+        self.max_sessions = config.session_max_active if max_sessions is None else max_sessions
+        self.timeout = config.session_timeout if timeout is None else timeout
+        self.spill_dir = Path(spill_dir or config.session_dir)
+        self.logger = nexus_logger
+        self._sessions: "OrderedDict[str, _Session]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.spilled = 0
+        self.reloaded = 0
+
+    def get(self, session_id: Optional[str] = None) -> Tuple[str, ConversationMemory]:
+        """
+        Memory of a session, reloading it if it was evicted
+
+        Args:
+            session_id: The session; None starts a new one
+
+        Returns:
+            The session ID (generated for new sessions) and its memory
+
+        Raises:
+            UnknownSessionError: No session has that ID
+        """
+        with self._lock:
+            session_id, session = self._get(session_id)
+            self._evict()
+            return session_id, session.memory
+
+    @contextmanager
+    def use(self, session_id: Optional[str] = None) -> Iterator[Tuple[str, ConversationMemory]]:
+        """Like get(), keeping the session in memory until the block exits"""
+        with self._lock:
+            session_id, session = self._get(session_id)
+            session.users += 1
+            self._evict()
+        try:
+            yield session_id, session.memory
+        finally:
+            with self._lock:
+                session.users -= 1
+                session.last_used = time.monotonic()
+                if session_id in self._sessions:
+                    self._sessions.move_to_end(session_id)
+
+    def exists(self, session_id: str) -> bool:
+        """Whether a session is in memory or spilled to disk"""
+        with self._lock:
+            return session_id in self._sessions or self._path(session_id).exists()
+
+    def drop(self, session_id: str):
+        """Forget a session, in memory and on disk"""
+        with self._lock:
+            self._sessions.pop(session_id, None)
+            path = self._path(session_id)
+            if path.exists():
+                path.unlink()
+
+    def evict_idle(self) -> int:
+        """
+        Spill sessions that have been idle for longer than the timeout
+
+        Returns:
+            Number of sessions evicted
+        """
+        with self._lock:
+            return self._evict()
+
+    def spill_all(self):
+        """Write every session to disk and empty the memory (on shutdown)"""
+        with self._lock:
+            for session_id in list(self._sessions):
+                self._spill(session_id)
+
+    def stats(self) -> Dict[str, Any]:
+        """Sessions in memory and in use, and spill/reload counts"""
+        with self._lock:
+            return {
+                'active': len(self._sessions),
+                'in_use': sum(1 for session in self._sessions.values() if session.users),
+                'max_sessions': self.max_sessions,
+                'spilled': self.spilled,
+                'reloaded': self.reloaded,
+            }
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def __contains__(self, session_id: str) -> bool:
+        """Whether a session is in memory (see exists())"""
+        return session_id in self._sessions
+
+    def _get(self, session_id: Optional[str]) -> Tuple[str, _Session]:
+        """The session, from memory, disk or new; marked as most recently used"""
+        if session_id is None:
+            session_id = uuid.uuid4().hex
+            session = self._sessions[session_id] = _Session(self.assistant.new_memory())
+            return session_id, session
+        session = self._sessions.get(session_id)
+        if session is None:
+            memory = self._load(session_id)
+            if memory is None:
+                raise UnknownSessionError(session_id)
+            session = self._sessions[session_id] = _Session(memory)
+        else:
+            self._sessions.move_to_end(session_id)
+            session.last_used = time.monotonic()
+        return session_id, session
+
+    def _evict(self) -> int:
+        """Spill idle sessions, then the least recently used beyond max_sessions"""
+        evicted = 0
+        if self.timeout:
+            deadline = time.monotonic() - self.timeout
+            for session_id, session in list(self._sessions.items()):
+                if session.last_used > deadline:
+                    break  # The rest were used more recently
+                if not session.users:
+                    evicted += self._spill(session_id)
+
+        excess = len(self._sessions) - self.max_sessions
+        if excess > 0:
+            for session_id, session in list(self._sessions.items()):
+                if excess <= 0:
+                    break
+                if not session.users and self._spill(session_id):
+                    evicted += 1
+                    excess -= 1
+        return evicted
+
+    def _path(self, session_id: str) -> Path:
+        """Spill file of a session (named by a hash, so any session ID is safe)"""
+        return self.spill_dir / f"{hashlib.sha256(session_id.encode('utf-8')).hexdigest()[:32]}.json"
+
+    def _spill(self, session_id: str) -> bool:
+        """Write a session to disk and drop it from memory; False if it could not be written"""
+        session = self._sessions[session_id]
+        path = self._path(session_id)
+        try:
+            self.spill_dir.mkdir(parents=True, exist_ok=True)
+            temporary = path.with_suffix(".tmp")
+            with open(temporary, "w", encoding="utf-8") as f:
+                json.dump({
+                    'session_id': session_id,
+                    'max_size': session.memory.max_size,
+                    'messages': session.memory.messages,
+                }, f, ensure_ascii=False)
+            os.replace(temporary, path)
+        except OSError as e:
+            self.logger.error(f"Could not spill session {session_id[:12]}: {e}")
+            return False
+        del self._sessions[session_id]
+        self.spilled += 1
+        return True
+
+    def _load(self, session_id: str) -> Optional[ConversationMemory]:
+        """Read a spilled session back, removing its file"""
+        path = self._path(session_id)
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            self.logger.error(f"Could not reload session {session_id[:12]}: {e}")
+            return None
+        memory = ConversationMemory(data['max_size'])
+        memory.messages = data['messages']
+        path.unlink()
+        self.reloaded += 1
+        return memory
@@ -0,0 +1,168 @@
+"""
+Storage backends for the Nexus learning database
+"""
+
+import hashlib
+import re
+import sqlite3
+import threading
+import uuid
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Dict, Optional
+from urllib.parse import urlparse
+from ..core.blobs import register_functions
+
+
+def _connect(database: str, uri: bool = False, **kwargs) -> sqlite3.Connection:
+    """Open a SQLite connection with the Nexus SQL functions registered"""
+    conn = sqlite3.connect(database, uri=uri, **kwargs)
+    register_functions(conn)
+    return conn
+
+
+class StorageBackend(ABC):
+    """Hands out SQLite connections to wherever learning data is kept"""
+
+    # Filesystem location of the database, if it has one
+    path: Optional[Path] = None
+
+    @abstractmethod
+    def connect(self, read_only: bool = False) -> sqlite3.Connection:
+        """Open a new connection to the backing database"""
+
+    def for_tenant(self, tenant: str) -> "StorageBackend":
+        """Backend holding the data of one tenant (the same one unless sharded)"""
+        return self
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.path or ''})"
+
+
+class SQLiteFileBackend(StorageBackend):
+    """A single SQLite database file"""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+
+    def connect(self, read_only: bool = False) -> sqlite3.Connection:
+        """Open a new connection to the database file"""
+        if read_only:
+            return _connect(f"{self.path.resolve().as_uri()}?mode=ro", uri=True)
+        if self.path.parent != Path("."):
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        return _connect(str(self.path))
+
+
+class MemoryBackend(StorageBackend):
+    """
+    In-memory database shared by all connections of this backend
+
+    The database lives as long as the backend object, which keeps one
+    connection open; nothing touches the filesystem.
+
+    Connections use SQLite's memdb VFS, which locks the whole database like
+    a file does, so concurrent writers wait for each other (up to the busy
+    timeout). Shared-cache memory databases, the fallback for SQLite before
+    3.36, lock per table and fail at once with "database table is locked".
+    """
+
+    def __init__(self, name: Optional[str] = None):
+        self.name = name or f"nexus-{uuid.uuid4().hex}"
+        if sqlite3.sqlite_version_info >= (3, 36):
+            self.uri = f"file:/{self.name}?vfs=memdb"
+        else:
+            self.uri = f"file:{self.name}?mode=memory&cache=shared"
+        self._keeper = sqlite3.connect(self.uri, uri=True, check_same_thread=False)
+
+    def connect(self, read_only: bool = False) -> sqlite3.Connection:
+        """Open a new connection to the shared in-memory database"""
+        # Read-only mode would hide the writes of the other connections
+        return _connect(self.uri, uri=True)
+
+    def close(self):
+        """Release the database once all other connections are closed"""
+        self._keeper.close()
+
+    def __repr__(self) -> str:
+        return f"MemoryBackend({self.name})"
+
+
+class ShardedSQLiteBackend(StorageBackend):
+    """One SQLite file per tenant inside a directory"""
+
+    def __init__(self, directory: str, default_tenant: str = "default"):
+        self.directory = Path(directory)
+        self.default_tenant = default_tenant
+        self._shards: Dict[str, SQLiteFileBackend] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def path(self) -> Optional[Path]:
+        return self.for_tenant(self.default_tenant).path
+
+    def for_tenant(self, tenant: str) -> StorageBackend:
+        """File backend for a tenant, created on first use"""
+        tenant = tenant or self.default_tenant
+        # Tenant ids become file names: a readable prefix of their safe
+        # characters, and a hash of the whole id so distinct ids never share a file
+        digest = hashlib.sha256(tenant.encode("utf-8")).hexdigest()[:32]
+        shard_name = f"{re.sub(r'[^A-Za-z0-9_-]', '_', tenant)[:40]}-{digest}"
+        with self._lock:
+            if shard_name not in self._shards:
+                self._shards[shard_name] = SQLiteFileBackend(str(self.directory / f"{shard_name}.db"))
+            return self._shards[shard_name]
+
+    def connect(self, read_only: bool = False) -> sqlite3.Connection:
+        """Open a connection to the default tenant's shard"""
+        return self.for_tenant(self.default_tenant).connect(read_only=read_only)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Sent to worker processes (see reanalysis.py); locks do not pickle
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return f"ShardedSQLiteBackend({self.directory})"
+
+
+def create_backend(url: str) -> StorageBackend:
+    """
+    Create a storage backend from a database URL
+
+    Supported forms:
+        sqlite:///relative/path.db     SQLite file (four slashes for absolute paths)
+        sqlite:///:memory:             private in-memory database
+        memory://[name]                in-memory database shared by name
+        sqlite+sharded:///directory    one SQLite file per tenant
+
+    Args:
+        url: The database URL, usually from DATABASE_URL
+
+    Returns:
+        The matching storage backend
+    """
+    parsed = urlparse(url)
+    scheme = parsed.scheme.lower()
+    # urlparse keeps the leading slash of sqlite:///path; strip exactly one
+    location = url.split("://", 1)[1] if "://" in url else ""
+    if location.startswith("/"):
+        location = location[1:]
+
+    if scheme == "memory":
+        return MemoryBackend(parsed.netloc or None)
+    if scheme == "sqlite":
+        if location in ("", ":memory:"):
+            return MemoryBackend()
+        return SQLiteFileBackend(location)
+    if scheme == "sqlite+sharded":
+        if not location:
+            raise ValueError("Sharded SQLite URL needs a directory, e.g. sqlite+sharded:///data/tenants")
+        return ShardedSQLiteBackend(location)
+
+    raise ValueError(f"Unsupported database URL: {url}")
@@ -0,0 +1,200 @@
+"""
+Streaming export and import of Nexus learning data
+"""
+
+import csv
+import gzip
+import io
+import json
+import sqlite3
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from ..core.learning import LearningDatabase, CONTENT_HASH_COLUMNS, TEXT_COLUMNS, TEXT_VIEWS, content_hash
+from ..utils.logger import nexus_logger
+
+
+# Tables carried between nodes, in import order
+TRANSFER_TABLES = ('conversations', 'knowledge_patterns', 'learning_insights')
+
+
+def open_jsonl(path: str, mode: str, compress: Optional[bool] = None) -> io.TextIOBase:
+    """
+    Open a JSONL file for text reading or writing, gzip-compressed when asked
+
+    Args:
+        path: File path
+        mode: 'r', 'w' or 'a'
+        compress: Force compression on or off (defaults to a .gz suffix check)
+    """
+    if compress is None:
+        compress = str(path).endswith(".gz")
+    if compress:
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+class LearningDataTransfer:
+    """Exports and imports learning data as chunked JSONL"""
+
+    def __init__(self, db: Optional[LearningDatabase] = None, chunk_size: int = 1000):
+        self.db = db or LearningDatabase()
+        self.chunk_size = chunk_size
+        self.logger = nexus_logger
+
+    def iter_rows(self, table: str) -> Iterator[Dict[str, Any]]:
+        """
+        Stream the rows of a table in id order, one chunk in memory at a time
+
+        The local id is left out; rows are identified by their content hash.
+        Conversation texts are resolved from blob storage.
+        """
+        if table not in TRANSFER_TABLES:
+            raise ValueError(f"Unknown learning table: {table}")
+        source = TEXT_VIEWS.get(table, table)
+
+        conn = self.db.connect()
+        conn.row_factory = sqlite3.Row
+        last_id = 0
+        try:
+            while True:
+                rows = conn.execute(f"""
+                    SELECT * FROM {source}
+                    WHERE id > ?
+                    ORDER BY id
+                    LIMIT ?
+                """, (last_id, self.chunk_size)).fetchall()
+                if not rows:
+                    break
+                last_id = rows[-1]['id']
+                for row in rows:
+                    record = dict(row)
+                    del record['id']
+                    yield record
+        finally:
+            conn.close()
+
+    def export(self, path: str, tables: Iterable[str] = TRANSFER_TABLES,
+               compress: Optional[bool] = None) -> Dict[str, int]:
+        """
+        Write learning data to a JSONL file
+
+        Each line is {"table": ..., "row": {...}}.
+
+        Returns:
+            Number of exported rows per table
+        """
+        counts = {}
+        with open_jsonl(path, "w", compress) as output:
+            for table in tables:
+                counts[table] = 0
+                for row in self.iter_rows(table):
+                    output.write(json.dumps({'table': table, 'row': row}, ensure_ascii=False) + "\n")
+                    counts[table] += 1
+
+        self.logger.info(f"Exported learning data to {path}: {counts}")
+        return counts
+
+    def import_file(self, path: str, compress: Optional[bool] = None) -> Dict[str, int]:
+        """
+        Load learning data exported by export()
+
+        Rows whose content hash already exists are skipped, so importing the
+        same file twice is harmless.
+
+        Returns:
+            Number of newly inserted rows per table
+        """
+        counts = {table: 0 for table in TRANSFER_TABLES}
+
+        conn = self.db.connect()
+        columns = {table: self._table_columns(conn, table) for table in TRANSFER_TABLES}
+        try:
+            with open_jsonl(path, "r", compress) as source:
+                for table, rows in self._batches(source):
+                    if table not in columns:
+                        raise ValueError(f"Unknown learning table in import: {table}")
+                    counts[table] += self._insert_batch(conn, table, columns[table], rows)
+                    conn.commit()
+        finally:
+            conn.close()
+
+        self.logger.info(f"Imported learning data from {path}: {counts}")
+        return counts
+
+    def apply_feedback(self, path: str) -> Dict[str, int]:
+        """
+        Apply a file of ratings to stored conversations in one transaction
+
+        Accepts JSONL or CSV records with a `content_hash` (or `conversation_id`)
+        and a `feedback` value of 1, 0 or -1.
+
+        Returns:
+            Number of applied and unmatched ratings
+        """
+        total = applied = 0
+        # Ratings take the path of single ones, so the patterns learned from
+        # each conversation get its new feedback too
+        with self.db.transaction():
+            for feedback, conversation_id in self._read_ratings(path):
+                total += 1
+                applied += self.db.update_feedback(conversation_id, feedback)
+
+        self.logger.info(f"Applied {applied} of {total} feedback ratings from {path}")
+        return {'applied': applied, 'unmatched': total - applied}
+
+    def _batches(self, source: Iterable[str]) -> Iterator[Tuple[str, List[Dict[str, Any]]]]:
+        """Group consecutive JSONL records of the same table into bounded batches"""
+        table, batch = None, []
+        for line in source:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if batch and (record['table'] != table or len(batch) >= self.chunk_size):
+                yield table, batch
+                batch = []
+            table = record['table']
+            batch.append(record['row'])
+        if batch:
+            yield table, batch
+
+    def _insert_batch(self, conn: sqlite3.Connection, table: str, columns: List[str],
+                      rows: List[Dict[str, Any]]) -> int:
+        """Insert rows that are not present yet, returning how many were added"""
+        hash_columns = CONTENT_HASH_COLUMNS[table]
+        for row in rows:
+            if not row.get('content_hash'):
+                row['content_hash'] = content_hash(*(row.get(column) for column in hash_columns))
+            if table == 'conversations':
+                # Texts go to blob storage like those of store_conversation
+                for column, hash_column in TEXT_COLUMNS.items():
+                    row[hash_column] = self.db.store_text(conn.cursor(), row.get(column) or '')
+                    row[column] = ''
+
+        # Only columns known locally are copied, in a fixed order
+        present = [column for column in columns if any(column in row for row in rows)]
+        placeholders = ", ".join("?" for _ in present)
+        cursor = conn.executemany(
+            f"INSERT OR IGNORE INTO {table} ({', '.join(present)}) VALUES ({placeholders})",
+            [tuple(row.get(column) for column in present) for row in rows]
+        )
+        return cursor.rowcount
+
+    def _read_ratings(self, path: str) -> Iterator[Tuple[int, str]]:
+        """Yield (feedback, content_hash) pairs from a JSONL or CSV ratings file"""
+        is_csv = str(path).endswith((".csv", ".csv.gz"))
+        with open_jsonl(path, "r") as source:
+            if is_csv:
+                records: Iterable[Dict[str, Any]] = csv.DictReader(source)
+            else:
+                records = (json.loads(line) for line in source if line.strip())
+
+            for record in records:
+                conversation = record.get('content_hash') or record.get('conversation_id')
+                feedback = int(record['feedback'])
+                if feedback not in (-1, 0, 1):
+                    raise ValueError(f"Feedback must be -1, 0 or 1, got {feedback}")
+                yield feedback, conversation
+
+    @staticmethod
+    def _table_columns(conn: sqlite3.Connection, table: str) -> List[str]:
+        """Columns of a local table, excluding the local row id"""
+        return [row[1] for row in conn.execute(f"PRAGMA table_info({table})") if row[1] != 'id']
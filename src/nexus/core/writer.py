@@ -0,0 +1,263 @@
+"""
+Single-writer process for learning data shared by several workers
+"""
+
+import queue
+import threading
+import time
+from multiprocessing.connection import Client, Connection, Listener
+from typing import Any, Dict, List, Optional, Tuple
+from ..core.config import config
+from ..core.learning import LearningDatabase, content_hash, utc_timestamp
+from ..core.storage import create_backend
+from ..utils.authkey import create_authkey, key_path, read_authkey
+from ..utils.logger import nexus_logger
+
+
+# LearningDatabase methods that may be sent to the writer
+WRITE_OPERATIONS = ('store_conversation', 'store_pattern', 'update_feedback', 'enqueue_scoring')
+
+# (operation, tenant, keyword arguments)
+WriteRequest = Tuple[str, Optional[str], Dict[str, Any]]
+
+
+class LearningWriter:
+    """
+    Owns all learning writes for one database
+
+    Clients send write requests over a local socket; a single committer thread
+    applies them in batches, one transaction per batch, so worker processes
+    never contend for the SQLite write lock. Clients authenticate with a
+    random key the writer stores next to its socket, readable only by the
+    user running it.
+    """
+
+    def __init__(self, address: Optional[str] = None, database_url: Optional[str] = None,
+                 batch_size: int = 500, max_delay: float = 0.05):
+        """
+        Args:
+            address: Unix socket path (or Windows pipe name) to listen on
+            database_url: Database to write to (defaults to DATABASE_URL)
+            batch_size: Maximum number of writes committed together
+            max_delay: Seconds to wait for more writes before committing a batch
+        """
+        self.address = address or config.learning_writer_address
+        if not self.address:
+            raise ValueError("A writer address is required (LEARNING_WRITER_ADDRESS)")
+        self.backend = create_backend(database_url or config.database_url)
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self.logger = nexus_logger
+        self._queue: "queue.Queue[Any]" = queue.Queue()
+        self._databases: Dict[Optional[str], LearningDatabase] = {}
+        self._listener: Optional[Listener] = None
+        self._authkey = b""
+        self._running = threading.Event()
+        self.committed = 0
+
+    def serve_forever(self):
+        """Accept clients and commit their writes until stop() is called"""
+        # Create the schema up front so readers can open read-only connections
+        self._database(None)
+        self._authkey = create_authkey(self.address)
+        self._listener = Listener(self.address, authkey=self._authkey)
+        self._running.set()
+        committer = threading.Thread(target=self._commit_loop, name="nexus-writer-commit", daemon=True)
+        committer.start()
+        self.logger.info(f"Learning writer listening on {self.address}")
+
+        try:
+            while self._running.is_set():
+                try:
+                    conn = self._listener.accept()
+                except (OSError, EOFError):
+                    if not self._running.is_set():
+                        break
+                    continue
+                threading.Thread(target=self._receive, args=(conn,), daemon=True).start()
+        finally:
+            self._running.clear()
+            self._queue.put(None)
+            committer.join()
+            self._listener.close()
+            key_path(self.address).unlink(missing_ok=True)
+
+    def stop(self):
+        """Stop accepting clients; queued writes are still committed"""
+        self._running.clear()
+        # accept() does not notice a closed listener, so wake it with a connection
+        try:
+            Client(self.address, authkey=self._authkey).close()
+        except (OSError, EOFError):
+            pass
+
+    def _receive(self, conn: Connection):
+        """Queue the requests of one client connection"""
+        try:
+            while True:
+                operation, tenant, kwargs = conn.recv()
+                if operation == 'flush':
+                    # Acknowledge once everything sent before it is committed
+                    self._flush()
+                    conn.send(True)
+                elif operation in WRITE_OPERATIONS:
+                    self._queue.put((operation, tenant, kwargs))
+                else:
+                    self.logger.warning(f"Learning writer ignored unknown operation: {operation}")
+        except (EOFError, OSError):
+            pass
+        finally:
+            conn.close()
+
+    def _flush(self):
+        """Block until all writes queued so far are committed"""
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait()
+
+    def _commit_loop(self):
+        """
+        Drain the queue in batches, committing each batch in one transaction
+
+        Besides write requests the queue carries flush events, which are set
+        once the writes before them are committed, and None, which stops the loop.
+        """
+        stopping = False
+        while not stopping:
+            batch: List[Any] = [self._queue.get()]
+            deadline = time.monotonic() + self.max_delay
+            # A marker ends the batch early so flushes are acknowledged promptly
+            while len(batch) < self.batch_size and isinstance(batch[-1], tuple):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            writes = [item for item in batch if isinstance(item, tuple)]
+            if writes:
+                self._apply(writes)
+            for item in batch:
+                if isinstance(item, threading.Event):
+                    item.set()
+                elif item is None:
+                    stopping = True
+
+    def _apply(self, writes: List[WriteRequest]):
+        """Apply a batch of writes, grouped per tenant database"""
+        by_tenant: Dict[Optional[str], List[WriteRequest]] = {}
+        for write in writes:
+            by_tenant.setdefault(write[1], []).append(write)
+
+        for tenant, tenant_writes in by_tenant.items():
+            db = self._database(tenant)
+            try:
+                with db.transaction():
+                    for operation, _, kwargs in tenant_writes:
+                        getattr(db, operation)(**kwargs)
+                self.committed += len(tenant_writes)
+            except Exception as e:
+                # Retry one by one so a single bad write cannot sink the batch
+                self.logger.error(f"Learning writer batch failed, retrying individually: {e}")
+                for operation, _, kwargs in tenant_writes:
+                    try:
+                        getattr(db, operation)(**kwargs)
+                        self.committed += 1
+                    except Exception as write_error:
+                        self.logger.error(f"Dropped learning write {operation}: {write_error}")
+
+    def _database(self, tenant: Optional[str]) -> LearningDatabase:
+        """Writable database for a tenant, opened on first use"""
+        if tenant not in self._databases:
+            self._databases[tenant] = LearningDatabase(backend=self.backend, tenant=tenant)
+        return self._databases[tenant]
+
+
+class WriterClient:
+    """
+    Sends learning writes to a LearningWriter instead of the database
+
+    Exposes the write methods of LearningDatabase. If the writer cannot be
+    reached, writes fall back to a direct database connection so no learning
+    data is lost.
+    """
+
+    def __init__(self, address: Optional[str] = None, tenant: Optional[str] = None):
+        self.address = address or config.learning_writer_address
+        self.tenant = tenant
+        self.logger = nexus_logger
+        self._conn: Optional[Connection] = None
+        self._lock = threading.Lock()
+        self._fallback: Optional[LearningDatabase] = None
+
+    def store_conversation(self, user_input: str, assistant_response: str, **kwargs: Any) -> str:
+        """Queue a conversation write and return its content hash"""
+        # The timestamp is fixed here so the hash is known before the write lands
+        timestamp = kwargs.pop('timestamp', None) or utc_timestamp()
+        self._send('store_conversation', dict(kwargs, user_input=user_input,
+                                              assistant_response=assistant_response,
+                                              timestamp=timestamp))
+        return content_hash(user_input, assistant_response, timestamp)
+
+    def store_pattern(self, pattern_type: str, pattern_data: Dict[str, Any], **kwargs: Any):
+        """Queue a knowledge pattern write"""
+        self._send('store_pattern', dict(kwargs, pattern_type=pattern_type, pattern_data=pattern_data))
+
+    def update_feedback(self, conversation_id: str, feedback: int):
+        """Queue a feedback update for a stored conversation"""
+        if feedback not in (-1, 0, 1):
+            raise ValueError(f"Feedback must be -1, 0 or 1, got {feedback}")
+        self._send('update_feedback', {'conversation_id': conversation_id, 'feedback': feedback})
+
+    def enqueue_scoring(self, conversation_id: str):
+        """Queue a stored conversation for the expensive scorers"""
+        self._send('enqueue_scoring', {'conversation_id': conversation_id})
+
+    def flush(self):
+        """Wait until the writer has committed everything sent so far"""
+        with self._lock:
+            conn = self._connection()
+            if conn is None:
+                return
+            conn.send(('flush', self.tenant, {}))
+            conn.recv()
+
+    def close(self):
+        """Close the connection to the writer"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _send(self, operation: str, kwargs: Dict[str, Any]):
+        """Send one write request, falling back to a direct write on failure"""
+        with self._lock:
+            conn = self._connection()
+            if conn is not None:
+                try:
+                    conn.send((operation, self.tenant, kwargs))
+                    return
+                except (OSError, EOFError) as e:
+                    self.logger.warning(f"Lost connection to learning writer: {e}")
+                    self._conn = None
+
+        if self._fallback is None:
+            self._fallback = LearningDatabase(tenant=self.tenant)
+        getattr(self._fallback, operation)(**kwargs)
+
+    def _connection(self) -> Optional[Connection]:
+        """Connect to the writer on first use (caller holds the lock)"""
+        if self._conn is None:
+            try:
+                self._conn = Client(self.address, authkey=read_authkey(self.address))
+            except (OSError, EOFError) as e:
+                self.logger.warning(f"Learning writer unavailable at {self.address}: {e}")
+                return None
+        return self._conn
+
+
+def run_writer(address: Optional[str] = None, **kwargs: Any):
+    """Run a learning writer in the current process (multiprocessing target)"""
+    LearningWriter(address, **kwargs).serve_forever()
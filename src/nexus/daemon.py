@@ -0,0 +1,256 @@
+"""
+Resident assistant answering the command line over a local socket
+
+Every `nexus ask` otherwise imports the model clients, reads the config,
+builds an AIAssistant (asking Ollama for its models) and opens the learning
+database before sending a single request. `nexus daemon` does that once and
+keeps it warm; ask, chat and stats connect to it when it is running. This
+module imports nothing heavy at the top, so connecting costs milliseconds.
+"""
+
+import os
+import threading
+import time
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Connection, Listener
+from typing import Any, Dict, List, Optional
+
+from .utils.authkey import create_authkey, key_path, read_authkey
+
+
+# Address used when DAEMON_ADDRESS is not set (see Config.daemon_address)
+DEFAULT_ADDRESS = "nexus-daemon.sock"
+
+
+def daemon_address() -> str:
+    """Address clients connect to; empty when the daemon is disabled"""
+    return os.getenv("DAEMON_ADDRESS", DEFAULT_ADDRESS)
+
+
+class DaemonError(RuntimeError):
+    """The daemon could not carry out a request"""
+
+
+class AssistantDaemon:
+    """
+    Serves one warm AIAssistant to command line clients
+
+    Each client connection is a conversation of its own and is handled on
+    its own thread (the assistant is safe to share between threads).
+    Requests are (operation, keyword arguments) tuples and replies
+    (True, result) or (False, error message). Clients authenticate with a
+    random key stored next to the socket, readable only by the user running
+    the daemon, as for the learning writer.
+    """
+
+    def __init__(self, address: Optional[str] = None, assistant: Any = None):
+        """
+        Args:
+            address: Unix socket path (or Windows pipe name) to listen on
+                (defaults to DAEMON_ADDRESS)
+            assistant: Assistant to serve (default: a new AIAssistant)
+        """
+        from .core.assistant import AIAssistant
+        from .core.config import config
+        from .utils.logger import nexus_logger
+
+        self.address = address or config.daemon_address
+        if not self.address:
+            raise ValueError("A daemon address is required (DAEMON_ADDRESS)")
+        self.logger = nexus_logger
+        self.assistant = assistant if assistant is not None else AIAssistant()
+        self.started = time.time()
+        self.requests = 0
+        self._listener: Optional[Listener] = None
+        self._authkey = b""
+        self._running = threading.Event()
+
+    def serve_forever(self):
+        """Accept clients until stop() is called or a client asks to shut down"""
+        running = connect(self.address)
+        if running is not None:
+            running.close()
+            raise RuntimeError(f"A daemon is already running on {self.address}")
+        if not self.address.startswith("\\\\"):
+            # Left behind by a daemon that did not shut down cleanly
+            try:
+                os.unlink(self.address)
+            except FileNotFoundError:
+                pass
+        self._authkey = create_authkey(self.address)
+        self._listener = Listener(self.address, authkey=self._authkey)
+        self._running.set()
+        self.logger.info(f"Nexus daemon listening on {self.address}")
+
+        try:
+            while self._running.is_set():
+                try:
+                    conn = self._listener.accept()
+                except (OSError, EOFError, AuthenticationError):
+                    if not self._running.is_set():
+                        break
+                    continue
+                threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+        finally:
+            self._running.clear()
+            self._listener.close()
+            key_path(self.address).unlink(missing_ok=True)
+
+    def stop(self):
+        """Stop accepting clients"""
+        self._running.clear()
+        # accept() does not notice a closed listener, so wake it with a connection
+        try:
+            Client(self.address, authkey=self._authkey).close()
+        except (OSError, EOFError):
+            pass
+
+    def _serve(self, conn: Connection):
+        """Answer the requests of one client, which form one conversation"""
+        memory = self.assistant.new_memory()
+        try:
+            while True:
+                operation, kwargs = conn.recv()
+                self.requests += 1
+                try:
+                    conn.send((True, self._handle(operation, kwargs, memory)))
+                except Exception as e:
+                    self.logger.error(f"Daemon request {operation} failed: {e}")
+                    conn.send((False, str(e)))
+                if operation == 'shutdown':
+                    self.stop()
+                    return
+        except (EOFError, OSError):
+            pass
+        finally:
+            conn.close()
+
+    def _handle(self, operation: str, kwargs: Dict[str, Any], memory) -> Any:
+        """Carry out one request for the conversation held in memory"""
+        from .core.assistant import TurnResult
+
+        if operation == 'ask':
+            result = TurnResult()
+            self.assistant.ask(kwargs.pop('question'), memory=memory, result=result, **kwargs)
+            return {'response': result.response, 'conversation_id': result.conversation_id,
+                    'error': result.error}
+        if operation == 'reset':
+            memory.clear(self.assistant.system_prompt)
+            return None
+        if operation == 'history':
+            return memory.get_context()
+        if operation == 'feedback':
+            return self.assistant.provide_feedback(**kwargs)
+        if operation == 'stats':
+            return self.assistant.get_learning_stats(**kwargs)
+        if operation == 'rollup':
+            return self.assistant.get_rollup_stats(**kwargs)
+        if operation == 'improvement':
+            return self.assistant.continuous_improvement_summary()
+        if operation in ('status', 'shutdown'):
+            return {'pid': os.getpid(), 'address': self.address, 'model': self.assistant.model_name,
+                    'uptime': time.time() - self.started, 'requests': self.requests}
+        raise DaemonError(f"Unknown operation: {operation}")
+
+
+class DaemonClient:
+    """
+    One conversation with a running daemon
+
+    Offers the AIAssistant methods the command line uses, so commands can
+    work with either.
+    """
+
+    def __init__(self, conn: Connection, model: Optional[str] = None):
+        """
+        Args:
+            conn: Authenticated connection to the daemon
+            model: Model to answer with instead of the daemon's
+        """
+        self._conn = conn
+        self.model = model
+        self.last_conversation_id: Optional[str] = None
+
+    def request(self, operation: str, **kwargs: Any) -> Any:
+        """
+        Send one request and wait for its result
+
+        Raises:
+            DaemonError: The daemon failed to carry it out
+            ConnectionError: The daemon went away
+        """
+        try:
+            self._conn.send((operation, kwargs))
+            ok, value = self._conn.recv()
+        except (EOFError, OSError) as e:
+            raise ConnectionError(f"Lost connection to the Nexus daemon: {e}") from e
+        if not ok:
+            raise DaemonError(value)
+        return value
+
+    def ask(self, question: str, **kwargs: Any) -> str:
+        """Ask a question in this conversation, like AIAssistant.ask"""
+        if self.model:
+            kwargs.setdefault('model', self.model)
+        result = self.request('ask', question=question, **kwargs)
+        self.last_conversation_id = result['conversation_id']
+        return result['response']
+
+    def reset_conversation(self):
+        """Start this conversation over"""
+        self.request('reset')
+
+    def get_conversation_history(self) -> List[Dict[str, Any]]:
+        """Messages of this conversation"""
+        return self.request('history')
+
+    def provide_feedback(self, user_input: str, assistant_response: str, feedback: int,
+                         context: Dict[str, Any] = None, conversation_id: Optional[str] = None) -> Dict[str, Any]:
+        """Rate an answer, like AIAssistant.provide_feedback"""
+        return self.request('feedback', user_input=user_input, assistant_response=assistant_response,
+                            feedback=feedback, context=context, conversation_id=conversation_id)
+
+    def get_learning_stats(self, recompute: bool = False) -> Dict[str, Any]:
+        """Learning statistics of the daemon's database"""
+        return self.request('stats', recompute=recompute)
+
+    def get_rollup_stats(self, **kwargs: Any) -> List[Dict[str, Any]]:
+        """Time-bucketed statistics, like AIAssistant.get_rollup_stats"""
+        return self.request('rollup', **kwargs)
+
+    def continuous_improvement_summary(self) -> Dict[str, Any]:
+        """Improvement summary of the daemon's assistant"""
+        return self.request('improvement')
+
+    def status(self) -> Dict[str, Any]:
+        """Process ID, address, model, uptime in seconds and requests served"""
+        return self.request('status')
+
+    def shutdown(self) -> Dict[str, Any]:
+        """Stop the daemon; returns its final status"""
+        return self.request('shutdown')
+
+    def close(self):
+        """End this conversation"""
+        self._conn.close()
+
+
+def connect(address: Optional[str] = None, model: Optional[str] = None) -> Optional[DaemonClient]:
+    """
+    Connect to the daemon if one is running
+
+    Args:
+        address: Daemon address (defaults to DAEMON_ADDRESS)
+        model: Model to answer with instead of the daemon's
+
+    Returns:
+        A client, or None when no daemon answers at the address
+    """
+    address = address if address is not None else daemon_address()
+    if not address:
+        return None
+    try:
+        conn = Client(address, authkey=read_authkey(address))
+    except (OSError, EOFError, AuthenticationError):
+        return None
+    return DaemonClient(conn, model=model)
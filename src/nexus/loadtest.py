@@ -0,0 +1,221 @@
+"""
+Load tests for the Nexus API server
+
+Opens many concurrent streaming chats against `nexus serve` and reports how
+many simultaneous streams the node sustains, and measures the latency the
+OpenAI-compatible API adds over calling the model server directly.
+"""
+
+import asyncio
+import json
+import time
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of values (0 when there are none)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+async def run_stream(client: httpx.AsyncClient, url: str, message: str) -> Dict[str, Any]:
+    """
+    One streaming chat
+
+    Returns:
+        Seconds to the first event and to the end of the stream, events
+        received, and the error if the stream did not finish with 'done'
+    """
+    start = time.perf_counter()
+    first_event = None
+    events = 0
+    finished = False
+    error = None
+    try:
+        async with client.stream("POST", f"{url}/chat/stream", json={'message': message}) as response:
+            if response.status_code != 200:
+                error = f"HTTP {response.status_code}"
+            else:
+                event = None
+                async for line in response.aiter_lines():
+                    if line.startswith("event:"):
+                        event = line[6:].strip()
+                    elif line.startswith("data:"):
+                        if first_event is None:
+                            first_event = time.perf_counter() - start
+                        events += 1
+                        if event == "done":
+                            finished = True
+                        elif event == "error":
+                            error = json.loads(line[5:]).get('error', 'error event')
+                        event = None
+    except httpx.HTTPError as e:
+        error = f"{e.__class__.__name__}: {e}"
+
+    if not finished and error is None:
+        error = "stream ended without a done event"
+    return {
+        'first_event': first_event,
+        'duration': time.perf_counter() - start,
+        'events': events,
+        'error': error,
+    }
+
+
+async def run_level(url: str, concurrency: int, streams: int, message: str, timeout: float = 120.0,
+                    transport: Optional[httpx.AsyncBaseTransport] = None) -> Dict[str, Any]:
+    """
+    Run streams chats with at most concurrency of them open at a time
+
+    Returns:
+        Throughput, latency percentiles and errors at this concurrency
+    """
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    results: List[Dict[str, Any]] = []
+    remaining = iter(range(streams))
+
+    async with httpx.AsyncClient(limits=limits, timeout=timeout, transport=transport) as client:
+        async def worker():
+            for _ in remaining:
+                results.append(await run_stream(client, url, message))
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    succeeded = [result for result in results if result['error'] is None]
+    first_events = [result['first_event'] for result in succeeded if result['first_event'] is not None]
+    durations = [result['duration'] for result in succeeded]
+    errors = [result['error'] for result in results if result['error'] is not None]
+    return {
+        'concurrency': concurrency,
+        'streams': len(results),
+        'errors': len(errors),
+        'first_error': errors[0] if errors else None,
+        'seconds': elapsed,
+        'streams_per_second': len(succeeded) / elapsed if elapsed else 0.0,
+        'first_event_p50': percentile(first_events, 0.5),
+        'first_event_p95': percentile(first_events, 0.95),
+        'duration_p50': percentile(durations, 0.5),
+        'duration_p95': percentile(durations, 0.95),
+    }
+
+
+async def run_load_test(url: str, levels: List[int], streams_per_level: Optional[int] = None,
+                        message: str = "Explain Python generators in two sentences.",
+                        max_first_event: float = 2.0, progress=None,
+                        transport: Optional[httpx.AsyncBaseTransport] = None) -> Dict[str, Any]:
+    """
+    Step up the number of concurrent streams until the server falls behind
+
+    A level is sustained when every stream finished and 95% of them started
+    within max_first_event seconds. Testing stops at the first level that is
+    not sustained.
+
+    Args:
+        url: Base URL of the server
+        levels: Concurrent stream counts to try, in increasing order
+        streams_per_level: Streams run per level (defaults to twice the level)
+        message: Question sent on every stream
+        max_first_event: Largest acceptable 95th percentile time to first event
+        progress: Called with the report of each level when it is done
+        transport: httpx transport to use, e.g. to test an application in-process
+
+    Returns:
+        Reports of the levels run, and the highest sustained concurrency
+    """
+    url = url.rstrip("/")
+    reports = []
+    sustained = 0
+    for concurrency in levels:
+        report = await run_level(url, concurrency, streams_per_level or 2 * concurrency, message,
+                                 transport=transport)
+        report['sustained'] = report['errors'] == 0 and report['first_event_p95'] <= max_first_event
+        reports.append(report)
+        if progress:
+            progress(report)
+        if not report['sustained']:
+            break
+        sustained = concurrency
+    return {'levels': reports, 'sustained_concurrency': sustained}
+
+
+async def time_completion(client: httpx.AsyncClient, url: str, body: Dict[str, Any],
+                          headers: Optional[Dict[str, str]] = None) -> Dict[str, float]:
+    """
+    One OpenAI-style chat completion
+
+    Returns:
+        Seconds to the first streamed event (or the whole response when not
+        streaming) and to the end of the response
+    """
+    start = time.perf_counter()
+    first_event = None
+    async with client.stream("POST", f"{url}/v1/chat/completions", json=body, headers=headers) as response:
+        if response.status_code != 200:
+            await response.aread()
+            raise RuntimeError(f"{url} answered HTTP {response.status_code}: {response.text[:200]}")
+        if body.get('stream'):
+            async for line in response.aiter_lines():
+                if first_event is None and line.startswith("data:"):
+                    first_event = time.perf_counter() - start
+        else:
+            await response.aread()
+    total = time.perf_counter() - start
+    return {'first_event': first_event if first_event is not None else total, 'total': total}
+
+
+async def measure_proxy_latency(proxy_url: str, upstream_url: str, model: str, requests: int = 20,
+                                stream: bool = True, message: str = "Say hello in five words.",
+                                max_tokens: int = 32, upstream_api_key: Optional[str] = None,
+                                transport: Optional[httpx.AsyncBaseTransport] = None) -> Dict[str, Any]:
+    """
+    Latency the Nexus OpenAI-compatible API adds over calling the model server directly
+
+    The same request is sent alternately to the model server's own
+    /v1/chat/completions (Ollama and OpenAI both have one) and to Nexus, one
+    at a time, after one unmeasured warm-up request to each.
+
+    Args:
+        proxy_url: Base URL of `nexus serve`
+        upstream_url: Base URL of the model server Nexus is configured with
+        model: Model to request from both
+        requests: Measured requests per target
+        stream: Compare streamed completions (time to first event) or whole ones
+        message: Question sent
+        max_tokens: Response length limit, kept small so the model time stays steady
+        upstream_api_key: Bearer token for the model server (OpenAI)
+        transport: httpx transport to use, e.g. to test an application in-process
+
+    Returns:
+        Median and p95 seconds per target, and the medians added by the proxy
+    """
+    body = {'model': model, 'messages': [{'role': 'user', 'content': message}],
+            'stream': stream, 'max_tokens': max_tokens, 'temperature': 0.0}
+    targets = {
+        'upstream': (upstream_url.rstrip("/"),
+                     {'Authorization': f"Bearer {upstream_api_key}"} if upstream_api_key else None),
+        'proxy': (proxy_url.rstrip("/"), None),
+    }
+    timings: Dict[str, List[Dict[str, float]]] = {name: [] for name in targets}
+
+    async with httpx.AsyncClient(timeout=120.0, transport=transport) as client:
+        for round_number in range(requests + 1):
+            for name, (url, headers) in targets.items():
+                timing = await time_completion(client, url, body, headers)
+                if round_number:
+                    timings[name].append(timing)
+
+    report: Dict[str, Any] = {'requests': requests, 'stream': stream}
+    for name, samples in timings.items():
+        for measure in ('first_event', 'total'):
+            values = [sample[measure] for sample in samples]
+            report[f"{name}_{measure}_p50"] = percentile(values, 0.5)
+            report[f"{name}_{measure}_p95"] = percentile(values, 0.95)
+    for measure in ('first_event', 'total'):
+        report[f"added_{measure}_p50"] = report[f"proxy_{measure}_p50"] - report[f"upstream_{measure}_p50"]
+    return report
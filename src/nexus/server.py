@@ -0,0 +1,564 @@
+"""
+HTTP API for Nexus AI Assistant
+
+Serves chat, streaming chat (Server-Sent Events or a WebSocket), feedback
+and statistics on the async assistant path, and an OpenAI-compatible API;
+run it with `nexus serve`. Chat requests are rate limited per client address
+and API key (429) and pass a bounded queue of generations (503 when it is
+full); both rejections carry a Retry-After hint. The queue serves requests
+by the priority class in the X-Nexus-Priority header (interactive unless
+given) and shares slots fairly between clients.
+"""
+
+import asyncio
+import hashlib
+import json
+import time
+import uuid
+import weakref
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple, Union
+
+from .core.admission import PRIORITIES, AdmissionError, ConcurrencyGate, Overloaded, RateLimited, RateLimiter
+from .core.assistant import AIAssistant, ConversationMemory, TurnResult
+from .core.config import config
+from .core.sessions import SessionManager, UnknownSessionError
+from .utils.logger import nexus_logger
+
+try:
+    from fastapi import BackgroundTasks, FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect
+    from pydantic import ValidationError
+    from fastapi.responses import JSONResponse, StreamingResponse
+    from pydantic import BaseModel, Field
+except ImportError:  # optional: pip install nexus-ai-assistant[web]
+    FastAPI = None
+
+
+# Model name of the OpenAI-compatible API that routes to the assistant's configured model
+DEFAULT_MODEL_ALIAS = "nexus"
+
+# Request header naming the priority class of a generation (see PRIORITIES)
+PRIORITY_HEADER = "X-Nexus-Priority"
+
+
+
+if FastAPI is not None:
+    class ChatRequest(BaseModel):
+        """Body of the chat endpoints"""
+        message: str = Field(..., min_length=1)
+        session_id: Optional[str] = None
+        temperature: Optional[float] = Field(None, ge=0.0, le=2.0)
+        max_tokens: Optional[int] = Field(None, gt=0)
+
+    class FeedbackRequest(BaseModel):
+        """Body of the feedback endpoint"""
+        conversation_id: str
+        rating: int = Field(..., ge=-1, le=1)
+
+    class ChatMessage(BaseModel):
+        """One message of an OpenAI chat completion request"""
+        role: str
+        content: Union[str, List[Dict[str, Any]], None] = None
+
+    class ChatCompletionRequest(BaseModel):
+        """Body of /v1/chat/completions; unsupported OpenAI parameters are ignored"""
+        model: Optional[str] = None
+        messages: List[ChatMessage] = Field(..., min_length=1)
+        stream: bool = False
+        temperature: Optional[float] = Field(None, ge=0.0, le=2.0)
+        max_tokens: Optional[int] = Field(None, gt=0)
+
+
+class ServerState:
+    """The assistant, sessions and admission control shared by all requests of a server process"""
+
+    def __init__(self, sessions: SessionManager):
+        self.sessions = sessions
+        self.assistant = sessions.assistant
+        self.limiter = RateLimiter()
+        self.gate = ConcurrencyGate()
+        self.active_streams = 0
+        self.requests = 0
+        self.started = time.time()
+
+
+def _unknown_session(session_id: str) -> str:
+    """Error message for a session ID the server process does not know"""
+    return (f"Unknown session {session_id}: it expired or belongs to another server worker "
+            f"(start a new session by leaving session_id out)")
+
+
+def _client_identity(connection) -> Tuple[Optional[str], Optional[str]]:
+    """Client address and API key (bearer token) of a request or WebSocket"""
+    client = connection.client.host if connection.client else None
+    scheme, _, token = connection.headers.get('authorization', '').partition(' ')
+    return client, (token.strip() or None) if scheme.lower() == 'bearer' else None
+
+
+def _scheduling(connection) -> Dict[str, Any]:
+    """
+    Priority class and tenant of a request, as keyword arguments of ConcurrencyGate.acquire
+
+    The tenant is the API key (as a digest) or else the client address.
+
+    Raises:
+        HTTPException: Unknown priority class
+    """
+    priority = connection.headers.get(PRIORITY_HEADER, PRIORITIES[0]).strip().lower()
+    if priority not in PRIORITIES:
+        raise HTTPException(status_code=400, detail=f"{PRIORITY_HEADER} must be one of {', '.join(PRIORITIES)}")
+    client, api_key = _client_identity(connection)
+    tenant = f"key:{hashlib.sha256(api_key.encode()).hexdigest()[:16]}" if api_key else client
+    return {'priority': priority, 'tenant': tenant}
+
+
+def _rejection(error: AdmissionError) -> "HTTPException":
+    """HTTP error for a request turned away by admission control"""
+    return HTTPException(status_code=error.status_code, detail=str(error),
+                         headers={'Retry-After': error.retry_after_header})
+
+
+def sse_event(data: Dict[str, Any], event: Optional[str] = None) -> str:
+    """Format one Server-Sent Event"""
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data)}\n\n"
+
+
+def _generation_options(request) -> Dict[str, Any]:
+    """Model options given in a chat request"""
+    options = {}
+    if request.temperature is not None:
+        options['temperature'] = request.temperature
+    if request.max_tokens is not None:
+        options['max_tokens'] = request.max_tokens
+    return options
+
+
+def _message_text(content: Union[str, List[Dict[str, Any]], None]) -> str:
+    """Text of a message content given as a string or as OpenAI content parts"""
+    if isinstance(content, list):
+        return "".join(part.get('text', '') for part in content if part.get('type') == 'text')
+    return content or ""
+
+
+def _openai_error(status_code: int, message: str, error_type: str = "upstream_error",
+                  headers: Optional[Dict[str, str]] = None) -> "JSONResponse":
+    """Error response in the OpenAI format"""
+    return JSONResponse(status_code=status_code, headers=headers,
+                        content={'error': {'message': message, 'type': error_type, 'code': status_code}})
+
+
+def _openai_rejection(error: AdmissionError) -> "JSONResponse":
+    """OpenAI-format error for a request turned away by admission control"""
+    error_type = "rate_limit_exceeded" if isinstance(error, RateLimited) else "server_overloaded"
+    return _openai_error(error.status_code, str(error), error_type,
+                         headers={'Retry-After': error.retry_after_header})
+
+
+def add_openai_routes(app: "FastAPI", state: ServerState):
+    """
+    Add an OpenAI-compatible /v1/chat/completions and /v1/models
+
+    Requests carry the whole conversation and are passed to the model
+    unchanged; the last user message and the answer are learned from after
+    the response has been sent. Streamed pieces are written into a chunk
+    template prepared once per request, so each piece costs one JSON string
+    encoding.
+    """
+    logger = nexus_logger
+
+    @app.get("/v1/models")
+    async def list_models():
+        try:
+            models = await state.assistant.list_models_async()
+        except Exception as e:
+            return _openai_error(getattr(e, 'status_code', None) or 502, str(e))
+        created = int(state.started)
+        return {
+            'object': 'list',
+            'data': [{'id': name, 'object': 'model', 'created': created, 'owned_by': 'nexus'}
+                     for name in [DEFAULT_MODEL_ALIAS] + models],
+        }
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: ChatCompletionRequest, background_tasks: BackgroundTasks,
+                               connection: Request):
+        state.requests += 1
+        try:
+            state.limiter.acquire(*_client_identity(connection))
+        except RateLimited as e:
+            return _openai_rejection(e)
+        scheduling = _scheduling(connection)
+        messages = [{'role': message.role, 'content': _message_text(message.content)}
+                    for message in request.messages]
+        model = state.assistant.model_name if request.model in (None, DEFAULT_MODEL_ALIAS) else request.model
+        options = dict(_generation_options(request), model=model)
+        question = next((message['content'] for message in reversed(messages) if message['role'] == 'user'), None)
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+        created = int(time.time())
+        start_time = time.time()
+
+        async def learn(response: str):
+            if question is None or not response:
+                return
+            try:
+                await state.assistant.learn_async(question, response, time.time() - start_time, model=model)
+            except Exception as e:
+                logger.error(f"Learning from API completion failed: {e}")
+
+        if not request.stream:
+            try:
+                async with state.gate.slot(**scheduling):
+                    response = await state.assistant.generate_async(messages, **options)
+            except Overloaded as e:
+                return _openai_rejection(e)
+            except Exception as e:
+                logger.error(f"Chat completion failed: {e}")
+                return _openai_error(getattr(e, 'status_code', None) or 502, str(e))
+            background_tasks.add_task(learn, response)
+            return {
+                'id': completion_id,
+                'object': 'chat.completion',
+                'created': created,
+                'model': model,
+                'choices': [{
+                    'index': 0,
+                    'message': {'role': 'assistant', 'content': response},
+                    'finish_reason': 'stop',
+                }],
+            }
+
+        head = (f'{{"id":"{completion_id}","object":"chat.completion.chunk","created":{created},'
+                f'"model":{json.dumps(model)},"choices":[{{"index":0,"delta":')
+        content_head = f'data: {head}{{"content":'
+        content_tail = '},"finish_reason":null}]}\n\n'
+        try:
+            slot = await state.gate.acquire(**scheduling)
+        except Overloaded as e:
+            return _openai_rejection(e)
+        stream = state.assistant.generate_stream_async(messages, **options)
+        try:
+            # Fail before the 200 status if the model cannot be reached
+            first = await stream.__anext__()
+        except StopAsyncIteration:
+            first = None
+        except Exception as e:
+            slot.release()
+            logger.error(f"Chat completion failed: {e}")
+            return _openai_error(getattr(e, 'status_code', None) or 502, str(e))
+
+        parts: List[str] = []
+        finished: List[bool] = []
+
+        async def learn_if_finished():
+            if finished:
+                await learn("".join(parts))
+
+        async def chunks() -> AsyncIterator[str]:
+            state.active_streams += 1
+            try:
+                yield f'data: {head}{{"role":"assistant","content":""}},"finish_reason":null}}]}}\n\n'
+                if first is not None:
+                    parts.append(first)
+                    yield f'{content_head}{json.dumps(first)}{content_tail}'
+                    try:
+                        async for piece in stream:
+                            parts.append(piece)
+                            yield f'{content_head}{json.dumps(piece)}{content_tail}'
+                    except Exception as e:
+                        logger.error(f"Chat completion stream failed: {e}")
+                        yield sse_event({'error': {'message': str(e), 'type': 'upstream_error'}})
+                        return
+                yield f'data: {head}{{}},"finish_reason":"stop"}}]}}\n\ndata: [DONE]\n\n'
+                finished.append(True)
+            finally:
+                state.active_streams -= 1
+                slot.release()
+                # Stops the upstream generation if the client went away
+                await stream.aclose()
+
+        # Runs once the response has ended, so learning never delays the client
+        background_tasks.add_task(learn_if_finished)
+        body = chunks()
+        # Frees the slot even if the response is dropped before it starts
+        weakref.finalize(body, slot.release)
+        return StreamingResponse(body, media_type="text/event-stream",
+                                 headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+                                 background=background_tasks)
+
+
+def add_websocket_route(app: "FastAPI", state: ServerState):
+    """
+    Add /ws, a persistent chat connection per user
+
+    Frames are JSON objects with a 'type'. The client sends
+    {"type": "chat", "message": ...} (with optional temperature and
+    max_tokens) and {"type": "cancel"}; the server answers with "session"
+    once, then "delta" pieces and a "done", "cancelled" or "error" frame
+    per turn. One turn runs at a time. Cancelling aborts the upstream
+    generation, or the wait for a generation slot; the partial answer stays
+    in the session's memory and is not learned from. Turns turned away by
+    admission control get an "error" frame with a retry_after in seconds.
+    """
+    logger = nexus_logger
+
+    async def run_turn(websocket: "WebSocket", memory: ConversationMemory, request: "ChatRequest"):
+        result = TurnResult()
+        slot = None
+        try:
+            try:
+                slot = await state.gate.acquire(tenant=_client_identity(websocket)[0])
+            except Overloaded as e:
+                await websocket.send_json({'type': 'error', 'message': str(e), 'retry_after': e.retry_after})
+                return
+            state.active_streams += 1
+            async for chunk in state.assistant.ask_stream_async(
+                    request.message, memory=memory, result=result, **_generation_options(request)):
+                await websocket.send_json({'type': 'delta', 'text': chunk})
+            if result.error is not None:
+                await websocket.send_json({'type': 'error', 'message': result.error})
+            else:
+                await websocket.send_json({
+                    'type': 'done',
+                    'conversation_id': result.conversation_id,
+                    'response_time': result.response_time,
+                })
+        except asyncio.CancelledError:
+            if slot is None:
+                result.cancelled = True  # Still waiting for a slot
+            if result.cancelled:
+                try:
+                    await websocket.send_json({'type': 'cancelled', 'text': result.response})
+                except Exception:
+                    pass  # The connection is gone
+            raise
+        finally:
+            if slot is not None:
+                state.active_streams -= 1
+                slot.release()
+
+    @app.websocket("/ws")
+    async def chat_socket(websocket: WebSocket, session_id: Optional[str] = None):
+        await websocket.accept()
+        try:
+            with state.sessions.use(session_id) as (session_id, memory):
+                await websocket.send_json({'type': 'session', 'session_id': session_id})
+                await serve_socket(websocket, session_id, memory)
+        except UnknownSessionError:
+            await websocket.send_json({'type': 'error', 'message': _unknown_session(session_id)})
+            await websocket.close(code=1008)
+
+    async def serve_socket(websocket: "WebSocket", session_id: str, memory: ConversationMemory):
+        turn: Optional[asyncio.Task] = None
+        try:
+            while True:
+                try:
+                    frame = json.loads(await websocket.receive_text())
+                except ValueError:
+                    frame = None
+                kind = frame.get('type') if isinstance(frame, dict) else None
+                if kind == 'chat':
+                    if turn is not None and not turn.done():
+                        await websocket.send_json({'type': 'error',
+                                                   'message': "A response is still streaming; cancel it first"})
+                        continue
+                    try:
+                        request = ChatRequest.model_validate(frame)
+                    except ValidationError as e:
+                        await websocket.send_json({'type': 'error', 'message': str(e)})
+                        continue
+                    state.requests += 1
+                    try:
+                        state.limiter.acquire(*_client_identity(websocket))
+                    except RateLimited as e:
+                        await websocket.send_json({'type': 'error', 'message': str(e),
+                                                   'retry_after': e.retry_after})
+                        continue
+                    turn = asyncio.create_task(run_turn(websocket, memory, request))
+                elif kind == 'cancel':
+                    if turn is not None and not turn.done():
+                        turn.cancel()
+                        await asyncio.gather(turn, return_exceptions=True)
+                else:
+                    await websocket.send_json({'type': 'error',
+                                               'message': "Frames must be JSON objects of type chat or cancel"})
+        except WebSocketDisconnect:
+            logger.info(f"WebSocket of session {session_id[:12]} closed")
+        finally:
+            if turn is not None and not turn.done():
+                turn.cancel()
+                await asyncio.gather(turn, return_exceptions=True)
+
+
+def create_app(assistant: Optional[AIAssistant] = None,
+               sessions: Optional[SessionManager] = None) -> "FastAPI":
+    """
+    Create the API application
+
+    Args:
+        assistant: Assistant answering the requests (defaults to a new one)
+        sessions: Session manager to use (defaults to one around the assistant)
+
+    Returns:
+        The FastAPI application
+    """
+    if FastAPI is None:
+        raise ImportError("The API server needs FastAPI: pip install nexus-ai-assistant[web]")
+
+    from . import __version__
+
+    state = ServerState(sessions if sessions is not None else SessionManager(assistant))
+
+    @asynccontextmanager
+    async def lifespan(app):
+        yield
+        # Sessions survive a restart
+        state.sessions.spill_all()
+
+    app = FastAPI(title="Nexus AI Assistant", version=__version__, lifespan=lifespan)
+    app.state.nexus = state
+    logger = nexus_logger
+
+    @app.get("/health")
+    async def health():
+        return {'status': 'ok', 'model': state.assistant.model_name}
+
+    @app.post("/chat")
+    async def chat(request: ChatRequest, connection: Request):
+        state.requests += 1
+        try:
+            state.limiter.acquire(*_client_identity(connection))
+        except RateLimited as e:
+            raise _rejection(e)
+        scheduling = _scheduling(connection)
+        result = TurnResult()
+        try:
+            with state.sessions.use(request.session_id) as (session_id, memory):
+                async with state.gate.slot(**scheduling):
+                    await state.assistant.ask_async(request.message, memory=memory, result=result,
+                                                    **_generation_options(request))
+        except UnknownSessionError:
+            raise HTTPException(status_code=404, detail=_unknown_session(request.session_id))
+        except Overloaded as e:
+            raise _rejection(e)
+        if result.error is not None:
+            raise HTTPException(status_code=502, detail=result.response)
+        return {
+            'response': result.response,
+            'conversation_id': result.conversation_id,
+            'session_id': session_id,
+            'response_time': result.response_time,
+        }
+
+    @app.post("/chat/stream")
+    async def chat_stream(request: ChatRequest, connection: Request):
+        state.requests += 1
+        try:
+            state.limiter.acquire(*_client_identity(connection))
+        except RateLimited as e:
+            raise _rejection(e)
+        scheduling = _scheduling(connection)
+        if request.session_id is not None and not state.sessions.exists(request.session_id):
+            raise HTTPException(status_code=404, detail=_unknown_session(request.session_id))
+        try:
+            # Queue before the response starts, so an overload is a 503
+            slot = await state.gate.acquire(**scheduling)
+        except Overloaded as e:
+            raise _rejection(e)
+
+        async def events() -> AsyncIterator[str]:
+            state.active_streams += 1
+            result = TurnResult()
+            try:
+                try:
+                    with state.sessions.use(request.session_id) as (session_id, memory):
+                        async for chunk in state.assistant.ask_stream_async(
+                                request.message, memory=memory, result=result, **_generation_options(request)):
+                            yield sse_event({'delta': chunk})
+                except UnknownSessionError:
+                    # Dropped since the request was accepted
+                    yield sse_event({'error': _unknown_session(request.session_id)}, event="error")
+                    return
+                if result.error is not None:
+                    yield sse_event({'error': result.error}, event="error")
+                else:
+                    yield sse_event({
+                        'conversation_id': result.conversation_id,
+                        'session_id': session_id,
+                        'response_time': result.response_time,
+                    }, event="done")
+            finally:
+                state.active_streams -= 1
+                slot.release()
+
+        body = events()
+        # Frees the slot even if the response is dropped before it starts
+        weakref.finalize(body, slot.release)
+        return StreamingResponse(body, media_type="text/event-stream",
+                                 headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+    @app.post("/feedback")
+    async def feedback(request: FeedbackRequest):
+        engine = state.assistant.learning_engine
+        loop = asyncio.get_running_loop()
+        conversation_id = await loop.run_in_executor(None, engine.db.resolve_conversation_id,
+                                                     request.conversation_id)
+        if conversation_id is None:
+            raise HTTPException(status_code=404, detail=f"No conversation with ID {request.conversation_id}")
+        await loop.run_in_executor(None, engine.record_feedback, conversation_id, request.rating)
+        logger.info(f"Feedback {request.rating:+d} recorded for conversation {conversation_id[:12]}")
+        return {'conversation_id': conversation_id, 'rating': request.rating}
+
+    @app.get("/stats")
+    async def stats():
+        loop = asyncio.get_running_loop()
+        learning = await loop.run_in_executor(None, state.assistant.get_learning_stats)
+        return {
+            'learning': learning,
+            'stage_timings': state.assistant.learning_engine.get_stage_timings(),
+            'server': {
+                'uptime': time.time() - state.started,
+                'requests': state.requests,
+                'active_streams': state.active_streams,
+                'sessions': state.sessions.stats(),
+                'generations': state.gate.stats(),
+                'rate_limits': state.limiter.stats(),
+                'degradation': state.assistant.degradation.stats(),
+            },
+        }
+
+    add_websocket_route(app, state)
+    add_openai_routes(app, state)
+    return app
+
+
+def serve(host: Optional[str] = None, port: Optional[int] = None, workers: int = 1,
+          log_level: str = "info"):
+    """
+    Run the API server with uvicorn
+
+    Each worker is a separate process with its own assistant and sessions.
+    With several workers, a load balancer must route each session to the
+    worker that created it (sticky sessions); other workers answer its
+    requests with 404. Point LEARNING_WRITER_ADDRESS
+    at a `nexus writer` to funnel the learning writes of all workers through
+    one process.
+
+    Args:
+        host: Interface to bind (defaults to WEB_HOST)
+        port: Port to bind (defaults to WEB_PORT)
+        workers: Server processes
+        log_level: uvicorn log level
+    """
+    if FastAPI is None:
+        raise ImportError("The API server needs FastAPI: pip install nexus-ai-assistant[web]")
+    import uvicorn
+
+    uvicorn.run(
+        "nexus.server:create_app",
+        factory=True,
+        host=host or config.web_host,
+        port=port or config.web_port,
+        workers=workers,
+        log_level=log_level,
+    )
@@ -0,0 +1,36 @@
+"""
+Keys authenticating clients of local Nexus processes (learning writer, daemon)
+
+Kept free of heavy imports so clients can connect without loading the assistant.
+"""
+
+import hashlib
+import os
+import secrets
+import tempfile
+from pathlib import Path
+
+
+def key_path(address: str) -> Path:
+    """File holding the key that authenticates clients of the process at address"""
+    if address.startswith("\\\\"):
+        # Windows pipe names are not file paths
+        digest = hashlib.sha256(address.encode("utf-8")).hexdigest()[:16]
+        return Path(tempfile.gettempdir()) / f"nexus-{digest}.key"
+    return Path(f"{address}.key")
+
+
+def create_authkey(address: str) -> bytes:
+    """Generate a fresh random key, stored readable by the current user only"""
+    key = secrets.token_hex(32).encode("ascii")
+    path = key_path(address)
+    path.unlink(missing_ok=True)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, "wb") as f:
+        f.write(key)
+    return key
+
+
+def read_authkey(address: str) -> bytes:
+    """Key of the process at address (OSError when none created one)"""
+    return key_path(address).read_bytes()
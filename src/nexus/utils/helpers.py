@@ -2,9 +2,11 @@
 Utility functions for Nexus AI Assistant
 """
 
+import re
 import subprocess
 import sys
 import requests
+from datetime import datetime, timedelta
 from typing import Tuple, Optional
 
 
@@ -100,3 +102,26 @@ def get_terminal_size() -> Tuple[int, int]:
         return size.columns, size.lines
     except:
         return 80, 24  # Default fallback
+
+
+def parse_since(value: str, now: Optional[datetime] = None) -> datetime:
+    """
+    Parse a time window start such as "7d", "24h", "30m" or an ISO date
+    
+    Args:
+        value: Relative duration (m/h/d/w suffix) or absolute ISO timestamp
+        now: Reference time for relative durations (defaults to UTC now)
+        
+    Returns:
+        The start of the window as a naive UTC datetime
+    """
+    match = re.fullmatch(r"\s*(\d+)\s*([mhdw])\s*", value.lower())
+    if match:
+        amount, unit = int(match.group(1)), match.group(2)
+        units = {'m': 'minutes', 'h': 'hours', 'd': 'days', 'w': 'weeks'}
+        return (now or datetime.utcnow()) - timedelta(**{units[unit]: amount})
+    
+    try:
+        return datetime.fromisoformat(value.strip())
+    except ValueError:
+        raise ValueError(f"Invalid time window: {value!r} (use e.g. 7d, 24h or 2024-01-31)")
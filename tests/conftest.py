@@ -0,0 +1,7 @@
+"""Shared pytest configuration for Nexus AI Assistant tests"""
+
+import os
+
+# Keep learning data in memory so tests never touch a database file in the
+# working directory (must be set before nexus.core.config is imported)
+os.environ.setdefault("DATABASE_URL", "memory://")
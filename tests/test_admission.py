@@ -0,0 +1,193 @@
+"""
+Tests for rate limiting and the generation queue
+"""
+
+import asyncio
+import pytest
+import sys
+from pathlib import Path
+
+# Add src directory to Python path
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from nexus.core.admission import PRIORITIES, ConcurrencyGate, Overloaded, RateLimited, RateLimiter
+
+
+class FakeClock:
+    """Monotonic clock moved by hand"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestRateLimiter:
+    """Test cases for the token buckets"""
+
+    def test_burst_then_refill_per_client(self):
+        """Test that a client gets its burst, then one request per refill interval"""
+        clock = FakeClock()
+        limiter = RateLimiter(requests=3, window=6, global_requests=0, clock=clock)
+        for _ in range(3):
+            limiter.acquire("10.0.0.1")
+        with pytest.raises(RateLimited) as error:
+            limiter.acquire("10.0.0.1")
+        assert error.value.retry_after == pytest.approx(2.0)
+        assert error.value.retry_after_header == "2"
+        limiter.acquire("10.0.0.2")
+
+        clock.now = 2.0
+        limiter.acquire("10.0.0.1")
+        with pytest.raises(RateLimited):
+            limiter.acquire("10.0.0.1")
+        assert limiter.stats() == {'limited': {'client': 2, 'api_key': 0, 'global': 0}, 'tracked_keys': 2}
+
+    def test_api_key_and_global_limits(self):
+        """Test that an API key is limited across clients and the global bucket across everyone"""
+        clock = FakeClock()
+        limiter = RateLimiter(requests=2, window=60, global_requests=5, clock=clock)
+        limiter.acquire("a", api_key="secret")
+        limiter.acquire("b", api_key="secret")
+        with pytest.raises(RateLimited):
+            limiter.acquire("c", api_key="secret")
+        # A rejected request takes no token from the buckets that had one
+        limiter.acquire("c")
+        limiter.acquire("d")
+        limiter.acquire("e")
+        with pytest.raises(RateLimited) as error:
+            limiter.acquire("f")
+        assert str(error.value).startswith("Rate limit exceeded (global)")
+        assert limiter.limited == {'client': 0, 'api_key': 1, 'global': 1}
+        assert all("secret" not in key for _, key in limiter._buckets)
+
+    def test_least_recently_used_clients_forgotten(self):
+        """Test that at most max_keys buckets are tracked"""
+        limiter = RateLimiter(requests=1, window=60, global_requests=0, max_keys=2, clock=FakeClock())
+        for client in ("a", "b", "c"):
+            limiter.acquire(client)
+        assert limiter.stats()['tracked_keys'] == 2
+        limiter.acquire("a")
+        with pytest.raises(RateLimited):
+            limiter.acquire("c")
+
+
+class TestConcurrencyGate:
+    """Test cases for the bounded generation queue"""
+
+    def test_queue_in_order_then_reject_fast(self):
+        """Test that waiters get slots in arrival order and a full queue is rejected at once"""
+        async def scenario():
+            gate = ConcurrencyGate(limit=1, queue_size=2, timeout=5)
+            order = []
+
+            async def generate(name):
+                async with gate.slot():
+                    order.append(name)
+                    await asyncio.sleep(0.01)
+
+            tasks = [asyncio.create_task(generate(name)) for name in "abc"]
+            await asyncio.sleep(0)
+            assert (gate.active, gate.queued) == (1, 2)
+            with pytest.raises(Overloaded) as error:
+                await gate.acquire()
+            assert error.value.status_code == 503
+            await asyncio.gather(*tasks)
+            return gate, order
+
+        gate, order = asyncio.run(scenario())
+        assert order == ["a", "b", "c"]
+        stats = gate.stats()
+        assert (stats['active'], stats['queued'], stats['max_queued']) == (0, 0, 2)
+        assert (stats['admitted'], stats['rejected']) == (3, 1)
+        assert stats['wait_max_ms'] >= 10
+
+    def test_wait_times_out_and_cancelled_waiter_leaves_queue(self):
+        """Test that a waiter gives up after the timeout and a cancelled one frees its place"""
+        async def scenario():
+            gate = ConcurrencyGate(limit=1, queue_size=5, timeout=0.02)
+            slot = await gate.acquire()
+            with pytest.raises(Overloaded):
+                await gate.acquire()
+
+            waiter = asyncio.create_task(gate.acquire())
+            await asyncio.sleep(0)
+            waiter.cancel()
+            await asyncio.gather(waiter, return_exceptions=True)
+            assert gate.queued == 0
+
+            slot.release()
+            slot.release()
+            async with gate.slot():
+                assert gate.active == 1
+            return gate
+
+        gate = asyncio.run(scenario())
+        assert gate.active == 0
+        assert gate.timed_out == 1 and gate.admitted == 2
+
+
+class TestScheduling:
+    """Test cases for priority classes, fair queuing and preemption"""
+
+    @staticmethod
+    def run_queued(gate, requests):
+        """Queue requests behind a held slot, then let them through; returns the order served"""
+        async def scenario():
+            order = []
+
+            async def generate(name, priority, tenant):
+                try:
+                    async with gate.slot(priority, tenant):
+                        order.append(name)
+                except Overloaded:
+                    order.append(f"{name} rejected")
+
+            held = await gate.acquire()
+            tasks = []
+            for name, priority, tenant in requests:
+                tasks.append(asyncio.create_task(generate(name, priority, tenant)))
+                await asyncio.sleep(0)
+            held.release()
+            await asyncio.gather(*tasks)
+            return order
+
+        return asyncio.run(scenario())
+
+    def test_more_urgent_classes_served_first(self):
+        """Test that queued interactive work overtakes batch and background work"""
+        gate = ConcurrencyGate(limit=1, queue_size=10, timeout=5)
+        order = self.run_queued(gate, [("learn", 'background', None), ("b1", 'batch', None),
+                                       ("b2", 'batch', None), ("chat", 'interactive', None)])
+        assert order == ["chat", "b1", "b2", "learn"]
+        classes = gate.stats()['classes']
+        assert [classes[priority]['completed'] for priority in PRIORITIES] == [2, 2, 1]
+        assert classes['background']['wait_p99_ms'] >= classes['interactive']['wait_p99_ms']
+
+    def test_tenants_share_a_class_by_weight(self):
+        """Test that a tenant's burst is interleaved with later tenants' requests"""
+        requests = [(f"a{i}", 'batch', "a") for i in range(4)] + [(f"b{i}", 'batch', "b") for i in range(2)]
+        order = self.run_queued(ConcurrencyGate(limit=1, queue_size=10, timeout=5), requests)
+        assert order == ["a0", "b0", "a1", "b1", "a2", "a3"]
+
+        order = self.run_queued(ConcurrencyGate(limit=1, queue_size=10, timeout=5, weights={"a": 2}), requests)
+        assert order == ["a0", "b0", "a1", "a2", "b1", "a3"]
+
+    def test_full_queue_preempts_only_less_urgent_waiters(self):
+        """Test that a full queue drops its newest batch request for interactive work, never the reverse"""
+        gate = ConcurrencyGate(limit=1, queue_size=2, timeout=5)
+        order = self.run_queued(gate, [("b1", 'batch', None), ("b2", 'batch', None),
+                                       ("chat", 'interactive', None), ("b3", 'batch', None)])
+        assert sorted(order[:2]) == ["b2 rejected", "b3 rejected"]
+        assert order[2:] == ["chat", "b1"]
+        classes = gate.stats()['classes']
+        assert (classes['batch']['preempted'], classes['batch']['rejected']) == (1, 1)
+
+        with pytest.raises(ValueError):
+            asyncio.run(gate.acquire('urgent'))
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
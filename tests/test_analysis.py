@@ -0,0 +1,168 @@
+"""
+Tests for the single-pass text analysis
+"""
+
+import random
+import pytest
+import sys
+from datetime import datetime
+from pathlib import Path
+
+# Add src directory to Python path
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from nexus.core.analysis import IncrementalAnalyzer, KeywordMatcher, TOPIC_KEYWORDS, profile_text
+from nexus.core.learning import LearningDatabase, SelfImprovementEngine
+
+
+VOCABULARY = [
+    "data", "database", "Database", "API", "api", "start", "artistic", "how?", "Here's", "let", "me",
+    "let me", "example.", "e.g.", "...", "!", "```", "python", "JavaScript", "build", "made",
+    "assistance", "İstanbul", "debugging", "the", "a", "of", ".", "x.y.z", "consider,", "\n",
+    "ΣΑΣ", "ὈΔΥΣΣΕΎΣ",
+]
+
+
+def _random_text(rng: random.Random, words: int) -> str:
+    """Text mixing keywords, look-alikes and punctuation"""
+    return "".join(rng.choice(VOCABULARY) + rng.choice([" ", "", "  ", "\t"]) for _ in range(words))
+
+
+def _reference_quality(user_input: str, assistant_response: str):
+    """Quality scores computed the way the engine did before the shared analysis"""
+    user_keywords = set(user_input.lower().split())
+    response_keywords = set(assistant_response.lower().split())
+    sentences = assistant_response.split('.')
+    avg_sentence_length = sum(len(s.split()) for s in sentences) / max(len(sentences), 1)
+    engagement_markers = ['?', 'example', 'imagine', 'consider', 'let me', 'here\'s']
+    technical_terms = ['function', 'algorithm', 'data', 'system', 'process', 'method']
+    tech_question = any(term in user_input.lower() for term in technical_terms)
+    tech_response = any(term in assistant_response.lower() for term in technical_terms)
+    return {
+        'relevance_score': min(1.0, len(user_keywords & response_keywords) / max(len(user_keywords), 1)),
+        'completeness_score': min(1.0, len(assistant_response.split()) / max(len(user_input.split()) * 2, 10)),
+        'clarity_score': max(0.0, 1.0 - (avg_sentence_length - 15) / 20),
+        'engagement_score': min(1.0, sum(1 for m in engagement_markers if m in assistant_response.lower()) / 3),
+        'technical_accuracy': 1.0 if (tech_question and tech_response) or not tech_question else 0.5,
+    }
+
+
+class TestKeywordMatcher:
+    """Test cases for the multi-keyword matcher"""
+
+    def test_matches_substring_semantics(self):
+        """Test that overlapping and nested keywords are all found"""
+        matcher = KeywordMatcher(["data", "database", "base", "art", "start", "?"])
+
+        assert matcher.find("a database start?") == {"data", "database", "base", "art", "start", "?"}
+        assert matcher.find("datum") == frozenset()
+
+    def test_uppercase_keywords_never_match(self):
+        """Test that 'API' keeps never matching lowercased input"""
+        assert 'technical' not in profile_text("Call the API").topics(TOPIC_KEYWORDS)
+
+
+class TestSharedAnalysis:
+    """Test cases comparing the shared analysis with the original heuristics"""
+
+    def test_scores_identical_to_reference(self, tmp_path):
+        """Test that scores and insights match the original per-call heuristics"""
+        engine = SelfImprovementEngine(LearningDatabase(str(tmp_path / "learning.db")))
+        rng = random.Random(7)
+
+        for _ in range(300):
+            user_input = _random_text(rng, rng.randint(0, 12))
+            response = _random_text(rng, rng.randint(0, 80))
+
+            assert engine.analyze_conversation_quality(user_input, response) == \
+                _reference_quality(user_input, response)
+
+            lowered = user_input.lower()
+            topics = [topic for topic, words in TOPIC_KEYWORDS.items() if any(w in lowered for w in words)]
+            assert engine.extract_conversation_insights(user_input, response)['topics'] == topics
+
+
+class TestIncrementalAnalyzer:
+    """Test cases for analyzing streamed text"""
+
+    def test_chunked_profile_equals_whole_text(self):
+        """Test that any chunking yields the profile of the complete text"""
+        rng = random.Random(5)
+
+        for _ in range(500):
+            text = _random_text(rng, rng.randint(0, 60))
+            analyzer = IncrementalAnalyzer()
+            position = 0
+            while position < len(text):
+                size = rng.randint(1, 8)
+                analyzer.feed(text[position:position + size])
+                position += size
+
+            assert analyzer.finish() == profile_text(text)
+
+    def test_code_fence_state(self):
+        """Test that the analyzer tracks whether the stream is inside a code block"""
+        analyzer = IncrementalAnalyzer()
+        analyzer.feed("Here:\n``")
+        analyzer.feed("`python\nprint(1)\n")
+        assert analyzer.in_code_block
+        analyzer.feed("```\nDone")
+        assert not analyzer.in_code_block
+        assert '```' in analyzer.finish().keywords
+
+
+class TestBatchScoring:
+    """Test cases for the vectorized quality scorer"""
+
+    def test_batch_identical_to_scalar(self, tmp_path):
+        """Test that every vectorized score equals the scalar one exactly"""
+        pytest.importorskip("numpy")
+        from nexus.core.batch_analysis import SCORE_NAMES, BatchQualityScorer
+
+        db = LearningDatabase(str(tmp_path / "learning.db"))
+        engine = SelfImprovementEngine(db)
+        rng = random.Random(11)
+        pairs = [(_random_text(rng, rng.randint(0, 12)), _random_text(rng, rng.randint(0, 80)))
+                 for _ in range(300)]
+
+        scorer = BatchQualityScorer(db)
+        scores = scorer.score(scorer.features(pairs))
+
+        for i, (user_input, response) in enumerate(pairs):
+            analysis = engine.analyze_conversation_quality(user_input, response)
+            assert {name: scores[name][i].item() for name in SCORE_NAMES} == analysis
+            assert scores['overall_quality'][i].item() == sum(analysis.values()) / len(analysis)
+
+    def test_rescore_writes_back_changed_scores(self, tmp_path):
+        """Test that rescoring updates stale scores, the statistics and the rollups"""
+        pytest.importorskip("numpy")
+        from nexus.core.batch_analysis import BatchQualityScorer
+
+        db = LearningDatabase(str(tmp_path / "learning.db"))
+        engine = SelfImprovementEngine(db)
+        engine.learn_from_feedback("What is a function?", "Here's an example function.", 1)
+        stale_id = db.store_conversation("Explain data", "Data is information.", 0, context_quality=0.0)
+
+        scorer = BatchQualityScorer(db, chunk_size=1)
+        assert scorer.rescore(dry_run=True)['changed'] == 1
+        assert db.get_conversation(stale_id)['context_quality'] == 0.0
+
+        result = scorer.rescore()
+        analysis = engine.analyze_conversation_quality("Explain data", "Data is information.")
+        assert result == {'scored': 2, 'changed': 1, 'seconds': result['seconds']}
+        assert db.get_conversation(stale_id)['context_quality'] == sum(analysis.values()) / len(analysis)
+        assert scorer.rescore()['changed'] == 0
+        conn = db.connect()
+        stored = [row[0] for row in conn.execute("SELECT context_quality FROM conversations")]
+        conn.close()
+        assert db.get_statistics()['avg_quality_score'] == pytest.approx(sum(stored) / 2)
+
+        for granularity in ('hour', 'day'):
+            rollup, = db.get_rollups(datetime(2000, 1, 1), granularity)
+            assert rollup['avg_quality_score'] == pytest.approx(sum(stored) / 2)
+            assert (rollup['min_quality_score'], rollup['max_quality_score']) == (min(stored), max(stored))
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -4,6 +4,8 @@ Tests for Nexus AI Assistant Core Functionality
 
 import pytest
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from unittest.mock import Mock, patch
 
@@ -147,7 +149,101 @@ class TestAIAssistant:
         response = assistant.chat("Test message")
         
         assert response == "Chat response"
+    
+    @patch('nexus.core.assistant.openai.OpenAI')
+    def test_feedback_updates_stored_conversation(self, mock_openai):
+        """Test that rating an answer updates its row instead of adding another"""
+        mock_client = Mock()
+        mock_response = Mock()
+        mock_response.choices = [Mock()]
+        mock_response.choices[0].message.content = "Test response"
+        
+        mock_client.chat.completions.create.return_value = mock_response
+        mock_openai.return_value = mock_client
+        
+        assistant = AIAssistant()
+        assistant.ask("Test question")
+        conversation_id = assistant.last_conversation_id
+        
+        result = assistant.provide_feedback("Test question", "Test response", 1,
+                                            conversation_id=conversation_id)
+        
+        stats = assistant.get_learning_stats()
+        assert result['updated'] and result['conversation_id'] == conversation_id
+        assert stats['total_conversations'] == 1
+        assert stats['positive_feedback_rate'] == 1.0
 
+    
+    @patch('nexus.core.assistant.openai.OpenAI')
+    def test_ask_stream(self, mock_openai):
+        """Test that a streamed answer is yielded in pieces and learned from once"""
+        pieces = ["Here's an ", "example", " of a function.", ""]
+        chunks = []
+        for piece in pieces:
+            chunk = Mock()
+            chunk.choices = [Mock()]
+            chunk.choices[0].delta.content = piece
+            chunks.append(chunk)
+        
+        mock_client = Mock()
+        mock_client.chat.completions.create.return_value = iter(chunks)
+        mock_openai.return_value = mock_client
+        
+        assistant = AIAssistant()
+        streamed = list(assistant.ask_stream("Show me a function?"))
+        
+        assert streamed == pieces[:3]
+        assert mock_client.chat.completions.create.call_args.kwargs['stream'] is True
+        assert assistant.memory.messages[-1]['content'] == "Here's an example of a function."
+        assert assistant.memory.messages[0]['content'] == assistant.system_prompt
+        
+        stored = assistant.learning_engine.db.get_conversation(assistant.last_conversation_id)
+        analysis = assistant.learning_engine.analyze_conversation_quality(
+            "Show me a function?", "Here's an example of a function.")
+        assert stored['assistant_response'] == "Here's an example of a function."
+        assert stored['context_quality'] == sum(analysis.values()) / len(analysis)
+    
+    @patch('nexus.core.assistant.openai.OpenAI')
+    def test_concurrent_asks_keep_histories_intact(self, mock_openai):
+        """Test that hundreds of asks sharing one assistant never mix up prompts or histories"""
+        requests = []
+        
+        def complete(model, messages, max_tokens, temperature, **kwargs):
+            requests.append(messages)
+            time.sleep(0.001)  # let other turns run in between
+            response = Mock()
+            response.choices = [Mock()]
+            response.choices[0].message.content = f"Answer to {messages[-1]['content']}"
+            return response
+        
+        mock_client = Mock()
+        mock_client.chat.completions.create.side_effect = complete
+        mock_openai.return_value = mock_client
+        
+        assistant = AIAssistant()
+        memories = [ConversationMemory(max_size=1000) for _ in range(4)]
+        for memory in memories:
+            memory.add_message("system", assistant.system_prompt)
+        
+        def ask(i):
+            return assistant.ask(f"question {i}", memory=memories[i % 4], max_tokens=50)
+        
+        with ThreadPoolExecutor(max_workers=32) as pool:
+            responses = list(pool.map(ask, range(200)))
+        
+        assert responses == [f"Answer to question {i}" for i in range(200)]
+        assert len(requests) == 200
+        assert all(messages[0]['role'] == 'system' and messages[-1]['role'] == 'user' for messages in requests)
+        assert all(message['role'] != 'system' for messages in requests for message in messages[1:])
+        for n, memory in enumerate(memories):
+            messages = memory.messages
+            assert messages[0]['content'] == assistant.system_prompt
+            questions = [message['content'] for message in messages[1::2]]
+            assert [message['role'] for message in messages[1:]] == ['user', 'assistant'] * 50
+            assert [message['content'] for message in messages[2::2]] == [f"Answer to {q}" for q in questions]
+            assert sorted(questions) == sorted(f"question {i}" for i in range(n, 200, 4))
+        assert assistant.memory.messages == assistant.memory.messages[:1]
+        assert assistant.get_learning_stats()['total_conversations'] == 200
 
 if __name__ == "__main__":
     pytest.main([__file__])
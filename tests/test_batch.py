@@ -0,0 +1,120 @@
+"""
+Tests for offline batch runs
+"""
+
+import asyncio
+import json
+import pytest
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import patch
+
+# Add src directory to Python path
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from nexus.batch import read_finished, run_batch
+from nexus.core.assistant import AIAssistant
+
+
+class EchoModel:
+    """Async OpenAI client double echoing the prompt; fails prompts containing 'fail'"""
+
+    def __init__(self):
+        self.in_flight = 0
+        self.most_in_flight = 0
+        self.prompts = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    async def create(self, messages, **kwargs):
+        prompt = messages[-1]['content']
+        self.prompts.append(prompt)
+        self.in_flight += 1
+        self.most_in_flight = max(self.most_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0.02)
+            if "fail" in prompt:
+                raise RuntimeError("model unavailable")
+            return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=f"Echo: {prompt}"))])
+        finally:
+            self.in_flight -= 1
+
+
+@pytest.fixture
+def model():
+    """The model behind the assistant"""
+    return EchoModel()
+
+
+@pytest.fixture
+def assistant(model):
+    """Assistant using the echo model"""
+    with patch('nexus.core.assistant.openai.OpenAI'):
+        assistant = AIAssistant()
+    assistant._async_client = model
+    return assistant
+
+
+def write_lines(path, items):
+    """Write items as JSON lines"""
+    path.write_text("".join(json.dumps(item) + "\n" for item in items))
+
+
+def read_records(path):
+    """Results of an output file, by prompt position"""
+    return {record['line']: record for record in map(json.loads, path.read_text().splitlines())}
+
+
+class TestBatch:
+    """Test cases for run_batch"""
+
+    def test_answers_all_prompts_with_bounded_concurrency(self, assistant, model, tmp_path):
+        """Test that every prompt gets one result line and no more than the pool runs at once"""
+        source, output = tmp_path / "in.jsonl", tmp_path / "out.jsonl"
+        write_lines(source, [{'prompt': f"Question {i}", 'id': f"q{i}"} for i in range(40)] + ["Plain string"])
+        reports = []
+
+        report = asyncio.run(run_batch(assistant, str(source), str(output), concurrency=4,
+                                       progress=reports.append, progress_interval=0.01))
+
+        records = read_records(output)
+        assert len(records) == 41 and len(output.read_text().splitlines()) == 41
+        assert records[1]['id'] == "q0" and records[1]['response'] == "Echo: Question 0"
+        assert records[41]['id'] == 41 and records[41]['response'] == "Echo: Plain string"
+        assert all(record['conversation_id'] for record in records.values())
+        assert model.most_in_flight == 4
+        assert (report['done'], report['failed'], report['skipped'], report['total']) == (41, 0, 0, 41)
+        assert reports[-1]['eta'] == 0.0 and reports[-1]['rate'] > 0
+        assert assistant.get_learning_stats()['total_conversations'] == 41
+
+    def test_resume_skips_finished_and_retries_failed(self, assistant, model, tmp_path):
+        """Test that a rerun continues after a crash, retrying failures without duplicating results"""
+        source, output = tmp_path / "in.jsonl", tmp_path / "out.jsonl"
+        write_lines(source, [{'prompt': "one"}, {'prompt': "please fail"}, {'nothing': 1},
+                             {'prompt': "four"}, {'prompt': "five"}])
+        output.write_text(json.dumps({'line': 1, 'id': 1, 'response': "Echo: one", 'error': None}) + "\n"
+                          + json.dumps({'line': 4, 'id': 4, 'response': None, 'error': "timeout"}) + "\n"
+                          + '{"line": 5, "id": 5, "resp')
+
+        assert read_finished(str(output)) == {1}
+        assert len(output.read_text().splitlines()) == 1
+
+        report = asyncio.run(run_batch(assistant, str(source), str(output), concurrency=2, learn=False))
+        assert sorted(model.prompts) == ["five", "four", "please fail"]
+        records = read_records(output)
+        assert sorted(records) == [1, 2, 3, 4, 5]
+        assert records[2]['error'] == "model unavailable" and records[2]['response'] is None
+        assert records[3]['error'].startswith("Invalid input line")
+        assert records[4]['response'] == "Echo: four" and records[4]['conversation_id'] is None
+        assert (report['done'], report['failed'], report['skipped']) == (2, 2, 1)
+        assert assistant.get_learning_stats()['total_conversations'] == 0
+
+        model.prompts.clear()
+        asyncio.run(run_batch(assistant, str(source), str(output), concurrency=2, learn=False))
+        assert model.prompts == ["please fail"]
+        assert len(output.read_text().splitlines()) == 5
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,125 @@
+"""
+Tests for the trained topic/intent classifier
+"""
+
+import time
+import pytest
+import sys
+from pathlib import Path
+
+# Add src directory to Python path
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+pytest.importorskip("numpy")
+
+from nexus.core.classifier import ClassifierTrainer, load_model, rule_labels, tokenize
+from nexus.core.config import config
+from nexus.core.learning import LearningDatabase, SelfImprovementEngine
+
+
+TRAINING = [
+    ("How do I sort a list in python with pandas?", 1),
+    ("Refactor this python function using pandas groupby", 1),
+    ("Debug my javascript code, the promise never resolves", 0),
+    ("Write a poem about the sea", 1),
+    ("Tell me a story about a dragon", 0),
+    ("Help me configure the server network", None),
+    ("Can you assist with database backups?", 1),
+    ("Make a design for my art portfolio", -1),
+]
+
+
+@pytest.fixture
+def db(tmp_path):
+    """Learning database holding the training conversations many times over"""
+    db = LearningDatabase(str(tmp_path / "learning.db"))
+    with db.transaction():
+        for i in range(30):
+            for user_input, feedback in TRAINING:
+                db.store_conversation(user_input, "Sure.", feedback, timestamp=f"2024-01-01 00:00:{i:02d}")
+    return db
+
+
+class TestTopicIntentClassifier:
+    """Test cases for training and using the classifier"""
+
+    def test_rule_labels_match_whole_words(self):
+        """Test that training labels match keywords and their inflections, not words containing them"""
+        assert rule_labels(tokenize("Show me the helpful functions?")) == \
+            (['programming'], 'question')
+        assert rule_labels(tokenize("show me")) == ([], 'general_interaction')
+        assert rule_labels(tokenize("However, this article on artificial makefiles")) == \
+            ([], 'general_interaction')
+        assert rule_labels(tokenize("Making designs")) == (['creative'], 'creation_request')
+
+    def test_generalizes_beyond_keywords(self, db):
+        """Test that words seen alongside keywords carry the topic"""
+        ClassifierTrainer(db).train()
+        model = load_model(db)
+
+        topics, intent = model.predict("Any pandas tips?")
+        assert 'programming' in topics and 'technical' not in topics
+        assert intent == 'question'
+        assert model.predict("a dragon")[0] == ['creative']
+
+        # Held-out messages without keywords: the rules find no topic in them
+        held_out = [
+            ("Any pandas tips?", ['programming']),
+            ("my groupby is slow", ['programming']),
+            ("the promise never resolves", ['programming']),
+            ("a dragon", ['creative']),
+            ("about the sea", ['creative']),
+            ("configure backups", ['technical']),
+        ]
+        rules_right = sum(rule_labels(tokenize(text))[0] == expected for text, expected in held_out)
+        model_right = sum(model.predict(text)[0] == expected for text, expected in held_out)
+        assert rules_right == 0 and model_right >= 5
+
+        start = time.perf_counter()
+        for _ in range(1000):
+            model.predict("Could you sort my pandas groupby by date, please?")
+        assert (time.perf_counter() - start) / 1000 < 0.001
+
+    def test_incremental_training_equals_full(self, db):
+        """Test that training in several runs gives the same model as one run"""
+        trainer = ClassifierTrainer(db, batch_size=7)
+        # Disliked conversations are left out
+        assert trainer.train()['added'] == 210
+        db.store_conversation("Explain how to learn python", "Sure.", 1)
+        result = trainer.train()
+        assert (result['added'], result['examples']) == (1, 211)
+        incremental = load_model(db)
+
+        trainer.train(rebuild=True)
+        full = load_model(db)
+        assert full.trained_through == incremental.trained_through
+        assert (full.topic_counts == incremental.topic_counts).all()
+        assert (full.intent_counts == incremental.intent_counts).all()
+        assert trainer.train()['added'] == 0
+
+    def test_engine_falls_back_until_trained(self, db, monkeypatch):
+        """Test that keyword rules serve until the model has seen enough conversations"""
+        monkeypatch.setattr(config, "classifier_min_examples", 100)
+        assert SelfImprovementEngine(db).classifier is None
+
+        ClassifierTrainer(db).train()
+        engine = SelfImprovementEngine(db)
+        insights = engine.extract_conversation_insights("Sorting with pandas groupby", "Sure.")
+        assert insights['topics'] == ['programming']
+        assert "For programming topics" not in engine.get_adaptive_prompt_enhancement("pandas", "Base")
+
+    def test_engine_picks_up_retrained_model(self, db, monkeypatch):
+        """Test that a running engine switches to a model trained after it started"""
+        monkeypatch.setattr(config, "classifier_min_examples", 100)
+        engine = SelfImprovementEngine(db)
+        assert engine.classifier is None
+
+        ClassifierTrainer(db).train()
+        assert engine.reload_classifier()
+        assert engine.classifier is not None
+        assert not engine.reload_classifier()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
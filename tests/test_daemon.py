@@ -0,0 +1,134 @@
+"""
+Tests for the resident assistant daemon and its command line client
+"""
+
+import os
+import pytest
+import subprocess
+import sys
+import threading
+import time
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+# Add src directory to Python path
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from nexus.core.assistant import AIAssistant
+from nexus.daemon import AssistantDaemon, DaemonError, connect
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="uses Unix domain sockets")
+
+
+@pytest.fixture
+def model():
+    """OpenAI client double answering every question the same way"""
+    response = Mock()
+    response.choices = [Mock()]
+    response.choices[0].message.content = "Warm answer."
+    client = Mock()
+    client.chat.completions.create.return_value = response
+    return client
+
+
+@pytest.fixture
+def daemon(tmp_path, model):
+    """Daemon serving an assistant on a socket in a temporary directory"""
+    with patch('nexus.core.assistant.openai.OpenAI', return_value=model):
+        assistant = AIAssistant()
+    daemon = AssistantDaemon(str(tmp_path / "daemon.sock"), assistant=assistant)
+    thread = threading.Thread(target=daemon.serve_forever, daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 10
+    while not daemon._running.is_set():
+        if time.monotonic() > deadline:
+            raise TimeoutError("Daemon did not start")
+        time.sleep(0.01)
+    yield daemon
+    daemon.stop()
+    thread.join(timeout=10)
+
+
+class TestDaemon:
+    """Test cases for answering through the daemon"""
+
+    def test_clients_hold_separate_conversations(self, daemon, model):
+        """Test that each connection is a conversation of its own on the shared assistant"""
+        first, second = connect(daemon.address), connect(daemon.address)
+
+        assert first.ask("What is a generator?", temperature=0.2) == "Warm answer."
+        assert first.last_conversation_id is not None
+        assert model.chat.completions.create.call_args.kwargs['temperature'] == 0.2
+        second.ask("Hello")
+
+        assert [m['content'] for m in first.get_conversation_history()[1:]] == ["What is a generator?", "Warm answer."]
+        assert [m['content'] for m in second.get_conversation_history()[1:]] == ["Hello", "Warm answer."]
+        second.reset_conversation()
+        assert len(second.get_conversation_history()) == 1
+
+        result = first.provide_feedback("What is a generator?", "Warm answer.", 1,
+                                        conversation_id=first.last_conversation_id)
+        assert result['conversation_id'] == first.last_conversation_id
+        stats = first.get_learning_stats()
+        assert stats['total_conversations'] == 2 and stats['positive_feedback_rate'] == 0.5
+        assert first.continuous_improvement_summary()['total_interactions'] == 2
+
+        with pytest.raises(DaemonError):
+            first.request('explode')
+        assert first.status()['requests'] >= 9
+        first.close()
+        second.close()
+
+    def test_model_override(self, daemon, model):
+        """Test that a client can ask for another model than the daemon's"""
+        client = connect(daemon.address, model="smaller")
+        client.ask("Hi")
+        assert model.chat.completions.create.call_args.kwargs['model'] == "smaller"
+
+    def test_shutdown_and_single_instance(self, daemon, tmp_path):
+        """Test that one daemon owns an address and a client can stop it"""
+        with pytest.raises(RuntimeError):
+            AssistantDaemon(daemon.address, assistant=daemon.assistant).serve_forever()
+
+        status = connect(daemon.address).shutdown()
+        assert status['pid'] == os.getpid()
+        deadline = time.monotonic() + 10
+        while connect(daemon.address) is not None:
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+        assert not Path(f"{daemon.address}.key").exists()
+
+
+class TestDaemonClient:
+    """Test cases for finding the daemon"""
+
+    def test_no_daemon(self, tmp_path):
+        """Test that a missing, stale or disabled daemon means answering in process"""
+        stale = tmp_path / "stale.sock"
+        stale.touch()
+        Path(f"{stale}.key").write_bytes(b"old key")
+
+        assert connect(str(tmp_path / "missing.sock")) is None
+        assert connect(str(stale)) is None
+        assert connect("") is None
+
+    def test_unauthenticated_client_rejected(self, daemon):
+        """Test that a connection without the daemon's key is refused"""
+        with pytest.raises(AuthenticationError):
+            Client(daemon.address, authkey=b"default-secret-key")
+        assert Path(f"{daemon.address}.key").stat().st_mode & 0o777 == 0o600
+
+    def test_client_imports_stay_light(self):
+        """Test that importing the package and connecting does not load the assistant"""
+        code = ("import sys, nexus, nexus.cli, nexus.daemon; nexus.daemon.connect('missing.sock'); "
+                "print(sorted(m for m in ('openai', 'ollama', 'loguru', 'nexus.core.assistant') if m in sys.modules))")
+        output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                                env=dict(os.environ, PYTHONPATH=str(src_path)))
+        assert output.stdout.strip() == "[]"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,136 @@
+"""
+Tests for latency objective driven degradation
+"""
+
+import json
+import pytest
+import sys
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+# Add src directory to Python path
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from nexus.core.assistant import AIAssistant
+from nexus.core.config import config
+from nexus.core.degradation import Degradation, DegradationController
+
+
+@pytest.fixture
+def audit_log(tmp_path):
+    """Audit log of mode changes"""
+    return tmp_path / "degradation.jsonl"
+
+
+def controller(audit_log, **kwargs):
+    """Controller with a 1 second objective, judged over 10 answers without cooldown"""
+    options = dict(target=1.0, window=10, recovery_ratio=0.7, cooldown=0, fallback_model="small",
+                   audit_log=str(audit_log))
+    options.update(kwargs)
+    return DegradationController(**options)
+
+
+class TestDegradationController:
+    """Test cases for mode changes"""
+
+    def test_degrades_step_by_step_and_recovers_with_hysteresis(self, audit_log):
+        """Test that slow windows degrade one mode each, the band in between holds and fast ones recover"""
+        slo = controller(audit_log)
+        modes = []
+        for _ in range(5):
+            for _ in range(10):
+                slo.record(2.0)
+            modes.append(slo.mode)
+        assert modes == ['short_answers', 'short_context', 'small_model', 'cached_answers', 'cached_answers']
+
+        for _ in range(30):
+            slo.record(0.9)
+        assert slo.mode == 'cached_answers'
+        for _ in range(10):
+            slo.record(0.1)
+        assert slo.mode == 'small_model'
+
+        events = [json.loads(line) for line in audit_log.read_text().splitlines()]
+        assert [(event['from'], event['to']) for event in events] == [
+            ('normal', 'short_answers'), ('short_answers', 'short_context'), ('short_context', 'small_model'),
+            ('small_model', 'cached_answers'), ('cached_answers', 'small_model')]
+        assert events[0]['p95'] == 2.0 and events[0]['target'] == 1.0
+        assert slo.stats()['events'] == events
+
+    def test_cooldown_and_disabled_objective(self, audit_log):
+        """Test that changes wait for the cooldown and that no objective means no changes"""
+        slo = controller(audit_log, cooldown=3600)
+        for _ in range(20):
+            slo.record(5.0)
+        assert slo.mode == 'short_answers'
+
+        disabled = controller(audit_log, target=0)
+        for _ in range(20):
+            disabled.record(5.0)
+        assert disabled.mode == 'normal' and disabled.stats()['samples'] == 0
+
+    def test_modes_without_fallback_model(self, audit_log):
+        """Test that the model switch is skipped when no smaller model is configured"""
+        slo = controller(audit_log, fallback_model="")
+        assert slo.modes == ['normal', 'short_answers', 'short_context', 'cached_answers']
+        for _ in range(30):
+            slo.record(2.0)
+        current = slo.current()
+        assert current.mode == 'cached_answers' and current.model is None and current.use_cache
+
+    def test_degradation_applies_to_request(self):
+        """Test that a mode caps tokens, shortens the context and switches the model"""
+        messages = [{'role': 'system', 'content': "prompt"}] + [
+            {'role': 'user' if i % 2 == 0 else 'assistant', 'content': str(i)} for i in range(9)]
+        options = {'max_tokens': 50}
+        trimmed = Degradation(max_tokens=100, context_messages=3, model="small").apply(messages, options)
+        assert [message['content'] for message in trimmed] == ["prompt", "6", "7", "8"]
+        assert options == {'max_tokens': 50, 'model': "small"}
+
+        options = {}
+        assert Degradation().apply(messages, options) == messages and options == {}
+
+
+class TestAssistantDegradation:
+    """Test cases for degraded answers of the assistant"""
+
+    @patch('nexus.core.assistant.openai.OpenAI')
+    def test_degraded_requests_and_cached_answers(self, mock_openai, audit_log):
+        """Test that slow answers make later requests cheaper and finally served from the cache"""
+        mock_response = Mock()
+        mock_response.choices = [Mock()]
+        mock_response.choices[0].message.content = "Generators yield lazily."
+        mock_client = Mock()
+        mock_client.chat.completions.create.return_value = mock_response
+        mock_openai.return_value = mock_client
+
+        assistant = AIAssistant()
+        assistant.degradation = slo = controller(audit_log)
+        assistant.ask("What is a generator?")
+        for _ in range(20):
+            slo.record(2.0)
+        assert slo.mode == 'short_context'
+
+        for i in range(4):
+            assistant.ask(f"Question {i}")
+        request = mock_client.chat.completions.create.call_args.kwargs
+        assert request['max_tokens'] == config.slo_degraded_max_tokens
+        assert len(request['messages']) == 1 + config.slo_degraded_context
+        assert request['messages'][-1]['content'] == "Question 3"
+
+        for _ in range(20):
+            slo.record(2.0)
+        calls = mock_client.chat.completions.create.call_count
+        assert assistant.ask("  what is a GENERATOR? ") == "Generators yield lazily."
+        assert mock_client.chat.completions.create.call_count == calls
+        assert assistant.last_conversation_id is None
+        assert assistant.memory.messages[-2]['content'] == "  what is a GENERATOR? "
+
+        assistant.ask("Something new")
+        request = mock_client.chat.completions.create.call_args.kwargs
+        assert request['model'] == "small"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,322 @@
+"""
+Tests for the Nexus learning database and self-improvement engine
+"""
+
+import pytest
+import sqlite3
+import sys
+from datetime import datetime
+from pathlib import Path
+
+# Add src directory to Python path
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from nexus.core.learning import LearningDatabase, SelfImprovementEngine
+
+
+@pytest.fixture
+def db(tmp_path):
+    """Learning database stored in a temporary directory"""
+    return LearningDatabase(str(tmp_path / "learning.db"))
+
+
+class TestLearningStatistics:
+    """Test cases for the maintained learning aggregates"""
+
+    def test_empty_database(self, db):
+        """Test statistics of a fresh database"""
+        stats = db.get_statistics()
+
+        assert stats['total_conversations'] == 0
+        assert stats['positive_feedback_rate'] == 0.0
+        assert stats['avg_quality_score'] == 0.0
+        assert stats['learned_patterns'] == {}
+
+    def test_aggregates_follow_writes(self, db):
+        """Test that aggregates track inserts, updates and deletes"""
+        db.store_conversation("q1", "a1", user_feedback=1, context_quality=0.8, response_time=1.0)
+        q2 = db.store_conversation("q2", "a2", user_feedback=0, context_quality=0.4, response_time=3.0)
+        q3 = db.store_conversation("q3", "a3", user_feedback=-1)
+        db.store_pattern('response_quality', {'style': 'concise'})
+        db.store_pattern('topic_expertise', {'topic': 'science'})
+        db.store_pattern('topic_expertise', {'topic': 'programming'})
+
+        stats = db.get_statistics()
+        assert stats['total_conversations'] == 3
+        assert stats['positive_feedback_rate'] == pytest.approx(1 / 3)
+        assert stats['avg_quality_score'] == pytest.approx(0.6)
+        assert stats['avg_response_time'] == pytest.approx(2.0)
+        assert stats['learned_patterns'] == {'response_quality': 1, 'topic_expertise': 2}
+
+        conn = db.connect()
+        conn.execute("UPDATE conversations SET user_feedback = 1 WHERE content_hash = ?", (q2,))
+        conn.execute("DELETE FROM conversations WHERE content_hash = ?", (q3,))
+        conn.commit()
+        conn.close()
+
+        stats = db.get_statistics()
+        assert stats['total_conversations'] == 2
+        assert stats['positive_feedback_rate'] == pytest.approx(1.0)
+
+    def test_recompute_matches_maintained(self, db):
+        """Test that recomputing from raw rows gives the same statistics"""
+        for i in range(10):
+            db.store_conversation(f"q{i}", f"a{i}", user_feedback=i % 3 - 1,
+                                  context_quality=i / 10, response_time=float(i))
+            db.store_pattern('response_quality', {'index': i})
+
+        maintained = db.get_statistics()
+        db.recompute_statistics()
+
+        recomputed = db.get_statistics()
+        assert recomputed.pop('learned_patterns') == maintained.pop('learned_patterns')
+        assert recomputed == pytest.approx(maintained)
+
+    def test_backfill_existing_database(self, tmp_path):
+        """Test that aggregates are backfilled for databases predating them"""
+        path = tmp_path / "legacy.db"
+        conn = sqlite3.connect(path)
+        conn.execute("""
+            CREATE TABLE conversations (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_input TEXT NOT NULL,
+                assistant_response TEXT NOT NULL,
+                user_feedback INTEGER,
+                context_quality REAL,
+                response_time REAL,
+                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        conn.execute("""
+            INSERT INTO conversations (user_input, assistant_response, user_feedback, context_quality)
+            VALUES ('q', 'a', 1, 0.5)
+        """)
+        conn.commit()
+        conn.close()
+
+        stats = LearningDatabase(str(path)).get_statistics()
+
+        assert stats['total_conversations'] == 1
+        assert stats['positive_feedback_rate'] == 1.0
+
+    def test_legacy_duplicates_merged(self, tmp_path):
+        """Test that copies of one exchange stored within a second are merged, keeping the feedback"""
+        path = tmp_path / "legacy.db"
+        conn = sqlite3.connect(path)
+        conn.execute("""
+            CREATE TABLE conversations (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_input TEXT NOT NULL,
+                assistant_response TEXT NOT NULL,
+                user_feedback INTEGER,
+                context_quality REAL,
+                response_time REAL,
+                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        conn.executemany("""
+            INSERT INTO conversations (user_input, assistant_response, user_feedback, timestamp)
+            VALUES (?, ?, ?, '2025-01-01 10:00:00')
+        """, [('q', 'a', 0), ('q', 'a', 1), ('other', 'a', None)])
+        conn.commit()
+        conn.close()
+
+        db = LearningDatabase(str(path))
+        stats = db.get_statistics()
+
+        assert stats['total_conversations'] == 2
+        assert stats['positive_feedback_rate'] == 0.5
+        assert db.get_conversation(db.find_conversation("q", "a"))['user_feedback'] == 1
+        assert LearningDatabase(str(path)).get_statistics()['total_conversations'] == 2
+
+
+class TestFeedback:
+    """Test cases for updating feedback of stored conversations"""
+
+    def test_feedback_updates_conversation_and_patterns(self, db):
+        """Test that feedback changes the original row and its patterns only"""
+        engine = SelfImprovementEngine(db)
+        learned = engine.learn_from_feedback("How do I write python code?", "Use def.", feedback=0)
+
+        result = engine.record_feedback(learned['conversation_id'], -1)
+
+        stats = db.get_statistics()
+        assert result['updated']
+        assert result['overall_quality'] == pytest.approx(learned['overall_quality'])
+        assert stats['total_conversations'] == 1
+        assert stats['positive_feedback_rate'] == 0.0
+        assert {p['feedback'] for p in db.get_patterns('response_quality')} == {-1}
+        assert {p['feedback'] for p in db.get_patterns('topic_expertise')} == {-1}
+
+    def test_unknown_and_abbreviated_ids(self, db):
+        """Test lookups of conversation IDs by prefix and by texts"""
+        conversation_id = db.store_conversation("q", "a", user_feedback=0)
+
+        assert db.update_feedback("0" * 64, 1) is False
+        assert db.resolve_conversation_id(conversation_id[:12]) == conversation_id
+        assert db.find_conversation("q", "a") == conversation_id
+        assert db.find_conversation("q", "other") is None
+        with pytest.raises(ValueError):
+            db.update_feedback(conversation_id, 5)
+
+
+class TestRollups:
+    """Test cases for time-bucketed rollups"""
+
+    def test_rollups_by_hour_and_model(self, db):
+        """Test that rollups aggregate per bucket and model"""
+        conn = db.connect()
+        rows = [
+            ("2024-05-01 10:05:00", "llama", 0.3, 0.5),
+            ("2024-05-01 10:40:00", "llama", 1.5, 0.7),
+            ("2024-05-01 10:50:00", "gpt", 9.0, 0.9),
+            ("2024-05-01 11:10:00", "llama", 0.2, None),
+        ]
+        conn.executemany("""
+            INSERT INTO conversations
+            (user_input, assistant_response, timestamp, model, response_time, context_quality)
+            VALUES ('q', 'a', ?, ?, ?, ?)
+        """, rows)
+        conn.commit()
+        conn.close()
+
+        hourly = db.get_rollups(datetime(2024, 5, 1), granularity='hour')
+        assert [r['bucket_start'] for r in hourly] == ["2024-05-01 10:00:00", "2024-05-01 11:00:00"]
+        assert hourly[0]['conversations'] == 3
+        assert hourly[0]['min_response_time'] == 0.3
+        assert hourly[0]['max_response_time'] == 9.0
+        assert hourly[0]['p95_response_time'] == 9.0
+        assert hourly[0]['avg_quality_score'] == pytest.approx(0.7)
+        assert hourly[1]['avg_quality_score'] == 0.0
+
+        daily = db.get_rollups(datetime(2024, 5, 1), granularity='day', by_model=True)
+        by_model = {r['model']: r for r in daily}
+        assert by_model['llama']['conversations'] == 3
+        assert by_model['llama']['p95_response_time'] == 1.5  # bin bound clamped to max
+        assert by_model['gpt']['avg_quality_score'] == pytest.approx(0.9)
+
+        assert db.get_rollups(datetime(2024, 5, 2)) == []
+
+    def test_rollups_survive_raw_deletes(self, db):
+        """Test that removing raw rows keeps the rollups intact"""
+        db.store_conversation("q", "a", response_time=1.0, model="llama")
+        conn = db.connect()
+        conn.execute("DELETE FROM conversations")
+        conn.commit()
+        conn.close()
+
+        rollups = db.get_rollups(datetime(2000, 1, 1))
+        assert rollups[0]['conversations'] == 1
+
+
+class TestSearch:
+    """Test cases for full-text search over conversations"""
+
+    def test_ranked_snippets_and_paging(self, db):
+        """Test that matches come back highlighted and can be paged"""
+        db.store_conversation("How do I sort a list in Python?", "Use sorted() or list.sort().")
+        db.store_conversation("Tell me a joke", "Why did the list go to therapy?")
+        db.store_conversation("What is a cat?", "A small furry animal.")
+
+        results = db.search_conversations("list")
+        assert len(results) == 2
+        assert all('[list]' in r['user_input'] + r['assistant_response'] for r in results)
+        assert len(results[0]['conversation_id']) == 64
+
+        first_page = db.search_conversations("list", limit=1)
+        second_page = db.search_conversations("list", limit=1, offset=1)
+        assert first_page[0]['conversation_id'] != second_page[0]['conversation_id']
+        assert db.search_conversations("list", limit=1, offset=2) == []
+
+    def test_index_follows_deletes(self, db):
+        """Test that deleted conversations disappear from the index"""
+        db.store_conversation("quantum question", "quantum answer")
+        conn = db.connect()
+        conn.execute("DELETE FROM conversations")
+        conn.commit()
+        conn.close()
+
+        assert db.search_conversations("quantum") == []
+
+    def test_query_syntax_is_escaped(self, db):
+        """Test that user queries with FTS5 operators do not raise"""
+        db.store_conversation('He said "hello" (loudly)', "ok")
+
+        assert len(db.search_conversations('"hello" (loudly')) == 1
+        assert db.search_conversations("   ") == []
+
+    def test_backfill_existing_conversations(self, tmp_path):
+        """Test that conversations stored before the index existed are searchable"""
+        path = tmp_path / "learning.db"
+        db = LearningDatabase(str(path))
+        db.store_conversation("neutrino physics", "tiny particles")
+        conn = sqlite3.connect(path)
+        conn.execute("DROP TABLE conversations_fts")
+        conn.execute("DROP TRIGGER conversations_fts_insert")
+        conn.commit()
+        conn.close()
+
+        reopened = LearningDatabase(str(path))
+
+        assert len(reopened.search_conversations("neutrino")) == 1
+
+
+class TestBlobStorage:
+    """Test cases for content-addressed conversation text storage"""
+
+    def test_texts_stored_once_and_read_transparently(self, db):
+        """Test that repeated texts share one blob and read back verbatim"""
+        answer = "def solve():\n    return 42\n" * 50
+        db.store_conversation("same question", answer)
+        db.store_conversation("same question", answer, timestamp="2024-01-01 00:00:00")
+
+        conn = db.connect()
+        blobs = conn.execute("SELECT COUNT(*), SUM(codec) FROM conversation_blobs").fetchone()
+        texts = conn.execute("SELECT user_input, assistant_response FROM conversation_text").fetchall()
+        conn.close()
+
+        assert blobs == (2, 1)
+        assert texts == [("same question", answer)] * 2
+
+        report = db.get_storage_report()
+        assert report['conversations'] == 2
+        assert report['deduplication_saved_bytes'] == len("same question") + len(answer)
+        assert report['compression_saved_bytes'] > 0
+        assert report['stored_bytes'] < report['text_bytes']
+
+    def test_inline_rows_migrated(self, tmp_path):
+        """Test that texts written directly to the table move to blobs on open"""
+        path = tmp_path / "learning.db"
+        db = LearningDatabase(str(path))
+        conn = db.connect()
+        conn.execute("""
+            INSERT INTO conversations (user_input, assistant_response, content_hash)
+            VALUES ('inline question', 'inline answer', 'h')
+        """)
+        conn.commit()
+        conn.close()
+
+        reopened = LearningDatabase(str(path))
+        conn = reopened.connect()
+        raw = conn.execute("SELECT user_input, user_input_hash FROM conversations").fetchone()
+        conn.close()
+
+        assert raw[0] == '' and raw[1] is not None
+        assert reopened.search_conversations("inline")[0]['user_input'] == "[inline] question"
+
+    def test_unused_blobs_purged(self, db):
+        """Test that texts of deleted conversations can be purged"""
+        db.store_conversation("kept", "shared answer")
+        removed = db.store_conversation("removed", "shared answer")
+        conn = db.connect()
+        conn.execute("DELETE FROM conversations WHERE content_hash = ?", (removed,))
+        conn.commit()
+        conn.close()
+
+        assert db.purge_unused_blobs() == 1
+        assert db.get_storage_report()['blobs'] == 2
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,91 @@
+"""
+Tests for Nexus learning database maintenance
+"""
+
+import gzip
+import json
+import pytest
+import sys
+from pathlib import Path
+
+# Add src directory to Python path
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from nexus.core.learning import LearningDatabase
+from nexus.core.maintenance import DatabaseMaintenance
+
+
+@pytest.fixture
+def db(tmp_path):
+    """Learning database with two expired and one recent conversation"""
+    db = LearningDatabase(str(tmp_path / "learning.db"))
+    conn = db.connect()
+    conn.executemany("""
+        INSERT INTO conversations
+        (user_input, assistant_response, user_feedback, context_quality, response_time, timestamp)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """, [
+        ("old 1", "answer 1", 1, 0.2, 1.0, "2020-01-01 00:00:00"),
+        ("old 2", "answer 2", -1, 0.4, 3.0, "2020-01-02 00:00:00"),
+        ("new", "answer 3", 1, 0.9, 2.0, "2999-01-01 00:00:00"),
+    ])
+    conn.execute("""
+        INSERT INTO knowledge_patterns (pattern_type, pattern_data, last_updated)
+        VALUES ('response_quality', '{}', '2020-01-01 00:00:00')
+    """)
+    conn.commit()
+    conn.close()
+    return db
+
+
+class TestDatabaseMaintenance:
+    """Test cases for retention and archival"""
+
+    def test_dry_run_changes_nothing(self, db, tmp_path):
+        """Test that a dry run only reports expired rows"""
+        maintenance = DatabaseMaintenance(db, retention_days=30, archive_dir=str(tmp_path / "archives"))
+        report = maintenance.run(dry_run=True)
+
+        assert report['conversations_archived'] == 2
+        assert report['patterns_archived'] == 1
+        assert db.get_statistics()['total_conversations'] == 3
+        assert not (tmp_path / "archives").exists()
+
+    def test_archive_and_delete(self, db, tmp_path):
+        """Test that expired rows are archived, deleted and kept in statistics"""
+        stats_before = db.get_statistics()
+        maintenance = DatabaseMaintenance(db, retention_days=30, archive_dir=str(tmp_path / "archives"),
+                                          chunk_size=1)
+        report = maintenance.run()
+
+        assert report['conversations_archived'] == 2
+        assert report['patterns_archived'] == 1
+
+        conn = db.connect()
+        remaining = [row[0] for row in conn.execute("SELECT user_input FROM conversation_text")]
+        conn.close()
+        assert remaining == ["new"]
+
+        conversations_archive = next(p for p in report['archive_files'] if "conversations" in p)
+        with gzip.open(conversations_archive, "rt", encoding="utf-8") as archive:
+            archived = [json.loads(line) for line in archive]
+        assert [row['user_input'] for row in archived] == ["old 1", "old 2"]
+
+        stats_after = db.get_statistics()
+        assert stats_after['total_conversations'] == stats_before['total_conversations']
+        assert stats_after['avg_quality_score'] == pytest.approx(stats_before['avg_quality_score'])
+        assert stats_after['learned_patterns'] == {}
+
+    def test_zero_retention_keeps_everything(self, db, tmp_path):
+        """Test that a retention of zero days disables archival"""
+        maintenance = DatabaseMaintenance(db, retention_days=0, pattern_retention_days=0,
+                                          archive_dir=str(tmp_path / "archives"))
+        report = maintenance.run()
+
+        assert report['conversations_archived'] == 0
+        assert report['patterns_archived'] == 0
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,119 @@
+"""
+Tests for rebuilding knowledge patterns from stored conversations
+"""
+
+import json
+import pytest
+import sys
+from pathlib import Path
+
+# Add src directory to Python path
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from nexus.core.learning import LearningDatabase, SelfImprovementEngine
+from nexus.core.reanalysis import SHARDS_TABLE, PatternReanalyzer
+from nexus.core.storage import ShardedSQLiteBackend
+
+
+CONVERSATIONS = [
+    ("How do I write a python function?", "Here's an example function.", 1),
+    ("Explain the network design", "Consider the server layout.", -1),
+    ("Tell me a story", "Once upon a time!", 0),
+    ("Debug this code", "```print(1)```", 1),
+    ("Research data analysis", "Imagine an experiment.", None),
+]
+
+
+@pytest.fixture
+def db(tmp_path):
+    """Learning database with conversations learned through the engine"""
+    db = LearningDatabase(str(tmp_path / "learning.db"))
+    engine = SelfImprovementEngine(db)
+    for user_input, response, feedback in CONVERSATIONS:
+        engine.learn_from_feedback(user_input, response, feedback)
+    return db
+
+
+def _patterns(db):
+    """Derived patterns as comparable (type, data, conversation_id) tuples"""
+    conn = db.connect()
+    rows = conn.execute("""
+        SELECT pattern_type, pattern_data, conversation_id FROM knowledge_patterns
+    """).fetchall()
+    conn.close()
+    return sorted(((row[0], json.loads(row[1])['feedback'], row[2]) for row in rows), key=repr)
+
+
+class TestPatternReanalyzer:
+    """Test cases for the offline reanalysis job"""
+
+    def test_rebuild_replaces_stale_patterns(self, db):
+        """Test that a parallel rebuild regenerates patterns and keeps what it cannot derive"""
+        expected = _patterns(db)
+        conn = db.connect()
+        conversation_id = conn.execute("SELECT content_hash FROM conversations LIMIT 1").fetchone()[0]
+        conn.close()
+        db.store_pattern('topic_expertise', {'topic': 'stale', 'feedback': 1}, conversation_id=conversation_id)
+        db.store_pattern('response_quality', {'feedback': 0}, conversation_id='archived')
+        db.store_pattern('user_preferences', {'feedback': 1})
+
+        result = PatternReanalyzer(db, workers=2, shard_size=2).run()
+
+        assert result['conversations'] == len(CONVERSATIONS)
+        assert _patterns(db) == sorted(expected + [('response_quality', 0, 'archived'),
+                                                   ('user_preferences', 1, None)], key=repr)
+        assert sum(db.get_statistics()['learned_patterns'].values()) == result['patterns']
+
+        # The swapped-in table keeps its indexes and statistics triggers
+        db.store_pattern('response_quality', {'feedback': 1})
+        assert sum(db.get_statistics()['learned_patterns'].values()) == result['patterns'] + 1
+        assert db.update_feedback(conversation_id, -1)
+
+    def test_sharded_backend_in_worker_processes(self, tmp_path):
+        """Test a parallel rebuild of a database on the per-tenant sharded backend"""
+        db = LearningDatabase(backend=ShardedSQLiteBackend(str(tmp_path / "tenants")))
+        engine = SelfImprovementEngine(db)
+        for user_input, response, feedback in CONVERSATIONS:
+            engine.learn_from_feedback(user_input, response, feedback)
+        expected = _patterns(db)
+
+        result = PatternReanalyzer(db, workers=2, shard_size=2).run()
+
+        assert result['conversations'] == len(CONVERSATIONS)
+        assert _patterns(db) == expected
+
+    def test_interrupted_run_resumes(self, db):
+        """Test that merged shards survive an interruption and later conversations are included"""
+        expected = _patterns(db)
+
+        def interrupt(status):
+            raise KeyboardInterrupt
+
+        with pytest.raises(KeyboardInterrupt):
+            PatternReanalyzer(db, workers=1, shard_size=2).run(progress=interrupt)
+
+        conn = db.connect()
+        assert conn.execute(f"SELECT COUNT(completed_at) FROM {SHARDS_TABLE}").fetchone()[0] == 1
+        conn.close()
+
+        # Arrives after the shards were planned; feedback changes after analysis
+        SelfImprovementEngine(db).learn_from_feedback("New question?", "New answer.", 1)
+        conversation_id = db.find_conversation(*CONVERSATIONS[0][:2])
+        db.update_feedback(conversation_id, -1)
+
+        result = PatternReanalyzer(db, workers=1, shard_size=2).run()
+
+        assert result['resumed']
+        assert result['conversations'] == len(CONVERSATIONS) + 1
+        resumed = _patterns(db)
+        assert len(resumed) == len(expected) + 1
+        assert all(feedback == -1 for _, feedback, cid in resumed if cid == conversation_id)
+
+        # Same outcome as an uninterrupted run
+        PatternReanalyzer(db, workers=1).run(restart=True)
+        assert _patterns(db) == resumed
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,141 @@
+"""
+Tests for the scorer registry, stage timing and deferred scoring
+"""
+
+import pytest
+import sys
+from pathlib import Path
+
+# Add src directory to Python path
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from nexus.core.config import config
+from nexus.core.deferred_scoring import DeferredScoringWorker
+from nexus.core.learning import LearningDatabase, SelfImprovementEngine
+from nexus.core.scoring import Scorer, inline_scorers, register_scorer, unregister_scorer
+
+
+class LengthScorer(Scorer):
+    """Cheap test scorer"""
+
+    name = "length"
+
+    def score(self, user_input, assistant_response, conversation):
+        return {'length_score': min(1.0, conversation.response.word_count / 10)}
+
+
+class EchoScorer(Scorer):
+    """Expensive test scorer; fails on responses containing 'fail'"""
+
+    name = "echo"
+    expensive = True
+
+    def score(self, user_input, assistant_response, conversation):
+        if "fail" in assistant_response:
+            raise RuntimeError("scorer failed")
+        return {'echo_score': 0.5, 'echo_words': float(conversation.user.word_count)}
+
+
+@pytest.fixture
+def db(tmp_path):
+    """Learning database stored in a temporary directory"""
+    return LearningDatabase(str(tmp_path / "learning.db"))
+
+
+@pytest.fixture
+def scorers(monkeypatch):
+    """Register the test scorers and enable the expensive one"""
+    register_scorer(LengthScorer())
+    register_scorer(EchoScorer())
+    monkeypatch.setattr(config, "deferred_scorers", "echo,missing")
+    yield
+    unregister_scorer("length")
+    unregister_scorer("echo")
+
+
+class TestScoringPipeline:
+    """Test cases for inline scoring and stage timing"""
+
+    def test_default_pipeline_is_the_heuristics(self):
+        """Test that only the built-in heuristics run inline by default"""
+        assert [scorer.name for scorer in inline_scorers()] == ['heuristics']
+
+    def test_registered_scorer_runs_inline_and_is_timed(self, db, scorers):
+        """Test that cheap scorers join the quality analysis and every stage is timed"""
+        engine = SelfImprovementEngine(db)
+        result = engine.learn_from_feedback("What is a function?", "A function is reusable code.", 1)
+
+        assert result['quality_analysis']['length_score'] == 0.5
+        assert result['overall_quality'] == pytest.approx(
+            sum(result['quality_analysis'].values()) / 6)
+        assert list(result['timings']) == ['profile', 'score.heuristics', 'score.length',
+                                           'insights', 'store', 'patterns', 'enqueue']
+        assert engine.get_stage_timings()['store']['count'] == 1
+
+
+class TestDeferredScoring:
+    """Test cases for the expensive-scorer queue"""
+
+    def test_queued_conversations_scored_later(self, db, scorers):
+        """Test that expensive scores are written back and the queue drained"""
+        engine = SelfImprovementEngine(db)
+        conversation_id = engine.learn_from_feedback("Explain data", "Data is information.", 1)['conversation_id']
+        assert db.get_scores(conversation_id) == {}
+
+        worker = DeferredScoringWorker(db, workers=0)
+        assert worker.scorer_names == ['echo']
+        report = worker.run_once()
+
+        assert (report['scored'], report['failed']) == (1, 0)
+        assert set(report['timings']) == {'profile', 'score.echo'}
+        assert db.get_scores(conversation_id) == {'echo_score': 0.5, 'echo_words': 2.0}
+        assert worker.run_once()['scored'] == 0
+
+    def test_pool_processes_get_runtime_scorers(self, db, scorers):
+        """Test that pool processes run the worker's scorers even when their registry lacks them"""
+        engine = SelfImprovementEngine(db)
+        ids = [engine.learn_from_feedback(f"Question {i}", "Answer.", 1)['conversation_id'] for i in range(4)]
+        worker = DeferredScoringWorker(db, workers=2)
+        unregister_scorer("echo")
+
+        try:
+            report = worker.run_once()
+        finally:
+            worker.close()
+
+        assert (report['scored'], report['failed']) == (4, 0)
+        assert all(db.get_scores(conversation_id)['echo_score'] == 0.5 for conversation_id in ids)
+
+    def test_failures_retried_then_skipped(self, db, scorers):
+        """Test that failing conversations are retried up to max_attempts"""
+        db.enqueue_scoring(db.store_conversation("Hello", "This will fail"))
+        archived = db.store_conversation("Old", "Archived answer")
+        db.enqueue_scoring(archived)
+        conn = db.connect()
+        conn.execute("DELETE FROM conversations WHERE content_hash = ?", (archived,))
+        conn.commit()
+
+        report = DeferredScoringWorker(db, workers=0, max_attempts=2).run_once()
+
+        assert (report['scored'], report['failed']) == (0, 2)
+        conn = db.connect()
+        assert conn.execute("SELECT conversation_id, attempts FROM scoring_queue").fetchall() == [
+            (db.find_conversation("Hello", "This will fail"), 2)
+        ]
+        conn.close()
+
+    def test_no_expensive_scorers(self, db, monkeypatch):
+        """Test that nothing is queued or run without enabled expensive scorers"""
+        monkeypatch.setattr(config, "deferred_scorers", "")
+        result = SelfImprovementEngine(db).learn_from_feedback("Hi", "Hello!", 1)
+
+        assert 'enqueue' not in result['timings']
+        worker = DeferredScoringWorker(db, workers=0)
+        with pytest.raises(ValueError):
+            worker.run_once()
+        worker.serve_forever(interval=60)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,343 @@
+"""
+Tests for the HTTP API server and its load test
+"""
+
+import asyncio
+import json
+import pytest
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import patch
+
+# Add src directory to Python path
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+pytest.importorskip("fastapi")
+
+import httpx
+import openai
+from fastapi.testclient import TestClient
+
+from nexus.core.admission import ConcurrencyGate, RateLimiter
+from nexus.core.assistant import AIAssistant
+from nexus.core.sessions import SessionManager
+from nexus.loadtest import measure_proxy_latency, run_load_test
+from nexus.server import create_app
+
+
+class FakeAsyncModel:
+    """Async OpenAI client double answering every request with the same pieces"""
+
+    def __init__(self, pieces, delay=0.0):
+        self.pieces = pieces
+        self.delay = delay
+        self.requests = []
+        self.options = {}
+        self.error = None
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    async def create(self, messages, stream=False, **kwargs):
+        self.requests.append([dict(message) for message in messages])
+        self.options = kwargs
+        if self.error is not None:
+            raise self.error
+        if not stream:
+            await asyncio.sleep(self.delay)
+            return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="".join(self.pieces)))])
+        self.stream = FakeStream(self.pieces, self.delay)
+        return self.stream
+
+
+class FakeStream:
+    """Streamed response of FakeAsyncModel; records whether it was closed"""
+
+    def __init__(self, pieces, delay):
+        self.chunks = iter(pieces)
+        self.delay = delay
+        self.sent = 0
+        self.closed = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self.closed:
+            raise StopAsyncIteration
+        piece = next(self.chunks, None)
+        if piece is None:
+            raise StopAsyncIteration
+        await asyncio.sleep(self.delay)
+        self.sent += 1
+        return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=piece))])
+
+    async def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def model():
+    """The model behind the assistant"""
+    return FakeAsyncModel(["Generators ", "yield values ", "lazily."])
+
+
+@pytest.fixture
+def app(model, tmp_path):
+    """API application around an assistant using the fake model"""
+    with patch('nexus.core.assistant.openai.OpenAI'):
+        assistant = AIAssistant()
+    assistant._async_client = model
+    return create_app(sessions=SessionManager(assistant, spill_dir=str(tmp_path / "sessions")))
+
+
+def parse_events(body):
+    """(event, data) pairs of a Server-Sent Events body"""
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.split("\n"))
+        events.append((lines.get('event', 'message'), json.loads(lines['data'])))
+    return events
+
+
+class TestServer:
+    """Test cases for the API endpoints"""
+
+    def test_chat_keeps_sessions_apart(self, app, model):
+        """Test that a session continues its own conversation without touching the system prompt"""
+        client = TestClient(app)
+        first = client.post("/chat", json={'message': "What is a generator?"}).json()
+        assert first['response'] == "Generators yield values lazily."
+        assert len(first['conversation_id']) == 64
+
+        client.post("/chat", json={'message': "And an iterator?", 'session_id': first['session_id']})
+        client.post("/chat", json={'message': "Unrelated question"})
+
+        assert [message['role'] for message in model.requests[1]] == ['system', 'user', 'assistant', 'user']
+        assert [message['role'] for message in model.requests[2]] == ['system', 'user']
+        state = app.state.nexus
+        assert len(state.sessions) == 2
+        memory = state.sessions.get(first['session_id'])[1]
+        assert memory.messages[0]['content'] == state.assistant.system_prompt
+
+    def test_sessions_bounded_and_unknown_ids_rejected(self, app):
+        """Test that sessions beyond the limit are spilled and reloaded, and unknown IDs get a 404"""
+        client = TestClient(app)
+        sessions = app.state.nexus.sessions
+        sessions.max_sessions = 2
+        first = client.post("/chat", json={'message': "Hi"}).json()['session_id']
+        for _ in range(2):
+            client.post("/chat", json={'message': "Hi"})
+
+        assert len(sessions) == 2 and first not in sessions
+        assert client.post("/chat", json={'message': "Again", 'session_id': first}).status_code == 200
+        assert sessions.stats()['reloaded'] == 1
+
+        for path in ("/chat", "/chat/stream"):
+            assert client.post(path, json={'message': "Hi", 'session_id': "unknown"}).status_code == 404
+        with client.websocket_connect("/ws?session_id=unknown") as socket:
+            assert socket.receive_json()['type'] == 'error'
+
+    def test_stream_feedback_and_stats(self, app):
+        """Test that a streamed chat can be rated and shows up in the statistics"""
+        client = TestClient(app)
+        response = client.post("/chat/stream", json={'message': "Explain generators"})
+        assert response.headers['content-type'].startswith("text/event-stream")
+
+        events = parse_events(response.text)
+        assert [data['delta'] for event, data in events[:-1]] == ["Generators ", "yield values ", "lazily."]
+        event, done = events[-1]
+        assert event == "done"
+
+        db = app.state.nexus.assistant.learning_engine.db
+        assert db.get_conversation(done['conversation_id'])['assistant_response'] == \
+            "Generators yield values lazily."
+
+        rated = client.post("/feedback", json={'conversation_id': done['conversation_id'][:12], 'rating': 1})
+        assert rated.json() == {'conversation_id': done['conversation_id'], 'rating': 1}
+        assert client.post("/feedback", json={'conversation_id': "ffff", 'rating': 1}).status_code == 404
+        assert client.post("/feedback", json={'conversation_id': "ffff", 'rating': 5}).status_code == 422
+
+        stats = client.get("/stats").json()
+        assert stats['learning']['total_conversations'] == 1
+        assert stats['learning']['positive_feedback_rate'] == 1.0
+        assert stats['server']['active_streams'] == 0
+        assert stats['stage_timings']['store']['count'] == 1
+
+    def test_rate_limits_and_generation_queue(self, app, model):
+        """Test that excess requests get a 429 or 503 with Retry-After and the queue shows in the statistics"""
+        state = app.state.nexus
+        state.limiter = RateLimiter(requests=2, window=60, global_requests=0)
+        client = TestClient(app)
+        for _ in range(2):
+            assert client.post("/chat", json={'message': "Hi"}).status_code == 200
+        limited = client.post("/chat/stream", json={'message': "Hi"})
+        assert limited.status_code == 429 and int(limited.headers['Retry-After']) >= 1
+        api = client.post("/v1/chat/completions", json={'messages': [{'role': 'user', 'content': "Hi"}]},
+                          headers={'Authorization': "Bearer key"})
+        assert api.status_code == 429 and api.json()['error']['type'] == "rate_limit_exceeded"
+
+        state.limiter = RateLimiter(requests=0, window=60, global_requests=0)
+        assert client.post("/chat", json={'message': "Hi"}, headers={'X-Nexus-Priority': "urgent"}).status_code == 400
+        assert client.post("/chat", json={'message': "Hi"}, headers={'X-Nexus-Priority': "batch"}).status_code == 200
+        assert client.get("/stats").json()['server']['generations']['classes']['batch']['completed'] == 1
+
+        state.gate = ConcurrencyGate(limit=1, queue_size=1, timeout=5)
+        model.delay = 0.05
+
+        async def burst():
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://nexus") as http:
+                return await asyncio.gather(*(http.post(path, json={'message': "Hi"})
+                                              for path in ("/chat", "/chat/stream", "/chat")))
+
+        responses = asyncio.run(burst())
+        assert [response.status_code for response in responses] == [200, 200, 503]
+        assert 'Retry-After' in responses[2].headers
+        generations = client.get("/stats").json()['server']['generations']
+        assert (generations['active'], generations['queued'], generations['max_queued']) == (0, 0, 1)
+        assert (generations['admitted'], generations['rejected']) == (2, 1)
+        assert generations['wait_max_ms'] > 0
+
+
+class TestWebSocket:
+    """Test cases for the persistent chat connection"""
+
+    def test_turns_and_mid_generation_cancel(self, app, model):
+        """Test that a cancel aborts the upstream stream, keeps the partial text and learns nothing"""
+        client = TestClient(app)
+        db = app.state.nexus.assistant.learning_engine.db
+        with client.websocket_connect("/ws") as socket:
+            session_id = socket.receive_json()['session_id']
+
+            socket.send_json({'type': 'chat', 'message': "What is a generator?"})
+            frames = [socket.receive_json() for _ in range(4)]
+            assert [frame['type'] for frame in frames] == ['delta'] * 3 + ['done']
+            assert db.get_conversation(frames[-1]['conversation_id']) is not None
+
+            model.pieces = [f"word{i} " for i in range(500)]
+            model.delay = 0.005
+            socket.send_json({'type': 'chat', 'message': "Tell me everything"})
+            received = [socket.receive_json()['text'] for _ in range(3)]
+            socket.send_json({'type': 'chat', 'message': "Too early"})
+            socket.send_json({'type': 'cancel'})
+            frame = socket.receive_json()
+            while frame['type'] == 'delta':
+                received.append(frame['text'])
+                frame = socket.receive_json()
+            assert frame['type'] == 'error'
+            frame = socket.receive_json()
+            while frame['type'] == 'delta':
+                received.append(frame['text'])
+                frame = socket.receive_json()
+
+            assert frame == {'type': 'cancelled', 'text': "".join(received)}
+            assert model.stream.closed and model.stream.sent < 500
+
+            socket.send_text("not json")
+            assert socket.receive_json()['type'] == 'error'
+
+        memory = app.state.nexus.sessions.get(session_id)[1]
+        assert [message['role'] for message in memory.messages] == ['system', 'user', 'assistant', 'user', 'assistant']
+        assert memory.messages[-1]['content'] == "".join(received)
+        assert app.state.nexus.assistant.get_learning_stats()['total_conversations'] == 1
+        assert app.state.nexus.active_streams == 0
+
+    def test_cancel_before_any_text_forgets_question(self, app, model):
+        """Test that a turn cancelled before its first piece leaves no unanswered question behind"""
+        model.delay = 1.0
+        client = TestClient(app)
+        with client.websocket_connect("/ws") as socket:
+            session_id = socket.receive_json()['session_id']
+            socket.send_json({'type': 'chat', 'message': "Slow question"})
+            while not model.requests:
+                time.sleep(0.01)
+            socket.send_json({'type': 'cancel'})
+            assert socket.receive_json() == {'type': 'cancelled', 'text': ""}
+
+        assert [message['role'] for message in app.state.nexus.sessions.get(session_id)[1].messages] == ['system']
+
+
+class TestOpenAICompatibleAPI:
+    """Test cases for /v1/chat/completions and /v1/models"""
+
+    @pytest.fixture
+    def client(self, app):
+        """The official OpenAI client talking to the app"""
+        return openai.OpenAI(base_url="http://testserver/v1", api_key="unused",
+                             http_client=TestClient(app), max_retries=0)
+
+    def test_completion_passes_messages_through_and_learns(self, app, model, client):
+        """Test that the conversation is sent unchanged and its last exchange learned from"""
+        messages = [{'role': 'system', 'content': "Be brief."},
+                    {'role': 'user', 'content': "What is a generator?"}]
+        completion = client.chat.completions.create(model="nexus", messages=messages, temperature=0.2)
+
+        assert completion.choices[0].message.content == "Generators yield values lazily."
+        assert completion.choices[0].finish_reason == "stop"
+        assert model.requests == [messages]
+        assert model.options['temperature'] == 0.2
+        assert model.options['model'] == app.state.nexus.assistant.model_name
+
+        db = app.state.nexus.assistant.learning_engine.db
+        assert db.find_conversation("What is a generator?", "Generators yield values lazily.") is not None
+        assert len(app.state.nexus.sessions) == 0
+
+    def test_streamed_completion(self, model, client):
+        """Test that streamed chunks parse with the OpenAI client and end with a stop chunk"""
+        stream = client.chat.completions.create(
+            model="llama3", messages=[{'role': 'user', 'content': [{'type': 'text', 'text': "Hi"}]}],
+            stream=True)
+        chunks = list(stream)
+
+        assert chunks[0].choices[0].delta.role == "assistant"
+        assert [chunk.choices[0].delta.content for chunk in chunks[1:-1]] == \
+            ["Generators ", "yield values ", "lazily."]
+        assert chunks[-1].choices[0].finish_reason == "stop"
+        assert {chunk.id for chunk in chunks} == {chunks[0].id}
+        assert model.options['model'] == "llama3"
+        assert model.requests[0][0]['content'] == "Hi"
+
+    def test_models_and_upstream_errors(self, model, client):
+        """Test the model list and that model failures come back as OpenAI errors"""
+        assert [entry.id for entry in client.models.list()][0] == "nexus"
+
+        model.error = RuntimeError("model unavailable")
+        for stream in (False, True):
+            with pytest.raises(openai.APIStatusError) as raised:
+                client.chat.completions.create(model="nexus", stream=stream,
+                                               messages=[{'role': 'user', 'content': "Hi"}])
+            assert raised.value.status_code == 502
+            assert raised.value.body['message'] == "model unavailable"
+
+    def test_proxy_latency_report(self, app):
+        """Test that both targets are timed and the added latency reported"""
+        report = asyncio.run(measure_proxy_latency("http://nexus", "http://nexus", "nexus", requests=3,
+                                                   transport=httpx.ASGITransport(app=app)))
+
+        assert report['requests'] == 3
+        assert report['added_first_event_p50'] == pytest.approx(
+            report['proxy_first_event_p50'] - report['upstream_first_event_p50'])
+        assert 0 < report['proxy_first_event_p50'] <= report['proxy_total_p50']
+
+
+class TestLoadTest:
+    """Test cases for the concurrent stream load test"""
+
+    def test_levels_step_up_until_not_sustained(self, app, model):
+        """Test that every stream is counted and stepping stops at the first failing level"""
+        model.delay = 0.01
+        transport = httpx.ASGITransport(app=app)
+        result = asyncio.run(run_load_test("http://nexus", [1, 4], transport=transport))
+
+        assert [level['streams'] for level in result['levels']] == [2, 8]
+        assert all(level['errors'] == 0 for level in result['levels'])
+        assert result['sustained_concurrency'] == 4
+
+        result = asyncio.run(run_load_test("http://nexus", [2, 4], transport=transport, max_first_event=0.0))
+        assert len(result['levels']) == 1
+        assert result['sustained_concurrency'] == 0
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,104 @@
+"""
+Tests for the session manager
+"""
+
+import time
+import pytest
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+# Add src directory to Python path
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from nexus.core.assistant import AIAssistant
+from nexus.core.sessions import SessionManager, UnknownSessionError
+
+
+@pytest.fixture
+def assistant():
+    """Assistant with a mocked provider client"""
+    with patch('nexus.core.assistant.openai.OpenAI'):
+        return AIAssistant()
+
+
+@pytest.fixture
+def spill_dir(tmp_path):
+    """Directory evicted sessions are written to"""
+    return tmp_path / "sessions"
+
+
+class TestSessionManager:
+    """Test cases for LRU eviction, idle timeout and reloading"""
+
+    def test_least_recently_used_spilled_and_reloaded(self, assistant, spill_dir):
+        """Test that sessions beyond the limit go to disk and come back intact"""
+        sessions = SessionManager(assistant, max_sessions=2, timeout=0, spill_dir=str(spill_dir))
+        alice, memory = sessions.get()
+        memory.add_message("user", "Remember the number 42")
+        bob, _ = sessions.get()
+        sessions.get(alice)
+        sessions.get()
+
+        assert bob not in sessions and len(sessions) == 2
+        assert sessions.exists(bob)
+        assert len(list(spill_dir.glob("*.json"))) == 1
+
+        sessions.get(bob)
+        _, memory = sessions.get(alice)
+        assert memory.messages[-1]['content'] == "Remember the number 42"
+        assert memory.messages[0]['content'] == assistant.system_prompt
+        assert sessions.stats()['reloaded'] == 2
+        assert sessions.get()[1] is not memory
+
+    def test_unknown_ids_rejected(self, assistant, spill_dir):
+        """Test that an ID that was never handed out does not start a session"""
+        sessions = SessionManager(assistant, spill_dir=str(spill_dir))
+        session_id, _ = sessions.get()
+        sessions.drop(session_id)
+
+        for unknown in ("never-issued", session_id):
+            assert not sessions.exists(unknown)
+            with pytest.raises(UnknownSessionError):
+                sessions.get(unknown)
+            with pytest.raises(UnknownSessionError):
+                with sessions.use(unknown):
+                    pass
+        assert len(sessions) == 0
+
+    def test_idle_sessions_evicted_unless_in_use(self, assistant, spill_dir):
+        """Test that the idle timeout spills sessions that nobody is using"""
+        sessions = SessionManager(assistant, max_sessions=10, timeout=0.05, spill_dir=str(spill_dir))
+        idle, _ = sessions.get()
+        with sessions.use() as (session_id, memory):
+            time.sleep(0.1)
+            assert sessions.evict_idle() == 1
+            assert session_id in sessions and idle not in sessions
+            assert sessions.stats()['in_use'] == 1
+        time.sleep(0.1)
+        assert sessions.evict_idle() == 1
+        assert len(sessions) == 0
+
+    def test_spill_all_survives_restart(self, assistant, spill_dir):
+        """Test that sessions written at shutdown are picked up by a new manager"""
+        sessions = SessionManager(assistant, spill_dir=str(spill_dir))
+        session_id, memory = sessions.get()
+        memory.add_message("user", "Hello")
+        sessions.spill_all()
+
+        assert len(sessions) == 0
+        assert [path.parent for path in spill_dir.glob("*")] == [spill_dir]
+
+        restarted = SessionManager(assistant, spill_dir=str(spill_dir))
+        assert restarted.get(session_id)[1].messages[-1]['content'] == "Hello"
+        restarted.drop(session_id)
+        assert list(spill_dir.glob("*")) == []
+
+    def test_hostile_ids_stay_inside_spill_dir(self, assistant, spill_dir):
+        """Test that spill files are named by hash, whatever the session ID"""
+        sessions = SessionManager(assistant, spill_dir=str(spill_dir))
+        assert sessions._path("../../outside").parent == spill_dir
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,99 @@
+"""
+Tests for Nexus learning storage backends
+"""
+
+import pytest
+import sqlite3
+import sys
+import threading
+from pathlib import Path
+
+# Add src directory to Python path
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from nexus.core.learning import LearningDatabase
+from nexus.core.storage import (
+    MemoryBackend, ShardedSQLiteBackend, SQLiteFileBackend, create_backend
+)
+
+
+class TestCreateBackend:
+    """Test cases for DATABASE_URL parsing"""
+
+    def test_sqlite_file(self):
+        """Test relative and absolute SQLite file URLs"""
+        assert create_backend("sqlite:///nexus.db").path == Path("nexus.db")
+        assert create_backend("sqlite:////var/lib/nexus.db").path == Path("/var/lib/nexus.db")
+
+    def test_memory(self):
+        """Test in-memory URLs"""
+        assert isinstance(create_backend("sqlite:///:memory:"), MemoryBackend)
+        assert create_backend("memory://shared").name == "shared"
+
+    def test_sharded(self):
+        """Test sharded SQLite URLs"""
+        backend = create_backend("sqlite+sharded:///data/tenants")
+        assert isinstance(backend, ShardedSQLiteBackend)
+        assert backend.directory == Path("data/tenants")
+
+    def test_unsupported(self):
+        """Test that unknown schemes are rejected"""
+        with pytest.raises(ValueError):
+            create_backend("postgresql://localhost/nexus")
+
+
+class TestBackends:
+    """Test cases for learning databases on each backend"""
+
+    def test_memory_backend_is_shared_and_isolated(self):
+        """Test that connections share one memory database per backend"""
+        backend = MemoryBackend()
+        LearningDatabase(backend=backend).store_conversation("q", "a")
+
+        assert LearningDatabase(backend=backend).get_statistics()['total_conversations'] == 1
+        assert LearningDatabase(backend=MemoryBackend()).get_statistics()['total_conversations'] == 0
+        assert backend.path is None
+
+    def test_memory_backend_concurrent_writers(self):
+        """Test that writers on other threads wait for each other instead of failing"""
+        db = LearningDatabase(backend=MemoryBackend())
+        errors = []
+
+        def write(thread):
+            for i in range(50):
+                try:
+                    db.store_conversation(f"q{thread}-{i}", "a")
+                except sqlite3.Error as e:
+                    errors.append(e)
+
+        threads = [threading.Thread(target=write, args=(thread,)) for thread in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert errors == []
+        assert db.get_statistics()['total_conversations'] == 200
+
+    def test_sharded_backend_separates_tenants(self, tmp_path):
+        """Test that each tenant gets its own database file"""
+        backend = ShardedSQLiteBackend(str(tmp_path))
+        LearningDatabase(backend=backend, tenant="acme").store_conversation("q", "a")
+
+        assert LearningDatabase(backend=backend, tenant="acme").get_statistics()['total_conversations'] == 1
+        assert LearningDatabase(backend=backend, tenant="globex").get_statistics()['total_conversations'] == 0
+        assert [path.name for path in tmp_path.glob("acme-*.db")] == [backend.for_tenant("acme").path.name]
+
+    def test_tenant_names_are_sanitized(self, tmp_path):
+        """Test that tenant ids cannot escape the shard directory or share a shard"""
+        backend = ShardedSQLiteBackend(str(tmp_path))
+        shard = backend.for_tenant("../evil")
+
+        assert isinstance(shard, SQLiteFileBackend)
+        assert shard.path.parent == tmp_path
+        assert len({backend.for_tenant(tenant).path for tenant in ("a/b", "a b", "a_b")}) == 3
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
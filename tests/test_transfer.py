@@ -0,0 +1,68 @@
+"""
+Tests for exporting and importing Nexus learning data
+"""
+
+import json
+import pytest
+import sys
+from pathlib import Path
+
+# Add src directory to Python path
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from nexus.core.learning import LearningDatabase
+from nexus.core.transfer import LearningDataTransfer
+
+
+@pytest.fixture
+def source(tmp_path):
+    """Learning database with a few conversations and patterns"""
+    db = LearningDatabase(str(tmp_path / "source.db"))
+    for i in range(5):
+        conversation_id = db.store_conversation(f"question {i}", f"answer {i}", user_feedback=0,
+                                                context_quality=0.5, response_time=1.0, model="llama")
+        db.store_pattern('response_quality', {'index': i, 'feedback': 0}, conversation_id=conversation_id)
+    return db
+
+
+class TestLearningDataTransfer:
+    """Test cases for JSONL export and import"""
+
+    @pytest.mark.parametrize("filename", ["export.jsonl", "export.jsonl.gz"])
+    def test_round_trip_is_idempotent(self, source, tmp_path, filename):
+        """Test that importing an export twice adds the rows only once"""
+        path = str(tmp_path / filename)
+        exported = LearningDataTransfer(source, chunk_size=2).export(path)
+        assert exported['conversations'] == 5
+
+        target = LearningDatabase(str(tmp_path / "target.db"))
+        transfer = LearningDataTransfer(target, chunk_size=2)
+
+        first = transfer.import_file(path)
+        second = transfer.import_file(path)
+
+        assert first == {'conversations': 5, 'knowledge_patterns': 5, 'learning_insights': 0}
+        assert second == {'conversations': 0, 'knowledge_patterns': 0, 'learning_insights': 0}
+        assert target.get_statistics()['total_conversations'] == 5
+        assert target.get_statistics()['learned_patterns'] == {'response_quality': 5}
+
+    def test_bulk_feedback(self, source, tmp_path):
+        """Test applying a ratings file in one transaction, patterns included"""
+        hashes = [row['content_hash'] for row in LearningDataTransfer(source).iter_rows('conversations')]
+        ratings = tmp_path / "ratings.jsonl"
+        ratings.write_text("\n".join([
+            json.dumps({'content_hash': hashes[0], 'feedback': 1}),
+            json.dumps({'content_hash': hashes[1], 'feedback': 1}),
+            json.dumps({'content_hash': 'missing', 'feedback': -1}),
+        ]))
+
+        result = LearningDataTransfer(source).apply_feedback(str(ratings))
+
+        assert result == {'applied': 2, 'unmatched': 1}
+        assert source.get_statistics()['positive_feedback_rate'] == pytest.approx(0.4)
+        assert sorted(p['feedback'] for p in source.get_patterns('response_quality')) == [0, 0, 0, 1, 1]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,117 @@
+"""
+Tests for the single learning-data writer process
+"""
+
+import multiprocessing
+import pytest
+import sys
+import time
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client
+from pathlib import Path
+
+# Add src directory to Python path
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from nexus.core.learning import LearningDatabase
+from nexus.core.writer import WriterClient, run_writer
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="uses Unix domain sockets")
+
+
+def _wait_for_socket(address: str, timeout: float = 10.0):
+    """Wait until the writer process is listening"""
+    deadline = time.monotonic() + timeout
+    while not Path(address).exists():
+        if time.monotonic() > deadline:
+            raise TimeoutError("Learning writer did not start")
+        time.sleep(0.01)
+
+
+def _client_worker(address: str, worker: int, count: int, results):
+    """Send conversations from a separate process, reporting how many were sent"""
+    client = WriterClient(address)
+    for i in range(count):
+        client.store_conversation(f"question {worker}-{i}", "answer", user_feedback=0,
+                                  context_quality=0.5, response_time=0.1)
+    client.flush()
+    client.close()
+    results.put(count)
+
+
+@pytest.fixture
+def writer(tmp_path):
+    """Writer process serving a database file in a temporary directory"""
+    address = str(tmp_path / "writer.sock")
+    db_path = tmp_path / "learning.db"
+    process = multiprocessing.Process(
+        target=run_writer, args=(address,),
+        kwargs={'database_url': f"sqlite:///{db_path}", 'max_delay': 0.01}
+    )
+    process.start()
+    _wait_for_socket(address)
+    yield address, db_path
+    process.terminate()
+    process.join()
+
+
+class TestLearningWriter:
+    """Test cases for routing learning writes through one process"""
+
+    def test_client_writes_reach_database(self, writer):
+        """Test that queued writes are committed and readable read-only"""
+        address, db_path = writer
+        client = WriterClient(address)
+
+        conversation_id = client.store_conversation("q", "a", user_feedback=1)
+        client.store_pattern('response_quality', {'style': 'concise'})
+        client.update_feedback(conversation_id, -1)
+        client.flush()
+
+        reader = LearningDatabase(str(db_path), read_only=True)
+        stats = reader.get_statistics()
+        assert stats['total_conversations'] == 1
+        assert stats['positive_feedback_rate'] == 0.0
+        assert stats['learned_patterns'] == {'response_quality': 1}
+        assert len(conversation_id) == 64
+        assert Path(f"{address}.key").stat().st_mode & 0o777 == 0o600
+
+    def test_unauthenticated_client_rejected(self, writer):
+        """Test that a connection without the writer's key is refused"""
+        address, _ = writer
+        with pytest.raises(AuthenticationError):
+            Client(address, authkey=b"default-secret-key")
+
+    def test_fallback_without_writer(self, tmp_path):
+        """Test that writes go straight to the database when no writer runs"""
+        db = LearningDatabase(str(tmp_path / "fallback.db"))
+        client = WriterClient(str(tmp_path / "missing.sock"))
+        client._fallback = db
+
+        client.store_conversation("q", "a")
+
+        assert db.get_statistics()['total_conversations'] == 1
+
+    @pytest.mark.slow
+    def test_multi_process_stress(self, writer):
+        """Test that writes from several processes at once all arrive"""
+        address, db_path = writer
+        workers, per_worker = 4, 500
+        results = multiprocessing.Queue()
+
+        clients = [
+            multiprocessing.Process(target=_client_worker, args=(address, worker, per_worker, results))
+            for worker in range(workers)
+        ]
+        for client in clients:
+            client.start()
+        sent = sum(results.get(timeout=60) for _ in clients)
+        for client in clients:
+            client.join()
+
+        stats = LearningDatabase(str(db_path), read_only=True).get_statistics()
+        assert stats['total_conversations'] == sent == workers * per_worker
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -18,6 +18,8 @@ load_dotenv()
 
 try:
     from nexus import AIAssistant
+    from nexus.core.assistant import TurnResult
+    from nexus.core.sessions import SessionManager
 except ImportError as e:
     st.error(f"Import error: {e}")
     st.error("Please make sure the nexus package is properly installed.")
@@ -253,11 +255,18 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 
+@st.cache_resource
+def get_session_manager():
+    """Chat sessions of all browser tabs, sharing one assistant per server process"""
+    return SessionManager(AIAssistant())
+
+
 def initialize_session_state():
     """Initialize session state variables"""
     if "assistant" not in st.session_state:
         try:
-            st.session_state.assistant = AIAssistant()
+            st.session_state.sessions = get_session_manager()
+            st.session_state.assistant = st.session_state.sessions.assistant
             st.session_state.is_initialized = True
             st.session_state.model_provider = st.session_state.assistant.model_provider
             st.session_state.model_name = st.session_state.assistant.model_name
@@ -288,6 +297,19 @@ def initialize_session_state():
         st.session_state.conversation_history = st.session_state.chat_sessions[st.session_state.active_chat_id]["history"]
 
 
+def ask_active_chat(question: str, **kwargs) -> TurnResult:
+    """Ask in the conversation memory of the active chat"""
+    chat = st.session_state.chat_sessions[st.session_state.active_chat_id]
+    sessions = st.session_state.sessions
+    session_id = chat.get("session_id")
+    if session_id is not None and not sessions.exists(session_id):
+        session_id = None  # dropped on the server side; start over
+    result = TurnResult()
+    with sessions.use(session_id) as (chat["session_id"], memory):
+        st.session_state.assistant.ask(question, memory=memory, result=result, **kwargs)
+    return result
+
+
 def display_chat_message(role: str, content: str, message_index: int = None):
     """Display a chat message with mysterious styling and feedback options"""
     if role == "user":
@@ -327,14 +349,20 @@ def provide_message_feedback(message_index: int, rating: int):
     try:
         if message_index * 2 + 1 < len(st.session_state.conversation_history):
             user_msg = st.session_state.conversation_history[message_index * 2]['content']
-            assistant_msg = st.session_state.conversation_history[message_index * 2 + 1]['content']
+            assistant_entry = st.session_state.conversation_history[message_index * 2 + 1]
             
-            result = st.session_state.assistant.provide_feedback(user_msg, assistant_msg, rating)
+            # Rate the stored conversation in place rather than storing it again
+            result = st.session_state.assistant.provide_feedback(
+                user_msg, assistant_entry['content'], rating,
+                conversation_id=assistant_entry.get('conversation_id')
+            )
             
             feedback_text = "👍 Positive" if rating == 1 else "👎 Negative"
-            st.success(f"{feedback_text} feedback recorded! Quality score: {result['overall_quality']:.2f}")
+            quality = result.get('overall_quality')
+            st.success(f"{feedback_text} feedback recorded!" +
+                       (f" Quality score: {quality:.2f}" if quality is not None else ""))
             
-            if result['suggestions']:
+            if result.get('suggestions'):
                 st.info("💡 Suggestions: " + ", ".join(result['suggestions'][:2]))
                 
             st.rerun()
@@ -354,10 +382,11 @@ def regenerate_response(message_index: int):
             
             # Generate new response
             with st.spinner("🔄 Regenerating response..."):
-                response = st.session_state.assistant.ask(user_msg)
+                result = ask_active_chat(user_msg)
                 st.session_state.conversation_history.append({
                     "role": "assistant",
-                    "content": response
+                    "content": result.response,
+                    "conversation_id": result.conversation_id
                 })
             
             st.rerun()
@@ -404,6 +433,48 @@ def handle_learning_action(action_key: str):
         st.error(f"Error handling learning action: {e}")
 
 
+def display_history_search():
+    """Search box over past conversations with paged results"""
+    st.markdown('<h4 style="margin-top:1rem;">🔍 Search History</h4>', unsafe_allow_html=True)
+    query = st.text_input("Search history", placeholder="Find a past answer...",
+                          key="history_query", label_visibility="collapsed")
+    if not query.strip():
+        return
+    
+    # Start from the first page whenever the query changes
+    if st.session_state.get("history_last_query") != query:
+        st.session_state.history_last_query = query
+        st.session_state.history_page = 0
+    
+    page_size = 5
+    page = st.session_state.get("history_page", 0)
+    try:
+        results = st.session_state.assistant.search_history(
+            query, limit=page_size, offset=page * page_size, highlight=("**", "**")
+        )
+    except Exception as e:
+        st.error(f"Error searching history: {e}")
+        return
+    
+    if not results:
+        st.caption("No matching conversations")
+    for result in results:
+        with st.expander(result['user_input'].replace("**", "")[:60] or "…"):
+            st.caption(result['timestamp'])
+            st.markdown(f"👤 {result['user_input']}")
+            st.markdown(f"🤖 {result['assistant_response']}")
+    
+    col_prev, col_next = st.columns(2)
+    with col_prev:
+        if page > 0 and st.button("◀ Previous", key="history_prev", use_container_width=True):
+            st.session_state.history_page = page - 1
+            st.rerun()
+    with col_next:
+        if len(results) == page_size and st.button("Next ▶", key="history_next", use_container_width=True):
+            st.session_state.history_page = page + 1
+            st.rerun()
+
+
 def main():
     """Main Streamlit application"""
     
@@ -459,6 +530,8 @@ def main():
             st.session_state.conversation_history = st.session_state.chat_sessions[new_id]["history"]
             st.rerun()
 
+        display_history_search()
+
         # ...existing code...
         # Model settings (for temperature and max_tokens sliders)
         global temperature, max_tokens
@@ -519,14 +592,15 @@ def main():
             # Show thinking spinner
             with st.spinner("🤔 Nexus is thinking..."):
                 try:
-                    response = st.session_state.assistant.ask(
+                    result = ask_active_chat(
                         user_input,
                         temperature=temperature,
                         max_tokens=max_tokens
                     )
                     st.session_state.conversation_history.append({
                         "role": "assistant",
-                        "content": response
+                        "content": result.response,
+                        "conversation_id": result.conversation_id
                     })
                     st.session_state.chat_sessions[st.session_state.active_chat_id]["history"] = st.session_state.conversation_history
                 except Exception as e:
@@ -558,10 +632,11 @@ def main():
                 # Get AI response
                 with st.spinner("🤔 Nexus is thinking..."):
                     try:
-                        response = st.session_state.assistant.ask(prompt)
+                        result = ask_active_chat(prompt)
                         st.session_state.conversation_history.append({
                             "role": "assistant",
-                            "content": response
+                            "content": result.response,
+                            "conversation_id": result.conversation_id
                         })
                     except Exception as e:
                         st.error(f"❌ Error: {str(e)}")